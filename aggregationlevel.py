@@ -4,6 +4,7 @@ from abc import ABCMeta, abstractmethod
 from typing import List
 
 from usecaseclassification.aggregatedsecaseexecution import AggregatedUseCaseExecution
+from util import fingerprintutil
 
 
 class AggregationLevel(Enum):
@@ -104,6 +105,15 @@ class BaseAggregationLevelIterator(metaclass=ABCMeta):
     def iter(self):
         return self.iterator
 
+    def get_apps(self):
+        return self.iterator
+
+    def get_cache_fingerprint(self):
+        apps_fingerprint = fingerprintutil.get_value_fingerprint(self.get_apps())
+        if apps_fingerprint is None:
+            return None
+        return f"{type(self).__name__}({self.title()},{self.all_indices},{self.use_all_indices},{apps_fingerprint})"
+
 
 class AppAggregationLevelIterator(BaseAggregationLevelIterator):
     def __init__(self, iterator, use_all_indices=False):
@@ -134,9 +144,13 @@ class UseCaseAggregationLevelIterator(BaseAggregationLevelIterator):
                          all_indices=[app.short_name for app in aggregated_use_case_execution.apps],
                          use_all_indices=use_all_indices)
         self.use_case = aggregated_use_case_execution.use_case
+        self.apps = aggregated_use_case_execution.apps
         assert aggregated_use_case_execution.apps
         assert aggregated_use_case_execution.use_case_executions
         assert len(aggregated_use_case_execution.apps) == len(aggregated_use_case_execution.use_case_executions)
 
     def title(self):
         return f"{self.aggregation_level.texify()} ({self.use_case.name})"
+
+    def get_apps(self):
+        return self.apps
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+import collections
+import multiprocessing as mp
+import os
+import re
+import shutil
+import threading
+import time
+import traceback
+import uuid
+from typing import Dict, Optional, Set, Tuple
+
+from analysisresultstore import AnalysisResultStore, get_result_key
+from matrics import Matrics
+from model.modelsnapshot import ModelSnapshot
+from outlierdetection.univariateoutlierdetection import OUTLIER_NAME_INSTANCE_MAP
+from util import configutil
+from util import jsonutil
+from util.configutil import MATRICS_CFG_APP_FILTER_LIST
+from util.pathutil import create_dir_if_non_existing
+
+JOB_STATE_QUEUED = "queued"
+JOB_STATE_RUNNING = "running"
+JOB_STATE_FINISHED = "finished"
+JOB_STATE_FAILED = "failed"
+
+PROGRESS_FILE_NAME = "progress.json"
+RESULT_FILE_NAME = "result.snapshot"
+# Configuration of the job, see get_result_key
+KEY_FILE_NAME = "key.json"
+
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class JobProgress(object):
+    """
+    State and per-stage progress of an analysis job, see Matrics for the stages. The progress is written
+    atomically to the job dir, so it can be read by any process while the job is running.
+    """
+
+    def __init__(self, job_dir):
+        self.file = os.path.join(job_dir, PROGRESS_FILE_NAME)
+        self.progress = {
+            'state': JOB_STATE_QUEUED,
+            # Stage -> [done, total]
+            'stages': {},
+            'error': None,
+        }
+
+    def update(self, stage, done, total=None) -> None:
+        self.progress['stages'][stage] = [done, total]
+        self.dump()
+
+    def set_state(self, state, error=None) -> None:
+        self.progress['state'] = state
+        self.progress['error'] = error
+        self.dump()
+
+    def dump(self) -> None:
+        jsonutil.dump_json_file(self.file, self.progress)
+
+    @staticmethod
+    def load(job_dir) -> Optional[dict]:
+        try:
+            return jsonutil.load_json_file(os.path.join(job_dir, PROGRESS_FILE_NAME))
+        except (OSError, ValueError):
+            return None
+
+
+def dump_job_key(job_dir, key) -> None:
+    jsonutil.dump_json_file(os.path.join(job_dir, KEY_FILE_NAME), key)
+
+
+def load_job_key(job_dir) -> Optional[Tuple]:
+    """
+    :return: The key of the job, see get_result_key, or None if it cannot be read.
+    """
+    try:
+        togape_config_entry, dataset, univariate_outlier_method_name = \
+            jsonutil.load_json_file(os.path.join(job_dir, KEY_FILE_NAME))
+    except (OSError, ValueError, TypeError):
+        return None
+    return tuple(togape_config_entry), tuple(dataset), univariate_outlier_method_name
+
+
+def run_analysis_job(job_dir, job_id, togape_config_file, matrics_config, univariate_outlier_method_name,
+                     previous_result_file):
+    """
+    Runs the analysis in the process of the job. The result is stored as snapshot in the job dir.
+
+    :param previous_result_file: Result of a previous job, its unchanged apps of the dataset are reused.
+    """
+    progress = JobProgress(job_dir)
+    progress.set_state(JOB_STATE_RUNNING)
+    matrics = None
+    try:
+        previous_matrics = None
+        if previous_result_file is not None:
+            previous_job_id = os.path.basename(os.path.dirname(previous_result_file))
+            snapshot = ModelSnapshot.load_from_file(previous_result_file, previous_job_id)
+            previous_matrics = None if snapshot is None else snapshot.restore()
+        matrics = Matrics(togape_config_file=togape_config_file,
+                          matrics_config=matrics_config,
+                          univariate_outlier_method=OUTLIER_NAME_INSTANCE_MAP[univariate_outlier_method_name],
+                          previous_matrics=previous_matrics,
+                          progress_callback=progress.update)
+        matrics.start()
+        matrics.progress_callback = None
+        ModelSnapshot.create(matrics).dump_to_file(os.path.join(job_dir, RESULT_FILE_NAME), job_id)
+        progress.set_state(JOB_STATE_FINISHED)
+    except Exception:
+        print(traceback.format_exc())
+        progress.set_state(JOB_STATE_FAILED, traceback.format_exc())
+        if matrics is not None:
+            # Notification sound
+            matrics.play_sound(successful=False)
+
+
+class AnalysisJobManager(object):
+    """
+    Runs the analyses of the dashboard in background processes, so the callbacks of the dashboard return
+    immediately and report the progress of the job by polling. Jobs are queued and at most `workers` jobs run
+    at the same time. Progress and result of a job are stored in its job dir and are addressed by the job id,
+    so they can be served to several users and by any process of the dashboard.
+
+    The finished jobs are registered in the AnalysisResultStore by their configuration. A repeated
+    configuration is served from the store and a new one reuses the apps of the job with the most overlapping
+    dataset. The configuration is stored in the job dir, so the jobs finished by other processes of the
+    dashboard or before a restart are found by scanning the job dirs.
+
+    Only the latest finished job of the recent configurations is kept, see MATRICS_ANALYSIS_JOB_MAX_FINISHED_JOBS.
+    The dirs of failed and superseded jobs are removed after MATRICS_ANALYSIS_JOB_RETENTION. Queued and running
+    jobs and the jobs whose result they reuse are never removed.
+    """
+
+    def __init__(self, job_dir=configutil.MATRICS_ANALYSIS_JOB_DIR_NAME, workers=configutil.MATRICS_ANALYSIS_JOB_WORKERS):
+        self.job_dir = job_dir
+        self.workers = max(1, workers)
+        self.lock = threading.Lock()
+        # (job id, arguments of run_analysis_job)
+        self.queue = collections.deque()
+        self.processes: Dict[str, mp.Process] = {}
+        # Queued or running job id -> job id of the result it reuses
+        self.previous_job_ids: Dict[str, str] = {}
+        # Finished and failed jobs, which do not have to be scanned again
+        self.scanned_job_ids: Set[str] = set()
+        # Failed and superseded job id -> finish time, their dirs are removed after the retention time
+        self.expired_job_ids: Dict[str, float] = {}
+        self.result_store = AnalysisResultStore()
+        # The dashboard runs threads, forking it could copy locks held by them. The job processes are not
+        # daemonic, because Matrics starts worker processes itself.
+        self.context = mp.get_context('spawn')
+        self.scheduler = threading.Thread(target=self.schedule, name="AnalysisJobScheduler", daemon=True)
+        self.scheduler.start()
+
+    def get_job_dir(self, job_id) -> str:
+        if not isinstance(job_id, str) or not JOB_ID_PATTERN.match(job_id):
+            raise ValueError(f"Invalid analysis job id: {job_id}")
+        return os.path.join(self.job_dir, job_id)
+
+    def find_finished_job(self, togape_config_file, dataset, univariate_outlier_method_name) -> Optional[str]:
+        """
+        :param dataset: Package names of the apps, see matrics_datasets.
+        :return: The finished job of the configuration if its result is still valid, see
+        Matrics.has_unchanged_sources.
+        """
+        key = get_result_key(togape_config_file, dataset, univariate_outlier_method_name)
+        job_id = self.result_store.get_job_id(key)
+        if job_id is None:
+            self.scan_finished_jobs()
+            job_id = self.result_store.get_job_id(key)
+        if job_id is None:
+            return None
+        matrics = self.get_result(job_id)
+        if matrics is None or not matrics.has_unchanged_sources():
+            return None
+        return job_id
+
+    def submit(self, togape_config_file, dataset, univariate_outlier_method_name) -> str:
+        """
+        :param dataset: Package names of the apps, see matrics_datasets.
+        :return: The job id.
+        """
+        key = get_result_key(togape_config_file, dataset, univariate_outlier_method_name)
+        job_id = uuid.uuid4().hex
+        job_dir = self.get_job_dir(job_id)
+        create_dir_if_non_existing(job_dir)
+        JobProgress(job_dir).dump()
+        dump_job_key(job_dir, key)
+        matrics_config = {MATRICS_CFG_APP_FILTER_LIST: dataset}
+        previous_result_file = None
+        self.scan_finished_jobs()
+        previous_job_id = self.result_store.get_overlapping_job_id(key)
+        if previous_job_id is not None:
+            previous_result_file = os.path.join(self.get_job_dir(previous_job_id), RESULT_FILE_NAME)
+            if not os.path.isfile(previous_result_file):
+                previous_result_file = None
+        with self.lock:
+            if previous_result_file is not None:
+                self.previous_job_ids[job_id] = previous_job_id
+            self.queue.append((job_id, (job_dir, job_id, togape_config_file, matrics_config,
+                                        univariate_outlier_method_name, previous_result_file)))
+        self.update()
+        return job_id
+
+    def update(self) -> None:
+        """
+        Reaps the finished job processes and starts the queued jobs.
+        """
+        with self.lock:
+            for job_id, process in list(self.processes.items()):
+                if process.is_alive():
+                    continue
+                process.join()
+                del self.processes[job_id]
+                self.previous_job_ids.pop(job_id, None)
+                job_dir = self.get_job_dir(job_id)
+                progress = JobProgress.load(job_dir)
+                if progress is None or progress['state'] not in (JOB_STATE_FINISHED, JOB_STATE_FAILED):
+                    # The process was killed, e.g. because it ran out of memory
+                    JobProgress(job_dir).set_state(JOB_STATE_FAILED,
+                                                   f"The analysis process exited with code {process.exitcode}")
+            while self.queue and len(self.processes) < self.workers:
+                job_id, args = self.queue.popleft()
+                process = self.context.Process(target=run_analysis_job, args=args, name=f"AnalysisJob-{job_id}")
+                process.start()
+                self.processes[job_id] = process
+
+    def scan_finished_jobs(self) -> None:
+        """
+        Registers the finished jobs of the job dirs in the result store and removes the expired jobs. Only the
+        jobs that were not finished at the previous scan are read.
+        """
+        if not os.path.isdir(self.job_dir):
+            return
+        expired = []
+        for job_id in os.listdir(self.job_dir):
+            with self.lock:
+                if job_id in self.scanned_job_ids:
+                    continue
+            if not JOB_ID_PATTERN.match(job_id):
+                continue
+            job_dir = os.path.join(self.job_dir, job_id)
+            progress = JobProgress.load(job_dir)
+            if progress is None or progress['state'] not in (JOB_STATE_FINISHED, JOB_STATE_FAILED):
+                continue
+            result_file = os.path.join(job_dir, RESULT_FILE_NAME)
+            key = load_job_key(job_dir)
+            try:
+                if progress['state'] == JOB_STATE_FINISHED and key is not None and os.path.isfile(result_file):
+                    superseded = self.result_store.add_job(key, job_id, os.path.getmtime(result_file))
+                    if superseded is not None:
+                        expired.append(superseded)
+                else:
+                    expired.append((os.path.getmtime(os.path.join(job_dir, PROGRESS_FILE_NAME)), job_id))
+            except OSError:
+                # Removed by another process of the dashboard
+                continue
+            with self.lock:
+                self.scanned_job_ids.add(job_id)
+        expired += self.result_store.remove_old_jobs(configutil.MATRICS_ANALYSIS_JOB_MAX_FINISHED_JOBS)
+        with self.lock:
+            for finish_time, job_id in expired:
+                self.expired_job_ids[job_id] = finish_time
+        self.remove_expired_jobs()
+
+    def remove_expired_jobs(self) -> None:
+        """
+        Removes the dirs of the expired jobs whose retention time passed, except for the jobs that are reused by
+        the queued or running jobs of this process.
+        """
+        now = time.time()
+        with self.lock:
+            in_use_job_ids = set(self.previous_job_ids.values())
+            removed_job_ids = [job_id for job_id, finish_time in self.expired_job_ids.items()
+                               if now - finish_time > configutil.MATRICS_ANALYSIS_JOB_RETENTION and
+                               job_id not in in_use_job_ids]
+            for job_id in removed_job_ids:
+                del self.expired_job_ids[job_id]
+                self.scanned_job_ids.discard(job_id)
+        for job_id in removed_job_ids:
+            # Other processes of the dashboard may remove the same dir
+            shutil.rmtree(self.get_job_dir(job_id), ignore_errors=True)
+
+    def schedule(self) -> None:
+        while True:
+            time.sleep(configutil.MATRICS_ANALYSIS_JOB_POLL_INTERVAL / 1000)
+            try:
+                self.update()
+            except Exception:
+                print(traceback.format_exc())
+
+    def get_progress(self, job_id) -> Optional[dict]:
+        """
+        :return: The progress of the job, see JobProgress, or None if the job does not exist.
+        """
+        return JobProgress.load(self.get_job_dir(job_id))
+
+    def get_result(self, job_id) -> Optional[Matrics]:
+        """
+        :return: The Matrics of a finished job or None if there is no result.
+        """
+        return self.result_store.get_result(job_id, self.load_result)
+
+    def load_result(self, job_id) -> Optional[Tuple[Matrics, int]]:
+        """
+        :return: The Matrics of the job and the size of its snapshot file.
+        """
+        result_file = os.path.join(self.get_job_dir(job_id), RESULT_FILE_NAME)
+        snapshot = ModelSnapshot.load_from_file(result_file, job_id)
+        if snapshot is None:
+            return None
+        return snapshot.restore(), os.path.getsize(result_file)
+
+
+_analysis_job_manager = None
+
+
+def get_analysis_job_manager() -> AnalysisJobManager:
+    global _analysis_job_manager
+    if _analysis_job_manager is None:
+        _analysis_job_manager = AnalysisJobManager()
+    return _analysis_job_manager
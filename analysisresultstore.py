@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import collections
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from util import configutil
+from util import fingerprintutil
+
+logger = logging.getLogger('AnalysisResultStore')
+
+
+def get_result_key(togape_config_file, dataset, univariate_outlier_method_name) -> Tuple:
+    """
+    Key of an analysis configuration. Changing the ToGAPE configuration file changes the key.
+
+    :param dataset: Package names of the apps, see matrics_datasets.
+    """
+    return (fingerprintutil.get_file_entry(os.path.abspath(togape_config_file)),
+            tuple(sorted(dataset)),
+            univariate_outlier_method_name)
+
+
+class AnalysisResultStore(object):
+    """
+    Results of the finished analysis jobs by their configuration, see get_result_key. The results are stored
+    as snapshots in the job dirs, see AnalysisJobManager, and the recently used ones are held in memory.
+
+    The memory is bounded by the summed sizes of the result snapshots, which is an estimate of the size of the
+    restored results. The least recently used results are evicted first, the most recently used result is
+    always kept.
+    """
+
+    def __init__(self, max_size=configutil.MATRICS_RESULT_STORE_MAX_SIZE):
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        # Key -> (finish time, job id) of the latest finished job of the configuration
+        self.key_job_ids: Dict[Tuple, Tuple[float, str]] = {}
+        # Job id -> (result, size), ordered from the least to the most recently used
+        self.results = collections.OrderedDict()
+        self.size = 0
+
+    def add_job(self, key, job_id, finish_time) -> Optional[Tuple[float, str]]:
+        """
+        Jobs can be added in any order, e.g. when the job dirs are scanned, the latest job of a key is kept.
+
+        :return: (finish time, job id) of the superseded job of the key or None.
+        """
+        with self.lock:
+            entry = self.key_job_ids.get(key)
+            if entry is None or entry[0] <= finish_time:
+                self.key_job_ids[key] = (finish_time, job_id)
+                return entry
+            return finish_time, job_id
+
+    def remove_old_jobs(self, max_jobs) -> List[Tuple[float, str]]:
+        """
+        Keeps the latest finished jobs of at most max_jobs keys. The results of the removed jobs stay in memory
+        until they are evicted, so they are still served to their users.
+
+        :return: (finish time, job id) of the removed jobs.
+        """
+        with self.lock:
+            entries = sorted(self.key_job_ids.items(), key=lambda item: item[1], reverse=True)
+            for key, _ in entries[max_jobs:]:
+                del self.key_job_ids[key]
+        return [entry for _, entry in entries[max_jobs:]]
+
+    def get_job_id(self, key) -> Optional[str]:
+        with self.lock:
+            entry = self.key_job_ids.get(key)
+        return None if entry is None else entry[1]
+
+    def get_overlapping_job_id(self, key) -> Optional[str]:
+        """
+        :return: The finished job with the same ToGAPE configuration whose dataset shares the most apps with the
+        dataset of the key, e.g. the job of `all` for a category. Its apps can be reused by the analysis of the key.
+        """
+        togape_config_entry, dataset, _ = key
+        job_id = None
+        max_entry = (0, 0)
+        with self.lock:
+            for (other_togape_config_entry, other_dataset, _), (finish_time, other_job_id) in self.key_job_ids.items():
+                if other_togape_config_entry != togape_config_entry:
+                    continue
+                overlap = len(set(dataset).intersection(other_dataset))
+                # Later jobs win on a tie, because they reuse the apps of the earlier ones
+                if overlap > 0 and (overlap, finish_time) > max_entry:
+                    job_id = other_job_id
+                    max_entry = (overlap, finish_time)
+        return job_id
+
+    def get_result(self, job_id, load: Callable[[str], Optional[Tuple[object, int]]]):
+        """
+        :param load: Loads the result and its size of a job that is not held in memory.
+        :return: The result or None if it could not be loaded.
+        """
+        with self.lock:
+            entry = self.results.get(job_id)
+            if entry is not None:
+                self.results.move_to_end(job_id)
+                return entry[0]
+        # Loading can take a while and must not block the other results
+        entry = load(job_id)
+        if entry is None:
+            return None
+        with self.lock:
+            if job_id not in self.results:
+                self.results[job_id] = entry
+                self.size += entry[1]
+            self.results.move_to_end(job_id)
+            self.evict()
+            result = self.results[job_id][0]
+        logger.debug(self.get_stats())
+        return result
+
+    def evict(self) -> None:
+        while self.size > self.max_size and len(self.results) > 1:
+            _, (_, size) = self.results.popitem(last=False)
+            self.size -= size
+
+    def get_stats(self) -> str:
+        with self.lock:
+            return f"Analysis results in memory: {len(self.results)}, estimated size: {self.size / 1024 / 1024:.1f}MB"
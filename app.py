@@ -7,7 +7,8 @@ import flask
 import logging
 from logging.handlers import RotatingFileHandler
 
-from util.configutil import IMAGE_DIR
+from util.configutil import IMAGE_DIR, IMG_PATH_DEFAULT, IMG_CACHE_MAX_AGE
+from util.thumbnailutil import get_image_etag, get_thumbnail_cache, get_thumbnail_width
 
 server = flask.Flask(__name__)
 # https://dash-bootstrap-components.opensource.faculty.ai/
@@ -33,8 +34,6 @@ app.server.logger.addHandler(handler)
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger('DashApp')
 
-matrics_ = None
-
 
 @app.server.route('/css/<path:path>')
 def static_css(path):
@@ -74,9 +73,33 @@ def serve_png(image_path):
 def serve_jpg(image_path):
     """
     https://community.plot.ly/t/adding-local-image/4896/4
+
+    The optional size parameter requests a thumbnail of at least this width, see ThumbnailCache.
     """
     dir_ = os.path.join("/", os.path.dirname(image_path))
     image_name = f'{os.path.basename(image_path)}.jpg'
     # if image_name not in list_of_images:
     #     raise Exception('"{}" is excluded from the allowed static files'.format(image_path))
-    return flask.send_from_directory(dir_, image_name)
+    image_file = os.path.join(dir_, image_name)
+    if not os.path.isfile(image_file):
+        # Derived images are written in the background, see ImageDerivativePipeline
+        response = flask.send_from_directory(IMAGE_DIR, os.path.basename(IMG_PATH_DEFAULT))
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    size = flask.request.args.get('size', type=int)
+    width = None if size is None else get_thumbnail_width(size)
+    etag = get_image_etag(image_file, width)
+    # Revalidated images are neither read nor generated
+    if etag in flask.request.if_none_match:
+        response = flask.Response(status=304)
+    else:
+        thumbnail_file = None if width is None else get_thumbnail_cache().get_thumbnail(image_file, width)
+        if thumbnail_file is None:
+            response = flask.send_from_directory(dir_, image_name, add_etags=False)
+        else:
+            response = flask.send_file(thumbnail_file, mimetype='image/jpeg', add_etags=False)
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = IMG_CACHE_MAX_AGE
+    return response
@@ -1,17 +1,32 @@
 # -*- coding: utf-8 -*-
+from typing import Optional
+
 import dash_html_components as html
 import dash_bootstrap_components as dbc
-from app import app
 
+from analysisjobmanager import get_analysis_job_manager
+from matrics import Matrics
 from metrics.ucecomparison import modelmetrics
 
+# Holds the id of the finished analysis job, whose result is displayed
 ANALYSIS_FINISHED_CONTAINER = "analysis-finished"
 
 
-def get_graph(metric_id):
+def get_matrics(job_id) -> Optional[Matrics]:
+    """
+    :param job_id: Id of the finished analysis job, i.e. the children of ANALYSIS_FINISHED_CONTAINER.
+    :return: The result of the job or None if no analysis is finished.
+    """
+    if job_id is None:
+        return None
+    return get_analysis_job_manager().get_result(job_id)
+
+
+def get_graph(metric_id, job_id):
     graph = None
-    if hasattr(app, 'matrics_'):
-        metric_ = app.matrics_.model.model_accessors[metric_id]
+    matrics = get_matrics(job_id)
+    if matrics is not None:
+        metric_ = matrics.model.model_accessors[metric_id]
         graph = metric_.plot()
 
     return graph
@@ -27,25 +42,26 @@ def create_sidenav_bar(children_elements):
     ]
 
 
-def show_info(selection, app_selectionv):
+def show_info(selection, app_selectionv, matrics: Matrics):
     child_elements = []
     if selection['nodes']:
-        model_metrics = app.matrics_.model.model_accessors[modelmetrics.ModelGraphs.get_id()]
+        model_metrics = matrics.model.model_accessors[modelmetrics.ModelGraphs.get_id()]
         node_info = model_metrics.node_info(app_selectionv, selection['nodes'][0])
         child_elements.extend(node_info)
     if selection['edges']:
-        model_metrics = app.matrics_.model.model_accessors[modelmetrics.ModelGraphs.get_id()]
+        model_metrics = matrics.model.model_accessors[modelmetrics.ModelGraphs.get_id()]
         edge_info = model_metrics.edges_info(app_selectionv, selection['edges'])
         child_elements.extend(edge_info)
     if child_elements:
         return create_sidenav_bar(child_elements)
 
 
-def app_selection():
+def app_selection(job_id):
     selection_model_div_options = []
     selection_model_div_value = []
-    if hasattr(app, 'matrics_') and app.matrics_ is not None:
-        apps = app.matrics_.apps
+    matrics = get_matrics(job_id)
+    if matrics is not None:
+        apps = matrics.apps
         selection_model_div_options = [{'label': a.package_name, 'value': a.package_name} for a in apps]
         selection_model_div_value = apps[0].package_name
 
@@ -20,5 +20,5 @@ layout = dbc.Container([
     Output(CorrelationsMetricAppAL.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def correlations_metric_app_level_ctr(_):
-    return get_graph(CorrelationsMetricAppAL.get_id())
+def correlations_metric_app_level_ctr(job_id):
+    return get_graph(CorrelationsMetricAppAL.get_id(), job_id)
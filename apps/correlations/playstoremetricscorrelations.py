@@ -20,5 +20,5 @@ layout = dbc.Container([
     Output(PlayStoreCorrelationsMetricAppAL.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def correlations_metric_app_level_ctr(_):
-    return get_graph(PlayStoreCorrelationsMetricAppAL.get_id())
+def correlations_metric_app_level_ctr(job_id):
+    return get_graph(PlayStoreCorrelationsMetricAppAL.get_id(), job_id)
@@ -18,5 +18,5 @@ layout = dbc.Container([
     Output(UseCaseCorrelations.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def use_case_correlation_ctr(_):
-    return get_graph(UseCaseCorrelations.get_id())
+def use_case_correlation_ctr(job_id):
+    return get_graph(UseCaseCorrelations.get_id(), job_id)
@@ -21,5 +21,5 @@ layout = dbc.Container([
     Output(Distribution.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def analysis_distribution_ctr(_):
-    return get_graph(Distribution.get_id())
+def analysis_distribution_ctr(job_id):
+    return get_graph(Distribution.get_id(), job_id)
@@ -4,7 +4,7 @@ import pandas as pd
 from dash.dependencies import Input, Output
 
 from app import app
-from apps.apputil import ANALYSIS_FINISHED_CONTAINER
+from apps.apputil import ANALYSIS_FINISHED_CONTAINER, get_matrics
 from util import tableutil
 
 
@@ -24,10 +24,11 @@ layout = dbc.Container([
     Output(APPS_OVERVIEW_CONTAINER, 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def apps_overview_ctr(_):
+def apps_overview_ctr(job_id):
     table = None
-    if hasattr(app, 'matrics_'):
-        apps = app.matrics_.model.get_apps_sorted()
+    matrics = get_matrics(job_id)
+    if matrics is not None:
+        apps = matrics.model.get_apps_sorted()
         table = create_apps_overview_table(apps)
 
     return table
@@ -18,5 +18,5 @@ layout = dbc.Container([
     Output(usecaseanalysis.AppsUseCaseExecutionsOverview.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def apps_use_case_executions_overview_ctr(_):
-    return get_graph(usecaseanalysis.AppsUseCaseExecutionsOverview.get_id())
+def apps_use_case_executions_overview_ctr(job_id):
+    return get_graph(usecaseanalysis.AppsUseCaseExecutionsOverview.get_id(), job_id)
@@ -18,5 +18,5 @@ layout = dbc.Container([
     Output(usecaseanalysis.UseCaseExecutionsAppsOverview.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def use_case_execution_apps_overview_ctr(_):
-    return get_graph(usecaseanalysis.UseCaseExecutionsAppsOverview.get_id())
+def use_case_execution_apps_overview_ctr(job_id):
+    return get_graph(usecaseanalysis.UseCaseExecutionsAppsOverview.get_id(), job_id)
@@ -31,29 +31,29 @@ layout = dbc.Container([
     Output(buttonmetrics.ButtonButtonsNumberUCE.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def button_buttons_number_ctr(_):
-    return get_graph(buttonmetrics.ButtonButtonsNumberUCE.get_id())
+def button_buttons_number_ctr(job_id):
+    return get_graph(buttonmetrics.ButtonButtonsNumberUCE.get_id(), job_id)
 
 
 @app.callback(
     Output(buttonmetrics.ButtonButtonsNumberApp.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def button_buttons_number_app_ctr(_):
-    return get_graph(buttonmetrics.ButtonButtonsNumberApp.get_id())
+def button_buttons_number_app_ctr(job_id):
+    return get_graph(buttonmetrics.ButtonButtonsNumberApp.get_id(), job_id)
 
 
 @app.callback(
     Output(buttonmetrics.ButtonAreaUCE.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def button_area_ctr(_):
-    return get_graph(buttonmetrics.ButtonAreaUCE.get_id())
+def button_area_ctr(job_id):
+    return get_graph(buttonmetrics.ButtonAreaUCE.get_id(), job_id)
 
 
 @app.callback(
     Output(buttonmetrics.ButtonAreaApp.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def button_area_App_ctr(_):
-    return get_graph(buttonmetrics.ButtonAreaApp.get_id())
+def button_area_App_ctr(job_id):
+    return get_graph(buttonmetrics.ButtonAreaApp.get_id(), job_id)
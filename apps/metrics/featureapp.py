@@ -23,5 +23,5 @@ layout = dbc.Container([
     Output(featuremetrics.FeatureNumber.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def feature_number_ctr(_):
-    return get_graph(featuremetrics.FeatureNumber.get_id())
+def feature_number_ctr(job_id):
+    return get_graph(featuremetrics.FeatureNumber.get_id(), job_id)
@@ -26,56 +26,56 @@ layout = dbc.Container([
     Output(modelmetrics.ModelNodesNumber.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def model_nodes_number_ctr(_):
-    return get_graph(modelmetrics.ModelNodesNumber.get_id())
+def model_nodes_number_ctr(job_id):
+    return get_graph(modelmetrics.ModelNodesNumber.get_id(), job_id)
 
 
 @app.callback(
     Output(modelmetrics.ModelEdgesNumber.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def model_edges_number_ctr(_):
-    return get_graph(modelmetrics.ModelEdgesNumber.get_id())
+def model_edges_number_ctr(job_id):
+    return get_graph(modelmetrics.ModelEdgesNumber.get_id(), job_id)
 
 
 @app.callback(
     Output(modelmetrics.ModelIndegree.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def model_indegree_ctr(_):
-    return get_graph(modelmetrics.ModelIndegree.get_id())
+def model_indegree_ctr(job_id):
+    return get_graph(modelmetrics.ModelIndegree.get_id(), job_id)
 
 
 @app.callback(
     Output(modelmetrics.ModelOutdegree.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def model_outdegree_ctr(_):
-    return get_graph(modelmetrics.ModelOutdegree.get_id())
+def model_outdegree_ctr(job_id):
+    return get_graph(modelmetrics.ModelOutdegree.get_id(), job_id)
 
 
 @app.callback(
     Output(modelmetrics.ModelNodeConnectivity.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def model_node_connectivity_ctr(_):
-    return get_graph(modelmetrics.ModelNodeConnectivity.get_id())
+def model_node_connectivity_ctr(job_id):
+    return get_graph(modelmetrics.ModelNodeConnectivity.get_id(), job_id)
 
 
 @app.callback(
     Output(modelmetrics.ModelEdgeConnectivity.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def model_edge_connectivity_ctr(_):
-    return get_graph(modelmetrics.ModelEdgeConnectivity.get_id())
+def model_edge_connectivity_ctr(job_id):
+    return get_graph(modelmetrics.ModelEdgeConnectivity.get_id(), job_id)
 
 
 @app.callback(
     Output(modelmetrics.ModelAvgGraphDepth.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def model_avg_graph_depth_ctr(_):
-    return get_graph(modelmetrics.ModelAvgGraphDepth.get_id())
+def model_avg_graph_depth_ctr(job_id):
+    return get_graph(modelmetrics.ModelAvgGraphDepth.get_id(), job_id)
 
 
 # @app.callback(
@@ -90,14 +90,14 @@ def model_avg_graph_depth_ctr(_):
     Output(modelmetrics.ModelAvgShortestPathLength.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def model_avg_shortest_path_length_ctr(_):
-    return get_graph(modelmetrics.ModelAvgShortestPathLength.get_id())
+def model_avg_shortest_path_length_ctr(job_id):
+    return get_graph(modelmetrics.ModelAvgShortestPathLength.get_id(), job_id)
 
 
 @app.callback(
     Output(modelmetrics.ModelDensity.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def model_density_ctr(_):
-    return get_graph(modelmetrics.ModelDensity.get_id())
+def model_density_ctr(job_id):
+    return get_graph(modelmetrics.ModelDensity.get_id(), job_id)
 
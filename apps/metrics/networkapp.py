@@ -38,69 +38,69 @@ layout = dbc.Container([
     Output(networkmetrics.NetworkRequestsNumberUCE.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def network_requests_number_uce_ctr(_):
-    return get_graph(networkmetrics.NetworkRequestsNumberUCE.get_id())
+def network_requests_number_uce_ctr(job_id):
+    return get_graph(networkmetrics.NetworkRequestsNumberUCE.get_id(), job_id)
 
 
 @app.callback(
     Output(networkmetrics.NetworkRequestsNumberApp.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def network_requests_number_app_ctr(_):
-    return get_graph(networkmetrics.NetworkRequestsNumberApp.get_id())
+def network_requests_number_app_ctr(job_id):
+    return get_graph(networkmetrics.NetworkRequestsNumberApp.get_id(), job_id)
 
 
 @app.callback(
     Output(networkmetrics.NetworkLatencyUCE.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def network_latency_uce_ctr(_):
-    return get_graph(networkmetrics.NetworkLatencyUCE.get_id())
+def network_latency_uce_ctr(job_id):
+    return get_graph(networkmetrics.NetworkLatencyUCE.get_id(), job_id)
 
 
 @app.callback(
     Output(networkmetrics.NetworkLatencyApp.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def network_latency_app_ctr(_):
-    return get_graph(networkmetrics.NetworkLatencyApp.get_id())
+def network_latency_app_ctr(job_id):
+    return get_graph(networkmetrics.NetworkLatencyApp.get_id(), job_id)
 
 
 @app.callback(
     Output(networkmetrics.NetworkNumberErrors.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def network_number_errors_ctr(_):
-    return get_graph(networkmetrics.NetworkNumberErrors.get_id())
+def network_number_errors_ctr(job_id):
+    return get_graph(networkmetrics.NetworkNumberErrors.get_id(), job_id)
 
 
 @app.callback(
     Output(networkmetrics.NetworkPayloadSizeRequestUCE.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def network_payload_size_request_uce_ctr(_):
-    return get_graph(networkmetrics.NetworkPayloadSizeRequestUCE.get_id())
+def network_payload_size_request_uce_ctr(job_id):
+    return get_graph(networkmetrics.NetworkPayloadSizeRequestUCE.get_id(), job_id)
 
 
 @app.callback(
     Output(networkmetrics.NetworkPayloadSizeRequestApp.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def network_payload_size_request_app_ctr(_):
-    return get_graph(networkmetrics.NetworkPayloadSizeRequestApp.get_id())
+def network_payload_size_request_app_ctr(job_id):
+    return get_graph(networkmetrics.NetworkPayloadSizeRequestApp.get_id(), job_id)
 
 
 @app.callback(
     Output(networkmetrics.NetworkPayloadSizeResponseUCE.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def network_payload_size_response_uce_ctr(_):
-    return get_graph(networkmetrics.NetworkPayloadSizeResponseUCE.get_id())
+def network_payload_size_response_uce_ctr(job_id):
+    return get_graph(networkmetrics.NetworkPayloadSizeResponseUCE.get_id(), job_id)
 
 
 @app.callback(
     Output(networkmetrics.NetworkPayloadSizeResponseApp.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def network_payload_size_response_app_ctr(_):
-    return get_graph(networkmetrics.NetworkPayloadSizeResponseApp.get_id())
+def network_payload_size_response_app_ctr(job_id):
+    return get_graph(networkmetrics.NetworkPayloadSizeResponseApp.get_id(), job_id)
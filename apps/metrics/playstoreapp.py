@@ -20,21 +20,21 @@ layout = dbc.Container([
     Output(playstoremetrics.PlayStoreRating.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def play_store_rating_ctr(_):
-    return get_graph(playstoremetrics.PlayStoreRating.get_id())
+def play_store_rating_ctr(job_id):
+    return get_graph(playstoremetrics.PlayStoreRating.get_id(), job_id)
 
 
 @app.callback(
     Output(playstoremetrics.PlayStoreReviewNumber.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def play_store_review_number_ctr(_):
-    return get_graph(playstoremetrics.PlayStoreReviewNumber.get_id())
+def play_store_review_number_ctr(job_id):
+    return get_graph(playstoremetrics.PlayStoreReviewNumber.get_id(), job_id)
 
 
 @app.callback(
     Output(playstoremetrics.PlayStoreInstallationNumber.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def play_store_review_number_ctr(_):
-    return get_graph(playstoremetrics.PlayStoreInstallationNumber.get_id())
+def play_store_review_number_ctr(job_id):
+    return get_graph(playstoremetrics.PlayStoreInstallationNumber.get_id(), job_id)
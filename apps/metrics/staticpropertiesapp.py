@@ -23,24 +23,24 @@ layout = dbc.Container([
     Output(staticmetrics.StaticPermissionsNumber.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def permissions_number_ctr(_):
-    return get_graph(staticmetrics.StaticPermissionsNumber.get_id())
+def permissions_number_ctr(job_id):
+    return get_graph(staticmetrics.StaticPermissionsNumber.get_id(), job_id)
 
 
 @app.callback(
     Output(staticmetrics.StaticPermissionsDistributionAmongApps.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def permissions_distribution_among_apps_ctr(_):
-    return get_graph(staticmetrics.StaticPermissionsDistributionAmongApps.get_id())
+def permissions_distribution_among_apps_ctr(job_id):
+    return get_graph(staticmetrics.StaticPermissionsDistributionAmongApps.get_id(), job_id)
 
 
 @app.callback(
     Output(staticmetrics.StaticAppPermissionsDistributionAmongPermissions.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def permissions_app_permissions_distribution_among_permissions_ctr(_):
-    return get_graph(staticmetrics.StaticAppPermissionsDistributionAmongPermissions.get_id())
+def permissions_app_permissions_distribution_among_permissions_ctr(job_id):
+    return get_graph(staticmetrics.StaticAppPermissionsDistributionAmongPermissions.get_id(), job_id)
 
 
 # @app.callback(
@@ -71,5 +71,5 @@ def permissions_app_permissions_distribution_among_permissions_ctr(_):
     Output(staticmetrics.StaticAdTrackingLibraryNumber.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def static_ad_tracking_library_number_ctr(_):
-    return get_graph(staticmetrics.StaticAdTrackingLibraryNumber.get_id())
+def static_ad_tracking_library_number_ctr(job_id):
+    return get_graph(staticmetrics.StaticAdTrackingLibraryNumber.get_id(), job_id)
@@ -28,13 +28,13 @@ layout = dbc.Container([
     Output(uimetrics.UIInteractableVisibleWidgetsNumber.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def ui_interactable_visible_widgets_number_ctr(_):
-    return get_graph(uimetrics.UIInteractableVisibleWidgetsNumber.get_id())
+def ui_interactable_visible_widgets_number_ctr(job_id):
+    return get_graph(uimetrics.UIInteractableVisibleWidgetsNumber.get_id(), job_id)
 
 
 @app.callback(
     Output(uuimetrics.UIInteractableVisibleWidgetsNumber.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def ui_interactable_visible_widgets_number_w_state_ctr(_):
-    return get_graph(uuimetrics.UIInteractableVisibleWidgetsNumber.get_id())
\ No newline at end of file
+def ui_interactable_visible_widgets_number_w_state_ctr(job_id):
+    return get_graph(uuimetrics.UIInteractableVisibleWidgetsNumber.get_id(), job_id)
\ No newline at end of file
@@ -26,5 +26,5 @@ layout = dbc.Container([
     Output(undesiredbehaviormetrics.UndesiredBehaviorCrashNumber.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def undesired_behavior_crash_number_ctr(_):
-    return get_graph(undesiredbehaviormetrics.UndesiredBehaviorCrashNumber.get_id())
+def undesired_behavior_crash_number_ctr(job_id):
+    return get_graph(undesiredbehaviormetrics.UndesiredBehaviorCrashNumber.get_id(), job_id)
@@ -32,29 +32,29 @@ layout = dbc.Container([
     Output(usecasemetrics.UseCaseLengthUseCaseExecutions.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def use_case_length_use_case_executions_ctr(_):
-    return get_graph(usecasemetrics.UseCaseLengthUseCaseExecutions.get_id())
+def use_case_length_use_case_executions_ctr(job_id):
+    return get_graph(usecasemetrics.UseCaseLengthUseCaseExecutions.get_id(), job_id)
 
 
 @app.callback(
     Output(usecasemetrics.UseCaseComputedUseCaseExecutionsNumber.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def use_case_computed_use_case_executions_number_ctr(_):
-    return get_graph(usecasemetrics.UseCaseComputedUseCaseExecutionsNumber.get_id())
+def use_case_computed_use_case_executions_number_ctr(job_id):
+    return get_graph(usecasemetrics.UseCaseComputedUseCaseExecutionsNumber.get_id(), job_id)
 
 
 @app.callback(
     Output(usecasemetrics.UseCaseVerifiedUseCaseExecutionsNumber.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def use_case_verified_use_case_executions_number_ctr(_):
-    return get_graph(usecasemetrics.UseCaseVerifiedUseCaseExecutionsNumber.get_id())
+def use_case_verified_use_case_executions_number_ctr(job_id):
+    return get_graph(usecasemetrics.UseCaseVerifiedUseCaseExecutionsNumber.get_id(), job_id)
 
 
 @app.callback(
     Output(usecasemetrics.UseCaseRatioVerifiedComputedUseCaseExecutionsNumber.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def use_case_ratio_computed_verified_use_case_executions_number_ctr(_):
-    return get_graph(usecasemetrics.UseCaseRatioVerifiedComputedUseCaseExecutionsNumber.get_id())
+def use_case_ratio_computed_verified_use_case_executions_number_ctr(job_id):
+    return get_graph(usecasemetrics.UseCaseRatioVerifiedComputedUseCaseExecutionsNumber.get_id(), job_id)
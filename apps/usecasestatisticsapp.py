@@ -18,5 +18,5 @@ layout = dbc.Container([
     Output(usecaseanalysis.UseCaseOverview.get_ui_loading_id(), 'children'),
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def analysis_use_case_overview_ctr(_):
-    return get_graph(usecaseanalysis.UseCaseOverview.get_id())
+def analysis_use_case_overview_ctr(job_id):
+    return get_graph(usecaseanalysis.UseCaseOverview.get_id(), job_id)
@@ -4,7 +4,7 @@ import dash_html_components as html
 import dash_bootstrap_components as dbc
 from dash.dependencies import Input, Output, State
 from app import app
-from apps.apputil import show_info, app_selection, ANALYSIS_FINISHED_CONTAINER
+from apps.apputil import show_info, app_selection, get_matrics, ANALYSIS_FINISHED_CONTAINER
 
 from metrics.ucecomparison import modelmetrics
 from metrics.ucecomparison.modelmetrics import ModelGraphs
@@ -41,12 +41,14 @@ layout = dbc.Container(id=VISUALIZATION_CONTAINER_2, children=[
 
 @app.callback(
     Output(MODEL_APP_HOME_STATE_GRAPH_DIV, 'children'),
-    [Input(SELECTION_MODEL_GRAPH_DIV_2, 'value')]
+    [Input(SELECTION_MODEL_GRAPH_DIV_2, 'value')],
+    [State(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def model_app_home_state_graph_ctr(app_selectionv):
+def model_app_home_state_graph_ctr(app_selectionv, job_id):
     model_html_children = []
-    if hasattr(app, 'matrics_'):
-        model_metrics: ModelGraphs = app.matrics_.model.model_accessors[modelmetrics.ModelGraphs.get_id()]
+    matrics = get_matrics(job_id)
+    if matrics is not None:
+        model_metrics: ModelGraphs = matrics.model.model_accessors[modelmetrics.ModelGraphs.get_id()]
         model_graphs = model_metrics.get_app_home_state_graphs()
         sel = app_selectionv
         model_graph = list(model_graphs.values())[0] if sel is None else model_graphs[sel]
@@ -63,10 +65,12 @@ def model_app_home_state_graph_ctr(app_selectionv):
 # @app.callback(
 #     Output(SIDE_NAVIGATION_INFO_BAR_CONTAINER, 'children'),
 #     [Input(graphviz.USE_CASE_BASE_DEFAULT_GRAPH_HTML_ID, 'selection')],
-#     [State(SELECTION_MODEL_GRAPH_DIV_2, 'value')])
-# def model_graph_selection_info_use_case_base_graph_ctr(selection_use_case_base, app_selectionv):
-#     if hasattr(app, 'matrics_') and app_selectionv is not None:
-#         return show_info(selection_use_case_base, app_selectionv)
+#     [State(SELECTION_MODEL_GRAPH_DIV_2, 'value'),
+#      State(ANALYSIS_FINISHED_CONTAINER, 'children')])
+# def model_graph_selection_info_use_case_base_graph_ctr(selection_use_case_base, app_selectionv, job_id):
+#     matrics = get_matrics(job_id)
+#     if matrics is not None and app_selectionv is not None:
+#         return show_info(selection_use_case_base, app_selectionv, matrics)
 #     return None
 
 
@@ -76,9 +80,9 @@ def model_app_home_state_graph_ctr(app_selectionv):
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children'),
      Input(VISUALIZATION_CONTAINER_2, 'children')]
 )
-def app_selection_ctr(apps_overview, _):
+def app_selection_ctr(job_id, _):
     """
     Dropdown options.
     We need the input parameter USE_CASE_VISUALIZATION_CONTAINER to enable the proper reload when refreshing the page.
     """
-    return app_selection()
+    return app_selection(job_id)
@@ -4,7 +4,7 @@ import dash_html_components as html
 import dash_bootstrap_components as dbc
 from dash.dependencies import Input, Output, State
 from app import app
-from apps.apputil import show_info, app_selection, ANALYSIS_FINISHED_CONTAINER
+from apps.apputil import show_info, app_selection, get_matrics, ANALYSIS_FINISHED_CONTAINER
 
 from metrics.ucecomparison import modelmetrics
 from metrics.ucecomparison.modelmetrics import ModelGraphs
@@ -49,12 +49,14 @@ layout = dbc.Container(id=USE_CASE_VISUALIZATION_CONTAINER, children=[
 
 @app.callback(
     Output(MODEL_USE_CASE_BASE_GRAPH_DIV, 'children'),
-    [Input(SELECTION_MODEL_GRAPH_DIV, 'value')]
+    [Input(SELECTION_MODEL_GRAPH_DIV, 'value')],
+    [State(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def model_use_case_base_graph_ctr(app_selectionv):
+def model_use_case_base_graph_ctr(app_selectionv, job_id):
     model_html_children = []
-    if hasattr(app, 'matrics_'):
-        model_metrics: ModelGraphs = app.matrics_.model.model_accessors[modelmetrics.ModelGraphs.get_id()]
+    matrics = get_matrics(job_id)
+    if matrics is not None:
+        model_metrics: ModelGraphs = matrics.model.model_accessors[modelmetrics.ModelGraphs.get_id()]
         model_graphs = model_metrics.get_use_case_base_graphs()
         sel = app_selectionv
         model_graph = list(model_graphs.values())[0] if sel is None else model_graphs[sel]
@@ -68,12 +70,14 @@ def model_use_case_base_graph_ctr(app_selectionv):
 
 @app.callback(
     Output(MODEL_USE_CASE_BASE_TRANSFORMED_GRAPH_DIV, 'children'),
-    [Input(SELECTION_MODEL_GRAPH_DIV, 'value')]
+    [Input(SELECTION_MODEL_GRAPH_DIV, 'value')],
+    [State(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def model_use_case_base_transformed_graph_ctr(app_selectionv):
+def model_use_case_base_transformed_graph_ctr(app_selectionv, job_id):
     model_html_children = []
-    if hasattr(app, 'matrics_'):
-        model_metrics: ModelGraphs = app.matrics_.model.model_accessors[modelmetrics.ModelGraphs.get_id()]
+    matrics = get_matrics(job_id)
+    if matrics is not None:
+        model_metrics: ModelGraphs = matrics.model.model_accessors[modelmetrics.ModelGraphs.get_id()]
         model_graphs = model_metrics.plot_use_case_base_transformed_graph()
         sel = app_selectionv
         model_graph = list(model_graphs.values())[0] if sel is None else model_graphs[sel]
@@ -87,12 +91,14 @@ def model_use_case_base_transformed_graph_ctr(app_selectionv):
 
 @app.callback(
     Output(MODEL_USE_CASE_BASE_UNMODIFIED_GRAPH_DIV, 'children'),
-    [Input(SELECTION_MODEL_GRAPH_DIV, 'value')]
+    [Input(SELECTION_MODEL_GRAPH_DIV, 'value')],
+    [State(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def model_use_case_base_unmodified_graph_ctr(app_selectionv):
+def model_use_case_base_unmodified_graph_ctr(app_selectionv, job_id):
     model_html_children = []
-    if hasattr(app, 'matrics_'):
-        model_metrics: ModelGraphs = app.matrics_.model.model_accessors[modelmetrics.ModelGraphs.get_id()]
+    matrics = get_matrics(job_id)
+    if matrics is not None:
+        model_metrics: ModelGraphs = matrics.model.model_accessors[modelmetrics.ModelGraphs.get_id()]
         model_graphs = model_metrics.plot_use_case_base_unmodified_graph()
         sel = app_selectionv
         model_graph = list(model_graphs.values())[0] if sel is None else model_graphs[sel]
@@ -106,12 +112,14 @@ def model_use_case_base_unmodified_graph_ctr(app_selectionv):
 
 @app.callback(
     Output(MODEL_USE_CASE_EXECUTIONS_CONTAINER, 'children'),
-    [Input(SELECTION_MODEL_GRAPH_DIV, 'value')]
+    [Input(SELECTION_MODEL_GRAPH_DIV, 'value')],
+    [State(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def use_case_execution_graphs_ctr(app_selectionv):
+def use_case_execution_graphs_ctr(app_selectionv, job_id):
     use_case_execution_html_children = []
-    if hasattr(app, 'matrics_'):
-        model_metrics: ModelGraphs = app.matrics_.model.model_accessors[modelmetrics.ModelGraphs.get_id()]
+    matrics = get_matrics(job_id)
+    if matrics is not None:
+        model_metrics: ModelGraphs = matrics.model.model_accessors[modelmetrics.ModelGraphs.get_id()]
         sel = app_selectionv
         use_case_executions_graphs = model_metrics.plot_use_case_executions()
         use_case_execution_html_children = list(use_case_executions_graphs.values())[0] if sel is None else use_case_executions_graphs[sel]
@@ -123,10 +131,12 @@ def use_case_execution_graphs_ctr(app_selectionv):
 @app.callback(
     Output(SIDE_NAVIGATION_INFO_BAR_CONTAINER, 'children'),
     [Input(graphviz.USE_CASE_BASE_DEFAULT_GRAPH_HTML_ID, 'selection')],
-    [State(SELECTION_MODEL_GRAPH_DIV, 'value')])
-def model_graph_selection_info_use_case_base_graph_ctr(selection_use_case_base, app_selectionv):
-    if hasattr(app, 'matrics_') and app_selectionv is not None:
-        return show_info(selection_use_case_base, app_selectionv)
+    [State(SELECTION_MODEL_GRAPH_DIV, 'value'),
+     State(ANALYSIS_FINISHED_CONTAINER, 'children')])
+def model_graph_selection_info_use_case_base_graph_ctr(selection_use_case_base, app_selectionv, job_id):
+    matrics = get_matrics(job_id)
+    if matrics is not None and app_selectionv is not None:
+        return show_info(selection_use_case_base, app_selectionv, matrics)
     return None
 
 
@@ -136,9 +146,9 @@ def model_graph_selection_info_use_case_base_graph_ctr(selection_use_case_base,
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children'),
      Input(USE_CASE_VISUALIZATION_CONTAINER, 'children')]
 )
-def app_selection_ctr(apps_overview, _):
+def app_selection_ctr(job_id, _):
     """
     Dropdown options.
     We need the input parameter USE_CASE_VISUALIZATION_CONTAINER to enable the proper reload when refreshing the page.
     """
-    return app_selection()
+    return app_selection(job_id)
@@ -4,7 +4,7 @@ import dash_html_components as html
 import dash_bootstrap_components as dbc
 from dash.dependencies import Input, Output, State
 from app import app
-from apps.apputil import show_info, app_selection, ANALYSIS_FINISHED_CONTAINER
+from apps.apputil import show_info, app_selection, get_matrics, ANALYSIS_FINISHED_CONTAINER
 
 from metrics.ucecomparison import modelmetrics
 from visualization import graphviz
@@ -37,12 +37,14 @@ layout = dbc.Container(id=VISUALIZATION_CONTAINER, children=[
 
 @app.callback(
     Output(MODEL_GRAPH_DIV, 'children'),
-    [Input(SELECTION_MODEL_GRAPH_DIV, 'value')]
+    [Input(SELECTION_MODEL_GRAPH_DIV, 'value')],
+    [State(ANALYSIS_FINISHED_CONTAINER, 'children')]
 )
-def model_graph_overall_ctr(app_selectionv):
+def model_graph_overall_ctr(app_selectionv, job_id):
     model_html_children = []
-    if hasattr(app, 'matrics_'):
-        model_metrics = app.matrics_.model.model_accessors[modelmetrics.ModelGraphs.get_id()]
+    matrics = get_matrics(job_id)
+    if matrics is not None:
+        model_metrics = matrics.model.model_accessors[modelmetrics.ModelGraphs.get_id()]
         model_graphs = model_metrics.plot()
         sel = app_selectionv
         model_graph = list(model_graphs.values())[0] if sel is None else model_graphs[sel]
@@ -57,10 +59,12 @@ def model_graph_overall_ctr(app_selectionv):
 @app.callback(
     Output(SIDE_NAVIGATION_INFO_BAR_CONTAINER, 'children'),
     [Input(graphviz.OVERALL_GRAPH_HTML_ID, 'selection')],
-    [State(SELECTION_MODEL_GRAPH_DIV, 'value')])
-def model_graph_selection_info_ctr(selection, app_selectionv):
-    if hasattr(app, 'matrics_') and app_selectionv is not None:
-        return show_info(selection, app_selectionv)
+    [State(SELECTION_MODEL_GRAPH_DIV, 'value'),
+     State(ANALYSIS_FINISHED_CONTAINER, 'children')])
+def model_graph_selection_info_ctr(selection, app_selectionv, job_id):
+    matrics = get_matrics(job_id)
+    if matrics is not None and app_selectionv is not None:
+        return show_info(selection, app_selectionv, matrics)
     return None
 
 
@@ -70,9 +74,9 @@ def model_graph_selection_info_ctr(selection, app_selectionv):
     [Input(ANALYSIS_FINISHED_CONTAINER, 'children'),
      Input(VISUALIZATION_CONTAINER, 'children')]
 )
-def app_selection_ctr(apps_overview, _):
+def app_selection_ctr(job_id, _):
     """
     Dropdown options.
     We need the input parameter VISUALIZATION_CONTAINER to enable the proper reload when refreshing the page.
     """
-    return app_selection()
+    return app_selection(job_id)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import collections
+from typing import Iterator, List, Tuple
+
+from datatypes.packedhash import hamming_distance
+
+
+class HammingIndex(object):
+    """
+    Multi-index hashing of fixed size integer hashes for finding all pairs within a Hamming distance.
+
+    The bits are split into radius + 1 blocks. Two hashes within the radius differ in at most radius blocks, so
+    they are equal in at least one block. Only hashes sharing a block value are compared, which is roughly linear
+    for hashes that are not all alike.
+    """
+
+    def __init__(self, radius, bits=64):
+        assert 0 <= radius < bits, f"Unexpected radius {radius} for {bits} bits"
+        self.radius = radius
+        self.hashes = []
+        # (offset, mask) of every block
+        self.blocks = []
+        number_of_blocks = radius + 1
+        offset = 0
+        for i in range(number_of_blocks):
+            size = bits // number_of_blocks + (1 if i < bits % number_of_blocks else 0)
+            self.blocks.append((offset, (1 << size) - 1))
+            offset += size
+        self.tables = [collections.defaultdict(list) for _ in self.blocks]
+
+    def add(self, h: int) -> int:
+        """
+        :return: The index of the hash.
+        """
+        idx = len(self.hashes)
+        self.hashes.append(h)
+        for table, (offset, mask) in zip(self.tables, self.blocks):
+            table[(h >> offset) & mask].append(idx)
+        return idx
+
+    def query(self, h: int) -> List[int]:
+        """
+        :return: The indices of all hashes within the radius in ascending order.
+        """
+        candidates = set()
+        for table, (offset, mask) in zip(self.tables, self.blocks):
+            candidates.update(table.get((h >> offset) & mask, ()))
+        return sorted(idx for idx in candidates if hamming_distance(self.hashes[idx], h) <= self.radius)
+
+    def pairs(self) -> Iterator[Tuple[int, int]]:
+        """
+        :return: All pairs (i, j) with i < j of hashes within the radius.
+        """
+        for i, h in enumerate(self.hashes):
+            candidates = set()
+            for table, (offset, mask) in zip(self.tables, self.blocks):
+                candidates.update(j for j in table[(h >> offset) & mask] if j > i)
+            for j in sorted(candidates):
+                if hamming_distance(self.hashes[j], h) <= self.radius:
+                    yield i, j
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+from typing import Iterable
+
+import numpy as np
+
+
+# Number of set bits of every byte value
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+# Upper bound of the number of uint64 entries of an intermediate array of distance_matrix
+MAX_DISTANCE_BLOCK_SIZE = 1 << 20
+
+
+def hamming_distance(hash_1: int, hash_2: int) -> int:
+    return bin(hash_1 ^ hash_2).count("1")
+
+
+def to_array(hashes: Iterable) -> np.ndarray:
+    """
+    :param hashes: Integer hashes of at most 64 bits or PackedHash objects.
+    """
+    return np.array([int(h) for h in hashes], dtype=np.uint64)
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """
+    :return: Number of set bits of every entry of an uint64 array.
+    """
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    return POPCOUNT_TABLE[values.view(np.uint8)].reshape(values.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def distance_matrix(hashes_1, hashes_2) -> np.ndarray:
+    """
+    Hamming distances of N hashes to M hashes.
+
+    :return: N x M uint8 array.
+    """
+    hashes_1 = hashes_1 if isinstance(hashes_1, np.ndarray) else to_array(hashes_1)
+    hashes_2 = hashes_2 if isinstance(hashes_2, np.ndarray) else to_array(hashes_2)
+    distances = np.empty((len(hashes_1), len(hashes_2)), dtype=np.uint8)
+    # Rows are computed in blocks to bound the memory of the intermediate arrays
+    rows = max(1, MAX_DISTANCE_BLOCK_SIZE // max(1, len(hashes_2)))
+    for start in range(0, len(hashes_1), rows):
+        distances[start:start + rows] = popcount(np.bitwise_xor(hashes_1[start:start + rows, None], hashes_2[None, :]))
+    return distances
+
+
+class PackedHash(object):
+    """
+    Binary hash packed into an integer, e.g. the average hash or pHash of an image. The bits are in row major
+    order of the hash matrix, most significant bit first like the hex string of imagehash. The batch operations
+    require hashes of at most 64 bits.
+    """
+
+    __slots__ = ('value', 'bits')
+
+    def __init__(self, value: int, bits=64):
+        assert bits > 0, f"Unexpected number of bits {bits}"
+        self.value = value
+        self.bits = bits
+
+    @staticmethod
+    def from_bool_array(binary_array) -> 'PackedHash':
+        flat = np.asarray(binary_array, dtype=bool).flatten()
+        return PackedHash(int.from_bytes(np.packbits(flat).tobytes(), 'big') >> (-len(flat) % 8), len(flat))
+
+    @staticmethod
+    def from_hex(hex_str, bits=None) -> 'PackedHash':
+        return PackedHash(int(hex_str, 16), len(hex_str) * 4 if bits is None else bits)
+
+    def to_bool_array(self) -> np.ndarray:
+        bits = np.unpackbits(np.frombuffer((self.value << (-self.bits % 8)).to_bytes((self.bits + 7) // 8, 'big'),
+                                           dtype=np.uint8))
+        return bits[:self.bits].astype(bool)
+
+    def __int__(self):
+        return self.value
+
+    def __str__(self):
+        return '{:0>{width}x}'.format(self.value, width=(self.bits + 3) // 4)
+
+    def __repr__(self):
+        return f"PackedHash({self})"
+
+    def __sub__(self, other):
+        if other is None:
+            raise TypeError('Other hash must not be None.')
+        if self.bits != other.bits:
+            raise TypeError('Hashes must be of the same size.', self.bits, other.bits)
+        return hamming_distance(self.value, other.value)
+
+    def __eq__(self, other):
+        if not isinstance(other, PackedHash):
+            return False
+        return self.value == other.value and self.bits == other.bits
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.value)
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+
+class UnionFind(object):
+    """
+    Disjoint sets of the elements 0..n-1. The representative of a set is always its smallest element, so
+    merging is independent of the order of the unions.
+    """
+
+    def __init__(self, n):
+        self.parents = list(range(n))
+
+    def find(self, x) -> int:
+        root = x
+        while self.parents[root] != root:
+            root = self.parents[root]
+        # Path compression
+        while self.parents[x] != root:
+            self.parents[x], x = root, self.parents[x]
+        return root
+
+    def union(self, x, y) -> None:
+        root_x = self.find(x)
+        root_y = self.find(y)
+        if root_x < root_y:
+            self.parents[root_y] = root_x
+        elif root_y < root_x:
+            self.parents[root_x] = root_y
@@ -7,6 +7,7 @@ from typing import List, Optional
 import networkx as nx
 
 from datatypes.orderedset import OrderedSet
+from graph.shortestpathindex import ShortestPathIndex
 from graph.transformer.visualsimilaritymerger import VisualSimilarityMerger
 from model.state import State
 from usecaseclassification.tsequence import TSequence
@@ -21,6 +22,7 @@ class Graph(object):
         self.home_state = home_state
         self.filter_not_connected_subgraphs = filter_not_connected_subgraphs
         self.networkx_graph, self.states, self.transitions = self.construct_networkx_graph(states, transitions)
+        self.shortest_path_index: Optional[ShortestPathIndex] = None
         self.sequence = TSequence.construct_from_transitions(self.transitions)
         self.app_home_states: List[State] = []
         self.merger: Optional[VisualSimilarityMerger] = None
@@ -47,31 +49,21 @@ class Graph(object):
         transitions = []
         transitions_unique_set = set()
         if self.filter_not_connected_subgraphs:
+            # Compute the states reachable from the home state once
+            reachable = nx.descendants(G, home_state_id)
+            reachable.add(home_state_id)
             for trans in transitions_orig:
-                source_state_id = trans.source_state_o.unique_id
-                resulting_state_id = trans.resulting_state_o.unique_id
-
-                if G.has_node(source_state_id):
-                    if nx.has_path(G, source=home_state_id, target=source_state_id):
-                        # Check if the transition already exists, we want to filter duplicates
-                        trans_str = f"{trans.source_state} {trans.resulting_state} {trans.interacted_widget} {trans.action}"
-                        if trans_str not in transitions_unique_set:
-                            transitions_unique_set.add(trans_str)
-                            transitions.append(trans)
-                    else:
-                        G.remove_node(source_state_id)
-                        states.remove(trans.source_state_o)
-                if G.has_node(resulting_state_id):
-                    if not nx.has_path(G, source=home_state_id, target=resulting_state_id):
-                        G.remove_node(resulting_state_id)
-                        states.remove(trans.resulting_state_o)
-
-            # We have to remove single unconnected states. I am missing something in the previous step, I don't
-            # know what it is.
-            states_copy = OrderedSet(s for s in states)
-            for state in states_copy:
-                if not nx.has_path(G, source=home_state_id, target=state.unique_id):
-                    states.remove(state)
+                if trans.source_state_o.unique_id in reachable:
+                    # Check if the transition already exists, we want to filter duplicates
+                    trans_str = f"{trans.source_state} {trans.resulting_state} {trans.interacted_widget} {trans.action}"
+                    if trans_str not in transitions_unique_set:
+                        transitions_unique_set.add(trans_str)
+                        transitions.append(trans)
+
+            # Unreachable states that are not connected to any transition are kept as nodes in the networkx graph
+            G.remove_nodes_from([node for node in G.nodes if node not in reachable and G.degree(node) > 0])
+            for state in [s for s in states if s.unique_id not in reachable]:
+                states.remove(state)
         else:
             states = states_orig
             transitions = transitions_orig
@@ -107,6 +99,7 @@ class Graph(object):
             G.add_node(state.unique_id, object=state)
 
         self.networkx_graph = G
+        self.shortest_path_index = None
         self.sequence = TSequence.construct_from_transitions(self.transitions)
 
         assert len(self.states) == len(self.networkx_graph.nodes),\
@@ -166,14 +159,19 @@ class Graph(object):
         """
         return nx.average_shortest_path_length(G=nx.DiGraph(self.networkx_graph).to_undirected())
 
+    def get_shortest_path_index(self) -> ShortestPathIndex:
+        if self.shortest_path_index is None:
+            self.shortest_path_index = ShortestPathIndex(self.networkx_graph)
+        return self.shortest_path_index
+
     def shortest_path_length(self, src: str, target: str):
-        return nx.shortest_path_length(G=self.networkx_graph, source=src, target=target)
+        return self.get_shortest_path_index().shortest_path_length(src, target)
 
     def has_node(self, node: str) -> bool:
         return self.networkx_graph.has_node(node)
 
     def has_path(self, src: str, target: str):
-        return nx.has_path(G=self.networkx_graph, source=src, target=target)
+        return self.get_shortest_path_index().has_path(src, target)
 
     def indegree_graph(self) -> float:
         """
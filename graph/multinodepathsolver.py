@@ -1,18 +1,19 @@
 # -*- coding: utf-8 -*-
-import itertools
-from functools import lru_cache
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 
 import networkx as nx
 
 import metadata
 from graph.baseoptimalpath import BaseOptimalPath
 from graph.path import Path
+from graph.shortestpathindex import ShortestPathIndex
 from metadata import MetaData
 from model.atd import ATD
 from model.transition import Transition
 
-MAX_COMBINATIONS = 10000
+# Up to this number of transitions the ordering is computed by dynamic programming over subsets, above by
+# branch and bound
+MAX_DP_TRANSITIONS = 12
 
 
 class MultiNodePathSolver(BaseOptimalPath):
@@ -23,10 +24,9 @@ class MultiNodePathSolver(BaseOptimalPath):
         self.exploration_model = exploration_model
         self.use_case_path_exclusion_criterion = use_case_path_exclusion_criterion
         self.base_use_case_networkx_graph: nx.DiGraph = self.exploration_model.use_case_base_graph.networkx_graph
-        # Nice idea, but super annoying to handle
-        # fw = nx.floyd_warshall_predecessor_and_distance(self.networkx_g)
-        # self.floyd_warshall_matrix_pred = fw[0]
-        # self.floyd_warshall_matrix_dist = fw[1]
+        # Shared with the use case base graph, all permutations query the same node pairs
+        self.shortest_path_index: ShortestPathIndex = self.exploration_model.use_case_base_graph.get_shortest_path_index()
+        self.accepted_distances = {}
 
     def _find_path(self, start_node, transitions: List[Transition], atds: List[ATD]):
         # Check at first, if there is a path connecting all nodes
@@ -96,23 +96,145 @@ class MultiNodePathSolver(BaseOptimalPath):
 
     def find_path(self, transitions_w_atds_ls: List[Tuple[Transition, ATD]], start_node):
         """
-        Find path by transitions.
+        Find the shortest path through all transitions in any order.
         """
         assert transitions_w_atds_ls, "Expected transitions to be greater than 0"
-        paths = []
+        ordering = self.find_ordering([tple[0] for tple in transitions_w_atds_ls], start_node)
+        if ordering is None:
+            return None
+        transitions: List[Transition] = [transitions_w_atds_ls[i][0] for i in ordering]
+        atds: List[ATD] = [transitions_w_atds_ls[i][1] for i in ordering]
+        path = self._find_path(start_node, transitions, atds)
+        assert path is not None, f"Expected a path for the ordering {ordering}"
+        return path
+
+    def find_ordering(self, transitions: List[Transition], start_node) -> Optional[Tuple[int, ...]]:
+        """
+        Computes the order of the transitions resulting in the best path without constructing the paths.
+
+        The length of a path of n transitions is 2 + sum(dist(t_i.resulting_state, t_i+1.source_state) + 1)
+        and paths of the same length are ordered by the distance from the start node to the first transition,
+        see Path.__lt__. Of equally good orderings the lexicographically smallest one is returned, which is the
+        first one in permutation order.
+
+        :return: The indices of the transitions in path order or None if there is no accepted path.
+        """
+        n = len(transitions)
+        start_dists = [self.get_accepted_distance(start_node, trans.source_state, from_home_state=True)
+                       for trans in transitions]
+        gaps = [[self.get_accepted_distance(trans1.resulting_state, trans2.source_state) if i != j else None
+                 for j, trans2 in enumerate(transitions)]
+                for i, trans1 in enumerate(transitions)]
+        if n <= MAX_DP_TRANSITIONS:
+            return MultiNodePathSolver.find_ordering_dp(start_dists, gaps)
+        else:
+            return MultiNodePathSolver.find_ordering_branch_and_bound(start_dists, gaps)
+
+    def get_ordering_rank(self, transitions: List[Transition], ordering: Tuple[int, ...], start_node) -> Tuple[int, int]:
+        """
+        :return: The actual length of the path of the ordered transitions and the distance from the start node,
+        see find_ordering.
+        """
+        length = 2
+        for i in range(len(ordering) - 1):
+            length += self.get_accepted_distance(transitions[ordering[i]].resulting_state,
+                                                 transitions[ordering[i + 1]].source_state) + 1
+        return length, self.get_accepted_distance(start_node, transitions[ordering[0]].source_state, from_home_state=True)
+
+    def get_accepted_distance(self, node1, node2, from_home_state=False) -> Optional[int]:
+        """
+        :return: The distance between the nodes or None if there is no path or the path is excluded.
+        """
+        key = (node1, node2, from_home_state)
+        if key in self.accepted_distances:
+            return self.accepted_distances[key]
+        dist = None
+        if self.has_path(node1, node2):
+            shortest_p = self.shortest_path(node1=node1, node2=node2)
+            if not self.use_case_path_exclusion_criterion.decide(shortest_p, from_home_state=from_home_state):
+                dist = len(shortest_p) - 1
+        self.accepted_distances[key] = dist
+        return dist
+
+    @staticmethod
+    def find_ordering_dp(start_dists: List[Optional[int]], gaps: List[List[Optional[int]]]) -> Optional[Tuple[int, ...]]:
+        """
+        Held-Karp dynamic programming over the subsets of transitions. For every subset and last transition
+        the best (length, start distance, ordering) prefix is kept.
+        """
+        n = len(start_dists)
+        best = {}
+        for i in range(n):
+            if start_dists[i] is not None:
+                best[(1 << i, i)] = (2, start_dists[i], (i,))
+        # Subsets only grow, so every subset is final when it is expanded
+        for mask in range(1, 1 << n):
+            for last in range(n):
+                entry = best.get((mask, last))
+                if entry is None:
+                    continue
+                length, start_dist, ordering = entry
+                for nxt in range(n):
+                    dist = gaps[last][nxt]
+                    if mask & (1 << nxt) or dist is None:
+                        continue
+                    candidate = (length + dist + 1, start_dist, ordering + (nxt,))
+                    key = (mask | (1 << nxt), nxt)
+                    current = best.get(key)
+                    if current is None or candidate < current:
+                        best[key] = candidate
+        full_mask = (1 << n) - 1
+        candidates = [best[(full_mask, last)] for last in range(n) if (full_mask, last) in best]
+        return min(candidates)[2] if candidates else None
+
+    @staticmethod
+    def find_ordering_branch_and_bound(start_dists: List[Optional[int]],
+                                       gaps: List[List[Optional[int]]]) -> Optional[Tuple[int, ...]]:
+        """
+        Depth first search in permutation order. A prefix is pruned if the length of the prefix plus the
+        shortest incoming gap of every remaining transition cannot beat the best ordering found so far.
+        """
+        n = len(start_dists)
+        min_incoming = [min((gaps[i][j] for i in range(n) if gaps[i][j] is not None), default=None)
+                        for j in range(n)]
+        best = None
+        ordering = []
+        visited = [False] * n
 
-        permutations = itertools.permutations(transitions_w_atds_ls, )
-        for perm in itertools.islice(permutations, 0, MAX_COMBINATIONS):
-            # Create one list with the start node as head
-            transitions: List[Transition] = [tple[0] for tple in perm]
-            atds: List[ATD] = [tple[1] for tple in perm]
-            path = self._find_path(start_node, transitions, atds)
-            if path is not None:
-                paths.append(path)
+        def search(length, start_dist):
+            nonlocal best
+            remaining = [j for j in range(n) if not visited[j]]
+            if not remaining:
+                if best is None or (length, start_dist) < best[:2]:
+                    best = (length, start_dist, tuple(ordering))
+                return
+            lower_bound = length
+            for j in remaining:
+                if min_incoming[j] is None:
+                    return
+                lower_bound += min_incoming[j] + 1
+            # Orderings found later are lexicographically larger, so equally good ones can be pruned
+            if best is not None and (lower_bound, start_dist) >= best[:2]:
+                return
+            last = ordering[-1]
+            for j in remaining:
+                dist = gaps[last][j]
+                if dist is None:
+                    continue
+                visited[j] = True
+                ordering.append(j)
+                search(length + dist + 1, start_dist)
+                ordering.pop()
+                visited[j] = False
 
-        paths.sort()
-        # Return the best path if possible in terms of length
-        return paths[0] if paths else None
+        for i in range(n):
+            if start_dists[i] is not None:
+                visited[i] = True
+                ordering.append(i)
+                search(2, start_dists[i])
+                ordering.pop()
+                visited[i] = False
+        return None if best is None else best[2]
 
     def path_exist(self, transitions, start_node):
         assert transitions
@@ -132,10 +254,8 @@ class MultiNodePathSolver(BaseOptimalPath):
 
         return True
 
-    @lru_cache(maxsize=4096)
     def has_path(self, node1, node2):
-        return nx.has_path(self.base_use_case_networkx_graph, source=node1, target=node2)
+        return self.shortest_path_index.has_path(node1, node2)
 
-    @lru_cache(maxsize=4096)
     def shortest_path(self, node1, node2):
-        return nx.shortest_path(self.base_use_case_networkx_graph, source=node1, target=node2)
+        return self.shortest_path_index.shortest_path(node1, node2)
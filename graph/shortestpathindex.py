@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+from typing import List
+
+import networkx as nx
+
+
+class ShortestPathIndex(object):
+    """
+    Reachability and shortest path index of an unweighted networkx graph. The breadth first search of a
+    source node is computed once on first use and its predecessor and distance maps are kept. Path existence
+    and distance checks are O(1) afterwards, a shortest path is reconstructed in O(path length).
+
+    The index has to be recreated if the graph changes.
+    """
+
+    def __init__(self, networkx_graph: nx.DiGraph):
+        self.networkx_graph = networkx_graph
+        self.source_predecessors = {}
+        self.source_distances = {}
+
+    def _search(self, source):
+        predecessors = self.source_predecessors.get(source)
+        if predecessors is None:
+            if source not in self.networkx_graph:
+                raise nx.NodeNotFound(f"Source {source} is not in G")
+            adj = self.networkx_graph.adj
+            predecessors = {source: None}
+            distances = {source: 0}
+            frontier = [source]
+            dist = 0
+            while frontier:
+                dist += 1
+                next_frontier = []
+                for node in frontier:
+                    for succ in adj[node]:
+                        if succ not in predecessors:
+                            predecessors[succ] = node
+                            distances[succ] = dist
+                            next_frontier.append(succ)
+                frontier = next_frontier
+            self.source_predecessors[source] = predecessors
+            self.source_distances[source] = distances
+        return predecessors
+
+    def _check_target(self, target):
+        if target not in self.networkx_graph:
+            raise nx.NodeNotFound(f"Target {target} is not in G")
+
+    def has_path(self, source, target) -> bool:
+        self._check_target(target)
+        return target in self._search(source)
+
+    def shortest_path_length(self, source, target) -> int:
+        self._check_target(target)
+        self._search(source)
+        distances = self.source_distances[source]
+        if target not in distances:
+            raise nx.NetworkXNoPath(f"No path between {source} and {target}.")
+        return distances[target]
+
+    def shortest_path(self, source, target) -> List:
+        self._check_target(target)
+        predecessors = self._search(source)
+        if target not in predecessors:
+            raise nx.NetworkXNoPath(f"No path between {source} and {target}.")
+        path = [target]
+        node = predecessors[target]
+        while node is not None:
+            path.append(node)
+            node = predecessors[node]
+        path.reverse()
+        return path
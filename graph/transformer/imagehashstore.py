@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+import multiprocessing as mp
+import os
+import struct
+from typing import Dict, Optional, Tuple
+
+import imagehash
+from PIL import Image
+
+from datatypes.packedhash import PackedHash
+from util import configutil
+
+
+ANDROID_BAR_HEIGHT = 80
+
+# Header: magic and format version. Record: length of the file name, file name, size, modification time,
+# average hash and pHash.
+_HEADER = struct.Struct("<4sH")
+_MAGIC = b"MIHS"
+_FORMAT_VERSION = 1
+_NAME_LENGTH = struct.Struct("<H")
+_RECORD = struct.Struct("<qqQQ")
+
+
+def image_crop(image_path):
+    """
+    Crops the Android bar.
+    1440 × 2560
+    """
+    img = Image.open(image_path)
+    width, height = img.size
+    area = (0, ANDROID_BAR_HEIGHT, width, height)
+    return img.crop(area)
+
+
+def hash_to_int(image_hash: imagehash.ImageHash) -> int:
+    return PackedHash.from_bool_array(image_hash.hash).value
+
+
+def compute_image_hashes(image_path) -> Tuple[int, int]:
+    """
+    :return: Average hash and pHash of the cropped image as 64 bit integers.
+    """
+    cropped_img = image_crop(image_path)
+    return hash_to_int(imagehash.average_hash(cropped_img)), hash_to_int(imagehash.phash(cropped_img))
+
+
+class ImageHashStore(object):
+    """
+    Persistent average hash and pHash of the images of a directory. The hashes are kept in a compact binary
+    file in the image directory and an entry is only valid as long as size and modification time of its image
+    are unchanged, so an image is only decoded once to hash it.
+    """
+
+    def __init__(self, image_dir):
+        self.image_dir = image_dir
+        self.file = os.path.join(image_dir, configutil.IMAGE_HASH_STORE_FILE_NAME)
+        # File name -> (size, modification time, average hash, pHash)
+        self.entries = {}
+        self.modified = False
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.file, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+        if len(data) < _HEADER.size or _HEADER.unpack_from(data) != (_MAGIC, _FORMAT_VERSION):
+            return
+        offset = _HEADER.size
+        try:
+            while offset < len(data):
+                name_length, = _NAME_LENGTH.unpack_from(data, offset)
+                offset += _NAME_LENGTH.size
+                name = data[offset:offset + name_length].decode("utf-8")
+                offset += name_length
+                self.entries[name] = _RECORD.unpack_from(data, offset)
+                offset += _RECORD.size
+        except (struct.error, UnicodeDecodeError) as e:
+            # A truncated file only loses its last entries
+            print(f"Could not read image hash store {self.file}: {e}")
+
+    def save(self) -> None:
+        if not self.modified:
+            return
+        chunks = [_HEADER.pack(_MAGIC, _FORMAT_VERSION)]
+        for name, record in self.entries.items():
+            encoded_name = name.encode("utf-8")
+            chunks.append(_NAME_LENGTH.pack(len(encoded_name)))
+            chunks.append(encoded_name)
+            chunks.append(_RECORD.pack(*record))
+        tmp_file = f"{self.file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_file, 'wb') as f:
+                f.write(b"".join(chunks))
+            os.replace(tmp_file, self.file)
+        except OSError as e:
+            print(f"Could not write image hash store {self.file}: {e}")
+            return
+        self.modified = False
+
+    def get(self, image_path) -> Optional[Tuple[int, int]]:
+        """
+        :return: Average hash and pHash or None if the image is unknown or changed.
+        """
+        entry = self.entries.get(os.path.basename(image_path))
+        if entry is None:
+            return None
+        st = os.stat(image_path)
+        if entry[0] != st.st_size or entry[1] != st.st_mtime_ns:
+            return None
+        return entry[2], entry[3]
+
+    def put(self, image_path, hashes: Tuple[int, int]) -> None:
+        st = os.stat(image_path)
+        self.entries[os.path.basename(image_path)] = (st.st_size, st.st_mtime_ns, hashes[0], hashes[1])
+        self.modified = True
+
+
+_image_hash_stores = {}
+
+
+def get_image_hash_store(image_dir) -> ImageHashStore:
+    store = _image_hash_stores.get(image_dir)
+    if store is None:
+        store = ImageHashStore(image_dir)
+        _image_hash_stores[image_dir] = store
+    return store
+
+
+def get_image_hashes(image_paths) -> Dict[str, Tuple[int, int]]:
+    """
+    Looks up the hashes of the images in the stores of their directories. Missing hashes are computed in bulk,
+    in worker processes if possible, and persisted.
+
+    :return: Dict of image path -> (average hash, pHash).
+    """
+    image_hashes = {}
+    missing = []
+    for image_path in image_paths:
+        hashes = get_image_hash_store(os.path.dirname(image_path)).get(image_path)
+        if hashes is None:
+            missing.append(image_path)
+        else:
+            image_hashes[image_path] = hashes
+    if not missing:
+        return image_hashes
+
+    workers = min(configutil.MATRICS_IMAGE_HASH_WORKERS, len(missing))
+    # Daemonic processes, e.g. the ingestion workers of Matrics, are not allowed to have children
+    if workers <= 1 or mp.current_process().daemon:
+        computed_hashes = [compute_image_hashes(image_path) for image_path in missing]
+    else:
+        # Spawned, the image derivatives are still written by threads of this process, see ImageDerivativePipeline
+        with mp.get_context('spawn').Pool(workers) as pool:
+            computed_hashes = pool.map(compute_image_hashes, missing, chunksize=max(1, len(missing) // (4 * workers)))
+
+    image_dirs = set()
+    for image_path, hashes in zip(missing, computed_hashes):
+        image_dir = os.path.dirname(image_path)
+        get_image_hash_store(image_dir).put(image_path, hashes)
+        image_dirs.add(image_dir)
+        image_hashes[image_path] = hashes
+    for image_dir in image_dirs:
+        get_image_hash_store(image_dir).save()
+    return image_hashes
@@ -1,17 +1,16 @@
 # -*- coding: utf-8 -*-
 import collections
-from functools import lru_cache
+
+import numpy as np
 
 from model.state import State
 from util.util import shorten_fl
 
-import imagehash
-from PIL import Image
-
+from datatypes import packedhash
+from datatypes.hammingindex import HammingIndex
+from datatypes.unionfind import UnionFind
 from graph.transformer.basegraphtransformer import BaseGraphTransformer
-
-
-ANDROID_BAR_HEIGHT = 80
+from graph.transformer.imagehashstore import get_image_hashes
 
 
 class VisualSimilarityMerger(BaseGraphTransformer):
@@ -23,21 +22,29 @@ class VisualSimilarityMerger(BaseGraphTransformer):
     """
 
     PHASH_EPSILON = 3
+    # Up to this number of states of a group all pairwise distances are computed at once, above a Hamming index
+    # is used
+    MAX_DISTANCE_MATRIX_STATES = 2048
 
     def __init__(self, graph):
         self.g = graph
         self.transition_source_map = collections.defaultdict(list)
         self.transition_resulting_map = collections.defaultdict(list)
-        self.image_hash_state_map = collections.defaultdict(list)
+        # State id config -> states with equivalent images in graph order
+        self.state_id_config_state_map = collections.defaultdict(list)
+        # Image path -> (average hash, pHash)
+        self.image_hashes = {}
         self.initial_states_size = -1
         self.init()
 
     def init(self):
         self.initial_states_size = len(self.g.states)
+        self.image_hashes = get_image_hashes(set(image_path
+                                                 for state in self.g.states
+                                                 for image_path in state.image_paths))
         for state in self.g.states:
-            img_avg_h = self.has_equivalent_images(state)
-            if img_avg_h is not None:
-                self.image_hash_state_map[img_avg_h].append(state)
+            if self.has_equivalent_images(state) is not None:
+                self.state_id_config_state_map[state.get_state_id_config()].append(state)
 
         for trans in self.g.transitions:
             if trans.source_state_o is not None:
@@ -61,51 +68,56 @@ class VisualSimilarityMerger(BaseGraphTransformer):
         else:
             return None
 
-    @lru_cache(maxsize=512)
-    def get_avg_hash(self, image_path):
+    def get_avg_hash(self, image_path) -> int:
         """
-        Crops the Android bar and uses the first image path.
+        Average hash of the image without the Android bar.
         """
-        return imagehash.average_hash(self.image_crop(image_path))
+        return self.image_hashes[image_path][0]
 
-    def get_phash_from_state(self, state):
+    def get_phash_from_state(self, state) -> int:
+        """
+        Uses the first image path.
+        """
         assert state.image_paths
         return self.get_phash(next(iter(state.image_paths)))
 
-    @lru_cache(maxsize=512)
-    def get_phash(self, image_path):
+    def get_phash(self, image_path) -> int:
         """
-        Crops the Android bar and uses the first image path.
+        pHash of the image without the Android bar.
         """
-        return imagehash.phash(self.image_crop(image_path))
+        return self.image_hashes[image_path][1]
+
+    @staticmethod
+    def hamming_distance(hash_1: int, hash_2: int) -> int:
+        return packedhash.hamming_distance(hash_1, hash_2)
 
-    def image_crop(self, image_path):
+    @staticmethod
+    def find_close_pairs(phashes):
         """
-        1440 × 2560
+        :return: All pairs (i, j) with i < j of pHashes closer than PHASH_EPSILON.
         """
-        img = Image.open(image_path)
-        width, height = img.size
-        area = (0, ANDROID_BAR_HEIGHT, width, height)
-        cropped_img = img.crop(area)
-        return cropped_img
+        if len(phashes) <= VisualSimilarityMerger.MAX_DISTANCE_MATRIX_STATES:
+            distances = packedhash.distance_matrix(phashes, phashes)
+            return zip(*np.nonzero(np.triu(distances < VisualSimilarityMerger.PHASH_EPSILON, k=1)))
+        hamming_index = HammingIndex(VisualSimilarityMerger.PHASH_EPSILON - 1)
+        for phash in phashes:
+            hamming_index.add(phash)
+        return hamming_index.pairs()
 
     def transform(self):
-        for k, states in self.image_hash_state_map.items():
+        """
+        Merges all states of the same state id config whose pHashes are closer than PHASH_EPSILON. Close states
+        are found in batch, see find_close_pairs, and merged transitively into the first state of their group.
+        """
+        for states in self.state_id_config_state_map.values():
             if len(states) > 1:
-                # Try to merge every state with every state
-                idx_1 = 0
-                while idx_1 < len(states) - 1:
-                    base_state = states[idx_1]
-                    idx_2 = idx_1 + 1
-                    while idx_2 < len(states):
-                        state = states[idx_2]
-                        if self.should_merge(base_state, state):
-                            self.merge(base_state, state)
-                            states.remove(state)
-                        else:
-                            idx_2 += 1
-
-                    idx_1 += 1
+                union_find = UnionFind(len(states))
+                for idx_1, idx_2 in self.find_close_pairs([self.get_phash_from_state(state) for state in states]):
+                    union_find.union(int(idx_1), int(idx_2))
+                for idx, state in enumerate(states):
+                    root = union_find.find(idx)
+                    if root != idx:
+                        self.merge(states[root], state)
 
     def should_merge(self, state_1: State, state_2: State) -> bool:
         # import os
@@ -120,7 +132,7 @@ class VisualSimilarityMerger(BaseGraphTransformer):
         #         return False
         # else:
         #     return False
-        return self.get_phash_from_state(state_1) - self.get_phash_from_state(state_2) < VisualSimilarityMerger.PHASH_EPSILON \
+        return self.hamming_distance(self.get_phash_from_state(state_1), self.get_phash_from_state(state_2)) < VisualSimilarityMerger.PHASH_EPSILON \
                and state_1.get_state_id_config() == state_2.get_state_id_config()
 
     def merge(self, state_1, state_2):
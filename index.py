@@ -1,20 +1,21 @@
 # -*- coding: utf-8 -*-
-import traceback
-
+import dash
 from dash.dependencies import Input, Output, State
 import dash_core_components as dcc
 import dash_bootstrap_components as dbc
 import dash_html_components as html
 
+from analysisjobmanager import get_analysis_job_manager, JOB_STATE_FAILED, JOB_STATE_FINISHED, JOB_STATE_QUEUED
 from app import app
 from apps.apputil import ANALYSIS_FINISHED_CONTAINER
 from datasets import matrics_datasets
 from outlierdetection.univariateoutlierdetection import OUTLIER_NAME_INSTANCE_MAP, UNIVARIATE_OUTLIER_DETECTORS
 from util import configutil
-from util.configutil import IMG_PATH_PREFIX, IMAGE_DIR, MATRICS_CFG_APP_FILTER_LIST
+from util.configutil import IMG_PATH_PREFIX, IMAGE_DIR
 from apps import metricsapp, visualizationapp, usecasestatisticsapp, correlationanalysisapp, \
     generalapp, distributionanalysisapp
-from matrics import Matrics
+from matrics import PROGRESS_STAGE_APPS, PROGRESS_STAGE_USE_CASE_EXECUTIONS
+from model.model import PROGRESS_STAGE_METRICS
 
 
 DROPDOWN_SELECTION_DATASETS = "selection-datasets"
@@ -22,6 +23,13 @@ LOADING_START_ANALYSIS = "loading-start-analysis"
 BUTTON_START_ANALYSIS = "btn-start-analysis"
 BUTTON_ICON = html.I(className="fa fa-chart-bar", style={'padding-right': '5px'})
 TAB_0_LEVEL_CONTENT_CONTAINER = "tab-0-level-content-container"
+STORE_ANALYSIS_JOB = "store-analysis-job"
+INTERVAL_ANALYSIS_JOB = "interval-analysis-job"
+PROGRESS_STAGE_LABELS = [
+    (PROGRESS_STAGE_APPS, "Apps parsed"),
+    (PROGRESS_STAGE_USE_CASE_EXECUTIONS, "UCEs computed"),
+    (PROGRESS_STAGE_METRICS, "Metrics built"),
+]
 
 app.layout = dbc.Container(id="index", children=[
     # Header
@@ -115,7 +123,12 @@ app.layout = dbc.Container(id="index", children=[
                 # TODO there are some cool loading animations: https://community.plot.ly/t/loading-states-api-and-a-loading-component-prerelease/16406
                 # TODO create a matrix animation loading
                 # trigger loading animation while analysis is running
-                dcc.Loading(id=LOADING_START_ANALYSIS, children=[], type="default")
+                dcc.Loading(id=LOADING_START_ANALYSIS, children=[], type="default"),
+                # Id of the analysis job of this page and the polling of its progress
+                dcc.Store(id=STORE_ANALYSIS_JOB),
+                dcc.Interval(id=INTERVAL_ANALYSIS_JOB,
+                             interval=configutil.MATRICS_ANALYSIS_JOB_POLL_INTERVAL,
+                             disabled=True),
             ])
         ])
     ]),
@@ -175,41 +188,75 @@ def render_content(tab):
         raise NotImplementedError(f"Unknown tab: {tab}")
 
 
+def get_progress_children(progress):
+    if progress['state'] == JOB_STATE_QUEUED:
+        return html.P("Analysis queued")
+    stages = []
+    for stage, label in PROGRESS_STAGE_LABELS:
+        if stage in progress['stages']:
+            done, total = progress['stages'][stage]
+            stages.append(f"{label}: {done}" if total is None else f"{label}: {done}/{total}")
+    return html.P(" | ".join(stages) if stages else "Analysis started")
+
+
 @app.callback(
-    [Output(LOADING_START_ANALYSIS, "children"),
+    [Output(STORE_ANALYSIS_JOB, 'data'),
+     Output(INTERVAL_ANALYSIS_JOB, 'disabled'),
+     Output(LOADING_START_ANALYSIS, "children"),
      Output(ANALYSIS_FINISHED_CONTAINER, 'children'),
      Output(BUTTON_START_ANALYSIS, 'children'),
+     Output(BUTTON_START_ANALYSIS, 'disabled'),
      ],
-    [Input(BUTTON_START_ANALYSIS, 'n_clicks')],
-    [State('config-togape-config-file', 'value'),
+    [Input(BUTTON_START_ANALYSIS, 'n_clicks'),
+     Input(INTERVAL_ANALYSIS_JOB, 'n_intervals')],
+    [State(STORE_ANALYSIS_JOB, 'data'),
+     State(ANALYSIS_FINISHED_CONTAINER, 'children'),
+     State('config-togape-config-file', 'value'),
      State('selection-univariate-outlier-detection', 'value'),
      State(DROPDOWN_SELECTION_DATASETS, 'value'),])
 def start_analysis(n_clicks,
+                   n_intervals,
+                   job_id,
+                   finished_job_id,
                    togape_config_file,
                    univariate_outlier_method_name,
                    dataset_name):
-
-    analysis_finished_child = None
-    button_analysis_children = [BUTTON_ICON, "Run Analysis"]
-    if n_clicks > 0:
-        univariate_outlier_method = OUTLIER_NAME_INSTANCE_MAP[univariate_outlier_method_name]
+    """
+    The analysis runs as background job, see AnalysisJobManager. This callback submits the job and is polled
+    by the interval afterwards until the job is finished. The id of the finished job is written to the
+    analysis finished container, which triggers the callbacks of the results.
+    """
+    job_manager = get_analysis_job_manager()
+    button_analysis_children = [BUTTON_ICON, "Run Analysis" if finished_job_id is None else "Rerun Analysis"]
+    triggered = [t['prop_id'] for t in dash.callback_context.triggered]
+    if f"{BUTTON_START_ANALYSIS}.n_clicks" in triggered and n_clicks > 0:
         dataset = matrics_datasets[dataset_name]
-        matrics_config = {MATRICS_CFG_APP_FILTER_LIST: dataset}
-        app.matrics_ = Matrics(togape_config_file=togape_config_file,
-                               matrics_config=matrics_config,
-                               univariate_outlier_method=univariate_outlier_method)
-        # Start analysis
-        try:
-            app.matrics_.start()
-            analysis_finished_child = []
-            button_analysis_children = [BUTTON_ICON, "Rerun Analysis"]
-        except Exception as e:
-            # Notification sound
-            app.matrics_.play_sound(successful=False)
-            print(traceback.format_exc())
-            raise e
-
-    return None, analysis_finished_child, button_analysis_children
+        # A repeated configuration is served from the result store, if its sources did not change
+        job_id = job_manager.find_finished_job(togape_config_file, dataset, univariate_outlier_method_name)
+        if job_id is not None:
+            return None, True, None, job_id, [BUTTON_ICON, "Rerun Analysis"], False
+        # Apps whose apk and ToGAPE output did not change are reused from the analysis of an overlapping dataset
+        job_id = job_manager.submit(togape_config_file=togape_config_file,
+                                    dataset=dataset,
+                                    univariate_outlier_method_name=univariate_outlier_method_name)
+        return job_id, False, html.P("Analysis queued"), dash.no_update, [BUTTON_ICON, "Analysis running"], True
+
+    if job_id is None:
+        return None, True, None, dash.no_update, button_analysis_children, False
+
+    progress = job_manager.get_progress(job_id)
+    if progress is None:
+        return None, True, html.P(f"Unknown analysis job: {job_id}"), dash.no_update, button_analysis_children, False
+    if progress['state'] == JOB_STATE_FINISHED:
+        # The result callbacks resolve the result by the job id, see apputil.get_matrics
+        if job_manager.get_result(job_id) is None:
+            return None, True, html.P(f"Could not load the result of the analysis job: {job_id}"), dash.no_update, \
+                button_analysis_children, False
+        return None, True, None, job_id, [BUTTON_ICON, "Rerun Analysis"], False
+    if progress['state'] == JOB_STATE_FAILED:
+        return None, True, html.Pre(progress['error']), dash.no_update, button_analysis_children, False
+    return dash.no_update, False, get_progress_children(progress), dash.no_update, \
+        [BUTTON_ICON, "Analysis running"], True
 
 
 if __name__ == "__main__":
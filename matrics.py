@@ -2,7 +2,7 @@
 import logging
 import os
 import time
-from typing import List
+from typing import List, Optional
 
 import plotly
 from simpleaudio import _simpleaudio
@@ -11,11 +11,15 @@ import multiprocessing as mp
 import simpleaudio as sa
 
 from model.androidapp import App
+from model.featuredirindex import get_feature_dir_index, reset_feature_dir_indices, set_feature_dir_index
 from model.model import Model
+from model.modelsnapshot import ModelSnapshot
 from outlierdetection.univariateoutlierdetection import ZScore1StdDevOutlierDetector
 from util import configutil
 from util.configutil import get_properties_config, MATRICS_CFG_APP_FILTER_LIST, MATRICS_CFG_COMPUTE_USE_CASE_EXECUTIONS, \
-    MATRICS_CFG_MODEL_ACCESSOR_SELECTION, MATRICS_CFG_COMPUTE_USE_CASE_EXECUTIONS_DEFAULT
+    MATRICS_CFG_MODEL_ACCESSOR_SELECTION, MATRICS_CFG_COMPUTE_USE_CASE_EXECUTIONS_DEFAULT, \
+    MATRICS_CFG_INGESTION_WORKERS, MATRICS_CFG_INGESTION_WORKERS_DEFAULT, MATRICS_CFG_REUSE_UNCHANGED_APPS, \
+    MATRICS_CFG_REUSE_UNCHANGED_APPS_DEFAULT
 from util.util import shorten_fl
 
 
@@ -23,8 +27,27 @@ APK_SUFFIX = ".apk"
 # This is just for me to quickly preventing ToGAPE to pick that app
 APK_SUFFIX_CUSTOM = ".apk.B"
 
-# Parallelization doesn't work because threading in python sucks
-PARALLELIZE = False
+# Stages reported to the progress callback of Matrics, see Model.construct_metrics for the metrics stage
+PROGRESS_STAGE_APPS = "apps"
+PROGRESS_STAGE_USE_CASE_EXECUTIONS = "use_case_executions"
+
+# Matrics instance of an ingestion worker process, see init_ingestion_worker
+_worker_matrics = None
+
+
+def init_ingestion_worker(togape_config_file, matrics_config, debug_mode, feature_dir_index):
+    global _worker_matrics
+    set_feature_dir_index(feature_dir_index)
+    _worker_matrics = Matrics(togape_config_file, matrics_config, debug_mode)
+
+
+def analyze_app_in_worker(f_name) -> ModelSnapshot:
+    """
+    Analyzes the app in an ingestion worker process. The app is returned as snapshot, because the
+    cyclic object graph of the app cannot be pickled directly.
+    """
+    app = _worker_matrics.analyze_app(f_name)
+    return None if app is None else ModelSnapshot.create(app)
 
 
 class Matrics(object):
@@ -35,11 +58,19 @@ class Matrics(object):
                  togape_config_file,
                  matrics_config=None,
                  debug_mode=True,
-                 univariate_outlier_method=ZScore1StdDevOutlierDetector):
+                 univariate_outlier_method=ZScore1StdDevOutlierDetector,
+                 previous_matrics=None,
+                 progress_callback=None):
+        """
+        :param previous_matrics: Matrics of the previous analysis, its unchanged apps are reused.
+        :param progress_callback: Called with (stage, done, total) while the analysis is running. The total is
+        None if it is not known in advance.
+        """
         logging.basicConfig(level=logging.DEBUG if debug_mode else logging.INFO)
         self.logger = logging.getLogger('Matrics')
 
         self.togape_config_file = togape_config_file
+        self.debug_mode = debug_mode
         self.config_togape = get_properties_config(togape_config_file)
         configutil.validate_togape_config(self.config_togape)
         self.matrics_config = {} if matrics_config is None else matrics_config
@@ -48,8 +79,16 @@ class Matrics(object):
         self.logger.info(f'Using: {self.atd_path}')
         self.apps: List[App] = []
         self.pck_app_map = {}
+        # Files of the apk dir at the start of the analysis
+        self.apk_f_names = []
         # self.univariate_outlier_method = univariate_outlier_method
         self.compute_use_case_executions = MATRICS_CFG_COMPUTE_USE_CASE_EXECUTIONS_DEFAULT if MATRICS_CFG_COMPUTE_USE_CASE_EXECUTIONS not in self.matrics_config else self.matrics_config[MATRICS_CFG_COMPUTE_USE_CASE_EXECUTIONS]
+        self.ingestion_workers = MATRICS_CFG_INGESTION_WORKERS_DEFAULT if MATRICS_CFG_INGESTION_WORKERS not in self.matrics_config else self.matrics_config[MATRICS_CFG_INGESTION_WORKERS]
+        reuse_unchanged_apps = MATRICS_CFG_REUSE_UNCHANGED_APPS_DEFAULT if MATRICS_CFG_REUSE_UNCHANGED_APPS not in self.matrics_config else self.matrics_config[MATRICS_CFG_REUSE_UNCHANGED_APPS]
+        # Apk file -> app of the previous analysis
+        self.previous_apps = {app.app_path: app for app in previous_matrics.apps} \
+            if reuse_unchanged_apps and previous_matrics is not None else {}
+        self.progress_callback = progress_callback
         self.model = Model(self.apps, self.config_togape, self.matrics_config, univariate_outlier_method)
 
     def start(self):
@@ -59,24 +98,55 @@ class Matrics(object):
         start_time = time.time()
 
         self.setup()
-
-        apps = []
-        if PARALLELIZE:
-            pool = mp.Pool(mp.cpu_count())
+        # ToGAPE may have written new files since the previous run
+        reset_feature_dir_indices()
+
+        f_names = os.listdir(self.apk_dir)
+        self.apk_f_names = sorted(f_names)
+        apps = [None] * len(f_names)
+        # Only the apps whose apk or ToGAPE output changed are analyzed again
+        analyzed_idxs = []
+        progress = AppProgress(self, len(f_names))
+        for idx, f_name in enumerate(f_names):
+            previous_app = self.get_unchanged_previous_app(f_name)
+            if previous_app is None:
+                analyzed_idxs.append(idx)
+                continue
+            if self.use_app_for_analysis(previous_app):
+                self.logger.info(f"Reuse unchanged app: {f_name}")
+                apps[idx] = previous_app
+            progress.add(apps[idx])
+        analyzed_f_names = [f_names[idx] for idx in analyzed_idxs]
+
+        workers = min(self.ingestion_workers, len(analyzed_f_names))
+        if workers > 1:
+            self.logger.info(f"Analyze apps with {workers} processes")
+            # The feature dir is shared by all apps, so it is indexed once for all workers
+            feature_dir_index = get_feature_dir_index(self.config_togape[configutil.TOGAPE_CFG_FEATURE_DIR])
+            # Spawned, the image derivatives are still written by threads of this process, see ImageDerivativePipeline
+            pool = mp.get_context('spawn').Pool(workers,
+                                                initializer=init_ingestion_worker,
+                                                initargs=(self.togape_config_file, self.matrics_config,
+                                                          self.debug_mode, feature_dir_index))
             try:
-                apps = pool.map(self.analyze_app, [f_name for f_name in os.listdir(self.apk_dir)])
+                snapshots = pool.imap(analyze_app_in_worker, analyzed_f_names)
+                for idx, snapshot in zip(analyzed_idxs, tqdm(snapshots, total=len(analyzed_f_names), desc="Analyze app")):
+                    apps[idx] = None if snapshot is None else snapshot.restore()
+                    progress.add(apps[idx])
             finally:
                 pool.close()
                 pool.join()
         else:
-            for f_name in tqdm(os.listdir(self.apk_dir), desc="Analyze app"):
-                app = self.analyze_app(f_name)
-                apps.append(app)
+            for idx, f_name in zip(analyzed_idxs, tqdm(analyzed_f_names, desc="Analyze app")):
+                apps[idx] = self.analyze_app(f_name)
+                progress.add(apps[idx])
 
         for app in apps:
             if app is not None:
                 self.apps.append(app)
                 self.pck_app_map[app.package_name] = app
+        # The apps of the previous analysis are not needed anymore
+        self.previous_apps = {}
 
         assert len(self.apps) > 1, f"There must be at least two apks provided. Apk dir: {self.apk_dir}"
         assert (not MATRICS_CFG_APP_FILTER_LIST in self.matrics_config) or \
@@ -84,10 +154,14 @@ class Matrics(object):
             f"Could not find a configured app: {self.matrics_config[MATRICS_CFG_APP_FILTER_LIST]}"
         print(f"Took: {shorten_fl(time.time() - start_time)}sec to construct app data")
 
-        self.model.construct_metrics()
+        self.model.construct_metrics(self.progress_callback)
         print(f"Took: {shorten_fl(time.time() - start_time)}sec to construct metrics")
         self.play_sound(successful=True)
 
+    def report_progress(self, stage, done, total=None):
+        if self.progress_callback is not None:
+            self.progress_callback(stage, done, total)
+
     def setup(self):
         if not os.path.exists(configutil.MATRICS_FIGURE_IMAGE_DIR_NAME):
             os.mkdir(configutil.MATRICS_FIGURE_IMAGE_DIR_NAME)
@@ -102,11 +176,29 @@ class Matrics(object):
         else:
             return True
 
+    def get_unchanged_previous_app(self, f_name) -> Optional[App]:
+        """
+        :return: The app of the previous analysis if its apk and ToGAPE output did not change, see
+        App.has_unchanged_sources.
+        """
+        app = self.previous_apps.get(os.path.join(self.apk_dir, f_name))
+        if app is None or not app.has_unchanged_sources(self.config_togape, self.compute_use_case_executions):
+            return None
+        return app
+
+    def has_unchanged_sources(self) -> bool:
+        """
+        :return: True if no file was added to or removed from the apk dir and the apk and ToGAPE output of all
+        analyzed apps are unchanged, i.e. the analysis would yield the same result.
+        """
+        return sorted(os.listdir(self.apk_dir)) == self.apk_f_names and \
+            all(app.has_unchanged_sources(self.config_togape, self.compute_use_case_executions) for app in self.apps)
+
     def analyze_app(self, f_name) -> App:
         """
-        This logic was extracted into this function, because it can be also called asynchronously.
-        Do not try to persist any data (by saving it to self. fields), because it gets called by
-        process (not threads) and has no shared memory!
+        This logic was extracted into this function, because it is also called by the ingestion worker
+        processes, see analyze_app_in_worker. Do not try to persist any data (by saving it to self. fields),
+        because the worker processes have no shared memory!
         """
         apk_file = os.path.join(self.apk_dir, f_name)
         if os.path.isfile(apk_file) and (f_name.endswith(APK_SUFFIX) or f_name.endswith(APK_SUFFIX_CUSTOM)):
@@ -135,3 +227,25 @@ class Matrics(object):
             play_obj.wait_done()
         except _simpleaudio.SimpleaudioError as e:
             print(e)
+
+
+class AppProgress(object):
+    """
+    Counts the processed apk files and the computed use case executions of the apps for the progress callback
+    of Matrics.
+    """
+
+    def __init__(self, matrics: Matrics, apps_total):
+        self.matrics = matrics
+        self.apps_total = apps_total
+        self.apps_done = 0
+        self.use_case_executions_done = 0
+
+    def add(self, app: Optional[App]):
+        self.apps_done += 1
+        if app is not None:
+            use_case_execution_manager = getattr(app.exploration_model, 'use_case_execution_manager', None)
+            if use_case_execution_manager is not None:
+                self.use_case_executions_done += len(use_case_execution_manager.use_case_executions)
+        self.matrics.report_progress(PROGRESS_STAGE_APPS, self.apps_done, self.apps_total)
+        self.matrics.report_progress(PROGRESS_STAGE_USE_CASE_EXECUTIONS, self.use_case_executions_done)
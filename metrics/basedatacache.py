@@ -1,18 +1,43 @@
 # -*- coding: utf-8 -*-
 import os
-import pickle
 from abc import abstractmethod, ABCMeta, ABC
-from typing import Any, List
+from typing import Any, List, Optional
 
+from metrics.datacache import get_data_cache
 from metrics.datacompound import DataCompound
-from util import configutil
+from util import configutil, fingerprintutil
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_code_fingerprint = None
+
+
+def get_code_fingerprint() -> str:
+    """
+    :return: Fingerprint of the sources that compute the metrics data, see MATRICS_DATA_CACHE_SOURCE_PATHS.
+    The fingerprints of the arguments do not cover the called functions and the state of classes.
+    """
+    global _code_fingerprint
+    if _code_fingerprint is None:
+        entries = []
+        for source_path in configutil.MATRICS_DATA_CACHE_SOURCE_PATHS:
+            entries += fingerprintutil.get_source_entries(os.path.join(REPO_ROOT, source_path))
+        _code_fingerprint = fingerprintutil.get_fingerprint(entries)
+    return _code_fingerprint
 
 
 class BaseDataCache(metaclass=ABCMeta):
     """
+    Caches the computed data in the DataCache. The cache key is the fingerprint of the class, its load id,
+    the outlier method, all arguments of compute_data, e.g. the apps with their source model directories, and
+    the code, see get_code_fingerprint.
+    If an argument cannot be fingerprinted, the data is always computed.
+
     TODO think about to improve the class hierarchy with BaseDataCache:
     ModelAccessor implement BaseDataCache?
     """
+    # Set to False for classes whose compute_data has side effects or whose data cannot be stored
+    cacheable = True
 
     @abstractmethod
     def compute_data(self, *args, **kwargs) -> Any:
@@ -22,36 +47,37 @@ class BaseDataCache(metaclass=ABCMeta):
     def get_cache_load_id(self) -> str:
         pass
 
-    def store_data(self, data, file) -> None:
-        with open(file, 'wb') as f:
-            pickle.dump(data, f)
-
-    def force_reload_data(self, *args, **kwargs):
+    def get_cache_key(self, *args, **kwargs) -> Optional[str]:
         load_id = self.get_cache_load_id()
         assert load_id is not None and load_id != "", f"Load id was: {load_id}"
-        file = os.path.join(configutil.MATRICS_CACHE_DIR_NAME, load_id)
+        if not self.cacheable or not configutil.MATRICS_DATA_CACHE_ENABLED:
+            return None
+        outlier_method = getattr(self, 'outlier_method', None)
+        fingerprint = fingerprintutil.get_value_fingerprint([type(self),
+                                                             load_id,
+                                                             None if outlier_method is None else type(outlier_method),
+                                                             list(args),
+                                                             kwargs])
+        if fingerprint is None:
+            return None
+        return fingerprintutil.get_fingerprint([fingerprint], configutil.MATRICS_DATA_CACHE_VERSION,
+                                               get_code_fingerprint())
 
-        if os.path.isfile(file):
-            with open(file, 'rb') as fp:
-                data = pickle.load(fp)
-        else:
-            data = self.compute_data(*args, **kwargs)
-            if configutil.MATRICS_CACHE_DUMP:
-                self.store_data(data, file)
+    def force_reload_data(self, *args, **kwargs):
+        data = self.compute_data(*args, **kwargs)
+        key = self.get_cache_key(*args, **kwargs)
+        if key is not None:
+            get_data_cache().store(key, data)
         return data
 
     def load_data(self, *args, **kwargs):
-        load_id = self.get_cache_load_id()
-        assert load_id is not None and load_id != "", f"Load id was: {load_id}"
-        file = os.path.join(configutil.MATRICS_CACHE_DIR_NAME, load_id)
-
-        if os.path.isfile(file) and configutil.MATRICS_CACHE_READ:
-            with open(file, 'rb') as fp:
-                data = pickle.load(fp)
-        else:
+        key = self.get_cache_key(*args, **kwargs)
+        if key is None:
+            return self.compute_data(*args, **kwargs)
+        found, data = get_data_cache().load(key)
+        if not found:
             data = self.compute_data(*args, **kwargs)
-            if configutil.MATRICS_CACHE_DUMP:
-                self.store_data(data, file)
+            get_data_cache().store(key, data)
         return data
 
 
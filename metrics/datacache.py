@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import os
+import pickle
+from typing import Any, Tuple
+
+from util import configutil
+from util.pathutil import create_dir_if_non_existing
+
+
+CACHE_FILE_EXTENSION = ".cache"
+
+
+class DataCache(object):
+    """
+    Content addressed file cache. An entry is stored under the fingerprint of all inputs that were used to
+    compute it, so a changed input simply leads to a different entry and stale entries are never read.
+    The size of the cache directory is bounded, the least recently used entries are evicted first.
+    """
+
+    def __init__(self, cache_dir, max_size):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def get_file(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{CACHE_FILE_EXTENSION}")
+
+    def load(self, key: str) -> Tuple[bool, Any]:
+        """
+        :return: Tuple of whether the entry was found and the cached data.
+        """
+        file = self.get_file(key)
+        try:
+            with open(file, 'rb') as f:
+                data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            self.misses += 1
+            return False, None
+        # Mark the entry as recently used
+        os.utime(file)
+        self.hits += 1
+        return True, data
+
+    def store(self, key: str, data) -> None:
+        create_dir_if_non_existing(self.cache_dir)
+        file = self.get_file(key)
+        tmp_file = f"{file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError) as e:
+            print(f"Could not cache data {key}: {e}")
+            os.remove(tmp_file)
+            return
+        os.replace(tmp_file, file)
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        for f_name in os.listdir(self.cache_dir):
+            if f_name.endswith(CACHE_FILE_EXTENSION):
+                f = os.path.join(self.cache_dir, f_name)
+                st = os.stat(f)
+                entries.append((st.st_mtime_ns, st.st_size, f))
+        size = sum(entry[1] for entry in entries)
+        for _, f_size, f in sorted(entries):
+            if size <= self.max_size:
+                break
+            os.remove(f)
+            size -= f_size
+
+    def get_stats(self) -> str:
+        return f"Data cache hits: {self.hits} misses: {self.misses}"
+
+
+_data_cache = None
+
+
+def get_data_cache() -> DataCache:
+    global _data_cache
+    if _data_cache is None:
+        _data_cache = DataCache(configutil.MATRICS_DATA_CACHE_DIR_NAME, configutil.MATRICS_DATA_CACHE_MAX_SIZE)
+    return _data_cache
@@ -191,7 +191,7 @@ class MultiNumberMetric(ModelAccessor, BaseDataCache):
         :param aggregation_lvl_it: TODO
         :param description: the description that will be displayed in the result plot
         """
-        super().__init__(name)
+        super().__init__(model)
         self.description = description
         self.outlier_method = outlier_method()
         self.aggregation_level_it = aggregation_lvl_it
@@ -1,17 +1,17 @@
 # -*- coding: utf-8 -*-
-import pickle
 from typing import Callable, List
 
 from aggregationlevel import AggregationLevel
 from metrics.metric import *
 from metrics.ucecomparison.multinumberucecomparison import MultiNumberUCEComparison
-from model.dummyexplorationmodel import DummyExplorationModel
 from model.explorationmodel import ExplorationModel
 from outlierdetection.univariateoutlierdetection import ZScore1StdDevOutlierDetector
 
 
 class ModelGraphs(BaseMetric):
     description = "Overall execution graph"
+    # The data are the exploration models themselves
+    cacheable = False
 
     def __init__(self, model, outlier_method=None):
         self.model = model
@@ -24,12 +24,6 @@ class ModelGraphs(BaseMetric):
 
         self.name_data_map = {self.app_names[i]: self.data[i] for i in range(len(self.app_names))}
 
-    def store_data(self, data, file):
-        dummy_data = [DummyExplorationModel.create_from_exploration_model(app.exploration_model)
-                      for app in self.model.apps]
-        with open(file, 'wb') as f:
-            pickle.dump(dummy_data, f)
-
     def compute_data(self, model):
         return [app.exploration_model for app in model.apps]
 
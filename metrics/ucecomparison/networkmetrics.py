@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 from typing import List, Callable, Union
 
+import pandas as pd
+
 from aggregationlevel import AggregationLevel
 from metrics.metric import *
 from metrics.ucecomparison.multinumberucecomparison import MultiNumberUCEComparison
 from model.baseexplorationmodel import BaseExplorationModel
-from model.har import HarEntry
+from model.har import Har, HarEntry
 from outlierdetection.univariateoutlierdetection import IQROutlierDetector
 from usecaseclassification.usecaseexecution import UseCaseExecution
 
@@ -25,27 +27,43 @@ def selector_network_entries(it_unit: Union[UseCaseExecution, BaseExplorationMod
     return entries
 
 
+def selector_network_entries_table(it_unit: Union[UseCaseExecution, BaseExplorationModel],
+                                   aggregation_lvl) -> pd.DataFrame:
+    if aggregation_lvl == AggregationLevel.APP:
+        # it_unit is App
+        table = it_unit.get_network_entries_table()
+    elif aggregation_lvl == AggregationLevel.USE_CASE:
+        # it_unit is UseCaseExecution
+        table = it_unit.get_representative_trace_view().get_network_entries_table()
+    else:
+        raise NotImplementedError(f"Not implemented yet for: {aggregation_lvl}")
+    return table
+
+
 def selector_number_of_entries(it_unit: Union[UseCaseExecution, BaseExplorationModel],
                                filtering_entries: Callable,
                                aggregation_lvl) -> List[int]:
-    entries = selector_network_entries(it_unit, aggregation_lvl)
-    return [len(entries)]
+    table = selector_network_entries_table(it_unit, aggregation_lvl)
+    return [len(table)]
 
 
 # TODO could be wrong
 def selector_latency_of_entries_ls(it_unit: Union[UseCaseExecution, BaseExplorationModel],
                                    filtering_entries: Callable,
                                    aggregation_lvl) -> List[int]:
-    entries = selector_network_entries(it_unit, aggregation_lvl)
-    return [entry.timings.wait for entry in entries]
+    table = selector_network_entries_table(it_unit, aggregation_lvl)
+    return table[Har.COLUMN_WAIT].tolist()
 
 
 def selector_number_of_errors(it_unit: Union[UseCaseExecution, BaseExplorationModel],
                               filtering_entries: Callable,
                               aggregation_lvl) -> List[int]:
     if aggregation_lvl == AggregationLevel.APP:
-        entries = selector_network_entries(it_unit, aggregation_lvl)
-        return [sum(1 for entry in filtering_entries(entries) if 400 <= entry.response.status < 600)]
+        if filtering_entries is not identity:
+            entries = selector_network_entries(it_unit, aggregation_lvl)
+            return [sum(1 for entry in filtering_entries(entries) if 400 <= entry.response.status < 600)]
+        status = selector_network_entries_table(it_unit, aggregation_lvl)[Har.COLUMN_STATUS]
+        return [int(((400 <= status) & (status < 600)).sum())]
     elif aggregation_lvl == AggregationLevel.USE_CASE:
         # it_unit is UseCaseExecution
         return [it_unit.get_representative_trace_view().get_number_network_errors()]
@@ -56,18 +74,15 @@ def selector_number_of_errors(it_unit: Union[UseCaseExecution, BaseExplorationMo
 def selector_payload_size_of_requests(it_unit: Union[UseCaseExecution, BaseExplorationModel],
                                       filtering_entries: Callable,
                                       aggregation_lvl) -> List[int]:
-    entries = selector_network_entries(it_unit, aggregation_lvl)
-    return [entry.request.bodySize
-            for entry in entries
-            if entry.request.bodySize >= 0]
+    body_sizes = selector_network_entries_table(it_unit, aggregation_lvl)[Har.COLUMN_REQUEST_BODY_SIZE]
+    return body_sizes[body_sizes >= 0].tolist()
 
 
 def selector_payload_size_of_responses(it_unit: Union[UseCaseExecution, BaseExplorationModel],
                                        filtering_entries: Callable,
                                        aggregation_lvl) -> List[int]:
-    entries = selector_network_entries(it_unit, aggregation_lvl)
-    data = [entry.response.bodySize for entry in entries if entry.response.bodySize >= 0]
-    return data
+    body_sizes = selector_network_entries_table(it_unit, aggregation_lvl)[Har.COLUMN_RESPONSE_BODY_SIZE]
+    return body_sizes[body_sizes >= 0].tolist()
 
 
 class NetworkRequestsNumberUCE(MultiNumberUCEComparison):
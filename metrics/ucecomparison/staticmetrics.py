@@ -17,6 +17,8 @@ PD_FRAME_NAME = "frame"
 class StaticPermissionsDistributionAmongApps(BaseMetric):
     description = "Distribution of permissions among apps"
     name = "Distribution of permissions among apps"
+    # compute_data collects the permission distribution
+    cacheable = False
 
     def __init__(self, model, outlier_method=None, filter_non_android_perms=True):
         self.abs_distr = collections.Counter()
@@ -75,6 +77,8 @@ class StaticPermissionsDistributionAmongApps(BaseMetric):
 class StaticAppPermissionsDistributionAmongPermissions(BaseMetric):
     description = "Distribution of the apps' permissions among permissions"
     name = "Distribution of the apps' permissions among permissions"
+    # compute_data collects the permission distribution
+    cacheable = False
 
     def __init__(self, model, outlier_method=None, filter_non_android_perms=True):
         self.abs_distr = collections.Counter()
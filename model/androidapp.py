@@ -10,11 +10,11 @@ from model.explorationmodel import ExplorationModel
 from shortnamemapping import APP_SHORT_NAME_MAP
 from usecaseclassification.usecasemanager import UseCaseManager
 from util import configutil
+from util import fingerprintutil
 
 
-# Unfortunately pickle cannot handle the cyclic data structures and fixing this would be really complex.
-# Therefore, we don't load the exploration model from a dump.
-LOAD_EXPLORATION_MODEL_FROM_FILE_DUMP = False
+# Load the exploration model from its snapshot if the ToGAPE output did not change, see ModelSnapshot
+LOAD_EXPLORATION_MODEL_FROM_FILE_DUMP = True
 
 
 @total_ordering
@@ -25,14 +25,17 @@ class App(object):
         show_logging(level=logging.CRITICAL)
 
         self.app_path = app_path
-        self.apk = APK(app_path)
-        self.package_name = self.apk.get_package()
+        # The parsed apk is not kept, it is large and only needed to read the manifest
+        apk = APK(app_path)
+        self.package_name = apk.get_package()
         self.domain = appdomainmapping.get_domain(self.package_name)
-        self.permissions = self.apk.get_permissions()
-        self.version_name = self.apk.get_androidversion_name()
-        self.receivers = self.apk.get_receivers()
-        self.activities = self.apk.get_activities()
+        self.permissions = apk.get_permissions()
+        self.version_name = apk.get_androidversion_name()
+        self.receivers = apk.get_receivers()
+        self.activities = apk.get_activities()
         self.app_size = self.compute_app_size()
+        # Size and modification time of the apk, see has_unchanged_sources
+        self.apk_file_entry = fingerprintutil.get_file_entry(app_path)
         # self.possible_broadcasts = self.get_possible_broadcasts()
         self.exploration_model: Optional[ExplorationModel] = None
         self.ad_tracking_libraries = set()
@@ -53,6 +56,15 @@ class App(object):
         else:
             return self.domain < other.domain
 
+    def get_cache_fingerprint(self) -> Optional[str]:
+        """
+        :return: Fingerprint of the app's input data or None if it is unknown, e.g. for a dummy model.
+        """
+        source_fingerprint = getattr(self.exploration_model, 'source_fingerprint', None)
+        if source_fingerprint is None:
+            return None
+        return f"{self.package_name}:{self.app_size}:{source_fingerprint}"
+
     def get_short_name(self) -> str:
         assert self.package_name in APP_SHORT_NAME_MAP, f"{self.package_name} is not present in APP_SHORT_NAME_MAP"
         return APP_SHORT_NAME_MAP[self.package_name]
@@ -63,6 +75,29 @@ class App(object):
         """
         return os.path.getsize(self.app_path) / (1024 * 1024.0)
 
+    def has_unchanged_sources(self, config_togape, compute_use_case_executions) -> bool:
+        """
+        :return: Whether the apk and the ToGAPE output of the app did not change since its exploration model
+        was built, so the app can be reused by another analysis.
+        """
+        source_fingerprint = getattr(self.exploration_model, 'source_fingerprint', None)
+        if source_fingerprint is None:
+            return False
+        try:
+            if fingerprintutil.get_file_entry(self.app_path) != self.apk_file_entry:
+                return False
+        except OSError:
+            return False
+        togape_output_dir = config_togape[configutil.TOGAPE_CFG_OUTPUT_DIR]
+        model_dir = os.path.join(togape_output_dir, configutil.TOGAPE_MODEL_DIR_NAME, self.package_name)
+        matrics_playback_dir = os.path.join(togape_output_dir, configutil.MATRICS_PLAYBACK_MODEL_DIR_NAME)
+        return source_fingerprint == ExplorationModel.get_source_fingerprint(self.package_name,
+                                                                             model_dir,
+                                                                             config_togape[configutil.TOGAPE_CFG_FEATURE_DIR],
+                                                                             config_togape[configutil.TOGAPE_CFG_ATD_PATH],
+                                                                             matrics_playback_dir,
+                                                                             compute_use_case_executions)
+
     def construct_data(self, config_togape, compute_use_case_executions, load_from_cache):
         togape_output_dir = config_togape[configutil.TOGAPE_CFG_OUTPUT_DIR]
         model_dir = os.path.join(togape_output_dir, configutil.TOGAPE_MODEL_DIR_NAME, self.package_name)
@@ -77,7 +112,7 @@ class App(object):
                                                                   exploration_model_dir=model_dir,
                                                                   use_case_manager=use_case_manager,
                                                                   matrics_playback_dir=matrics_playback_dir,
-                                                                  compute_use_case_executions_b=LOAD_EXPLORATION_MODEL_FROM_FILE_DUMP)
+                                                                  compute_use_case_executions_b=False)
 
         else:
             self.exploration_model = ExplorationModel.load_exploration_model(self,
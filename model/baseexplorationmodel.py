@@ -5,11 +5,12 @@ from abc import ABCMeta
 
 from datatypes.orderedset import OrderedSet
 from graph import graph
+from model.featuredirindex import get_feature_dir_index
 from model.har import Har
 from model.state import State
 from model.trace import Trace
 from util import configutil
-from util.configutil import ATD_IMG_SUBDIR, RESIZE_IMG_SUBDIR
+from util.configutil import ATD_IMG_SUBDIR
 from util.pathutil import create_dir_if_non_existing
 
 
@@ -32,7 +33,10 @@ class BaseExplorationModel(metaclass=ABCMeta):
     TODO does not log
     """
 
-    def __init__(self, app, package_name, exploration_model_dir, feature_dir, evaluation_dir):
+    def __init__(self, app, package_name, exploration_model_dir, feature_dir, evaluation_dir, trace_ids=None):
+        """
+        :param trace_ids: Only the traces with these ids are read, all traces if None.
+        """
         logging.basicConfig(level=logging.DEBUG)
         self.logger = logging.getLogger('Model')
         print(f"Build model from: {exploration_model_dir}")
@@ -55,12 +59,14 @@ class BaseExplorationModel(metaclass=ABCMeta):
 
         # Build the model
         self.read_states()
-        self.read_traces(exploration_model_dir)
+        self.read_traces(exploration_model_dir, trace_ids)
         self.read_images(feature_dir)
 
         # Network
         self.hars = []
         self.read_har_network(exploration_model_dir)
+        # Columnar table of the network entries, built on first use
+        self.network_entries_table = None
 
     def check_post_conditions(self):
         for trace in self.traces:
@@ -70,22 +76,27 @@ class BaseExplorationModel(metaclass=ABCMeta):
                         f"Trans action_id: {trans.action_id} Trans network page actionIdx: {trans.network_page.actionIdx}"
 
     def read_states(self):
+        state_files = []
         for f_name in os.listdir(self.states_dir):
             state_file = os.path.join(self.states_dir, f_name)
             if os.path.isfile(state_file) and f_name.endswith(".csv"):
                 self.logger.info(f"Found state file: {state_file}")
                 # print(f"Found state file: {state_file}")
-                state = State.construct_from_state_file(state_file, self.uid_widget_map)
-                self.uid_state_map[state.unique_id] = state
-                # Add to states
-                self.states.append(state)
-                if state.is_home_screen:
-                    # Validate the home state
-                    self.set_home_state(state)
+                state_files.append(state_file)
+        for state in State.construct_from_state_files(state_files, self.uid_widget_map):
+            self.uid_state_map[state.unique_id] = state
+            # Add to states
+            self.states.append(state)
+            if state.is_home_screen:
+                # Validate the home state
+                self.set_home_state(state)
         assert self.home_state is not None
 
-    def read_traces(self, model_dir):
+    def read_traces(self, model_dir, trace_ids=None):
+        trace_f_names = None if trace_ids is None else set(f"trace{trace_id}.csv" for trace_id in trace_ids)
         for f_name in os.listdir(model_dir):
+            if trace_f_names is not None and f_name not in trace_f_names:
+                continue
             trace_file = os.path.join(model_dir, f_name)
             if os.path.isfile(trace_file) and f_name.startswith("trace") and f_name.endswith(".csv"):
                 self.logger.info(f"Found trace file: {trace_file}")
@@ -98,31 +109,28 @@ class BaseExplorationModel(metaclass=ABCMeta):
                 self.traces.append(trace)
 
     def read_images(self, feature_dir):
-        for f_name in os.listdir(feature_dir):
-            f = os.path.join(feature_dir, f_name)
-            if os.path.isdir(f):
-                create_dir_if_non_existing(os.path.join(f, RESIZE_IMG_SUBDIR))
+        feature_dir_index = get_feature_dir_index(feature_dir)
+        for t in self.traces:
+            for f in feature_dir_index.get_image_dirs(self.package_name, t.unique_id):
                 # Create already the directory containing the images with ATD drawing
                 create_dir_if_non_existing(os.path.join(f, ATD_IMG_SUBDIR))
-                for t in self.traces:
-                    if f.endswith(f"{self.package_name}-images_{t.unique_id}"):
-                        for img_f_name in os.listdir(f):
-                            if img_f_name.endswith(IMAGE_FILE_EXTENSION):
-                                self.logger.info(f"Found img file: {img_f_name}")
-                                actionId = img_f_name.replace(IMAGE_FILE_EXTENSION, "")
-                                # print(f"Found img file: {img_f_name} id: {id}")
-                                img_f = os.path.abspath(os.path.join(f, img_f_name))
-                                self.image_paths[actionId] = img_f
-
-                # Assign available images
-                for actionId in self.actionid_transition_map:
-                    if actionId in self.image_paths:
-                        trans = self.actionid_transition_map[actionId]
-                        s = trans.resulting_state_o
-                        # TODO this assertion does not always hold
-                        # probably create a set with (action_id, image)
-                        # assert s.image_path is None or s.image_path == self.images[aid]
-                        s.add_image_path(self.image_paths[actionId])
+                for img_f_name in os.listdir(f):
+                    if img_f_name.endswith(IMAGE_FILE_EXTENSION):
+                        self.logger.info(f"Found img file: {img_f_name}")
+                        actionId = img_f_name.replace(IMAGE_FILE_EXTENSION, "")
+                        # print(f"Found img file: {img_f_name} id: {id}")
+                        img_f = os.path.abspath(os.path.join(f, img_f_name))
+                        self.image_paths[actionId] = img_f
+
+        # Assign available images
+        for actionId in self.actionid_transition_map:
+            if actionId in self.image_paths:
+                trans = self.actionid_transition_map[actionId]
+                s = trans.resulting_state_o
+                # TODO this assertion does not always hold
+                # probably create a set with (action_id, image)
+                # assert s.image_path is None or s.image_path == self.images[aid]
+                s.add_image_path(self.image_paths[actionId])
 
     def read_har_network(self, model_dir):
         for trace in self.traces:
@@ -139,6 +147,14 @@ class BaseExplorationModel(metaclass=ABCMeta):
                         f"Expected action ids to match transition: {transition.action_id}  page: {page.actionIdx}"
                     transition.network_page = page
 
+    def get_network_entries_table(self):
+        """
+        See Har.construct_network_entries_table.
+        """
+        if self.network_entries_table is None:
+            self.network_entries_table = Har.construct_network_entries_table(self.hars)
+        return self.network_entries_table
+
     def set_home_state(self, state):
         assert state.is_home_screen
         if not state.atd_records and not state.widgets:
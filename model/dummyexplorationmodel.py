@@ -2,6 +2,7 @@
 import os
 
 from model.explorationmodel import ExplorationModel
+from model.har import Har
 from usecaseclassification.processor.transitionusecaseexclusioncriterion import TransitionUseCaseExclusionCriterion
 from usecaseclassification.processor.usecasepathexclusioncriterion import UseCasePathExclusionCriterion
 from usecaseclassification.usecaseexecutionmanager import UseCaseExecutionManager
@@ -37,6 +38,7 @@ class DummyExplorationModel(object):
 
         # Network
         self.hars = []
+        self.network_entries_table = None
 
         self.use_case_manager = use_case_manager
         self.matrics_playback_dir = matrics_playback_dir
@@ -81,6 +83,11 @@ class DummyExplorationModel(object):
                                      matrics_playback_dir=matrics_playback_dir,
                                      compute_use_case_executions_b=compute_use_case_executions_b)
 
+    def get_network_entries_table(self):
+        if self.network_entries_table is None:
+            self.network_entries_table = Har.construct_network_entries_table(self.hars)
+        return self.network_entries_table
+
     def get_use_case_execution_manager(self):
         use_case_execution_manager = None
         if configutil.MATRICS_CACHE_READ:
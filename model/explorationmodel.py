@@ -1,12 +1,12 @@
 # -*- coding: utf-8 -*-
-import json
 import os
-import pickle
+import time
 from typing import Set
 
 from graph import graph
 from model.tagger.apphomestatetagger import AppHomeStateVerifiedUCETagger, AppHomeStateComputedUCETagger
 from model.baseexplorationmodel import BaseExplorationModel
+from model.featuredirindex import get_feature_dir_index
 from model.tagger.apphomestatetagmanager import AppHomeStateTagManager
 from usecaseclassification.processor.transitionusecaseexclusioncriterion import TransitionUseCaseExclusionCriterion
 from usecaseclassification.processor.usecasepathexclusioncriterion import UseCasePathExclusionCriterion
@@ -16,6 +16,9 @@ from usecaseclassification.processor.usecaseprocessorinteractionselection import
 from util import configutil
 from util.pathutil import create_dir_if_non_existing
 from model.atd import ATD, ATDRecord
+from model.modelsnapshot import ModelSnapshot
+from util import fingerprintutil
+from util.jsonutil import load_json_file
 from visualization.visdccusecaseexecutionsviz import VisdccUseCaseExecutionsViz
 
 
@@ -88,24 +91,73 @@ class ExplorationModel(BaseExplorationModel):
                                compute_use_case_executions_b,
                                load_from_file=False):
         dump_f = os.path.join(exploration_model_dir, EXPLORATION_MODEL_FILE_NAME)
-        exploration_model = None
-        if load_from_file and os.path.isfile(dump_f):
-            with open(dump_f, 'rb') as f:
-                exploration_model = pickle.load(f)
-        else:
-            exploration_model = ExplorationModel(app=app,
-                                                 package_name=package_name,
-                                                 exploration_model_dir=exploration_model_dir,
-                                                 feature_dir=feature_dir,
-                                                 evaluation_dir=evaluation_dir,
-                                                 use_case_manager=use_case_manager,
-                                                 matrics_playback_dir=matrics_playback_dir,
-                                                 compute_use_case_executions_b=compute_use_case_executions_b)
-            # Enable dumping when we are able to pickle the data structures.
-            # with open(dump_f, 'wb') as f:
-            #     pickle.dump(exploration_model, f, pickle.HIGHEST_PROTOCOL)
+        start_time = time.time()
+        # The fingerprint is also used as cache key of the metrics data
+        fingerprint = ExplorationModel.get_source_fingerprint(package_name,
+                                                              exploration_model_dir,
+                                                              feature_dir,
+                                                              use_case_manager.atd_path,
+                                                              matrics_playback_dir,
+                                                              compute_use_case_executions_b)
+        if load_from_file:
+            snapshot = ModelSnapshot.load_from_file(dump_f, fingerprint)
+            if snapshot is not None:
+                exploration_model = snapshot.restore(externals={'app': app})
+                if exploration_model.compute_use_case_executions_b:
+                    exploration_model.use_case_execution_manager.store_data()
+                print(f"Loaded model snapshot: {dump_f} in {time.time() - start_time:.2f}sec")
+                return exploration_model
+
+        exploration_model = ExplorationModel(app=app,
+                                             package_name=package_name,
+                                             exploration_model_dir=exploration_model_dir,
+                                             feature_dir=feature_dir,
+                                             evaluation_dir=evaluation_dir,
+                                             use_case_manager=use_case_manager,
+                                             matrics_playback_dir=matrics_playback_dir,
+                                             compute_use_case_executions_b=compute_use_case_executions_b)
+        exploration_model.source_fingerprint = fingerprint
+        if load_from_file:
+            ModelSnapshot.create(exploration_model, externals={'app': app}).dump_to_file(dump_f, fingerprint)
         return exploration_model
 
+    @staticmethod
+    def get_source_fingerprint(package_name,
+                               exploration_model_dir,
+                               feature_dir,
+                               atd_path,
+                               matrics_playback_dir,
+                               compute_use_case_executions_b) -> str:
+        """
+        Fingerprint over all ToGAPE output files the exploration model is built from: states, traces, HARs,
+        ATD records, images, playback results and playback models.
+        """
+        exclude_dir_names = (configutil.RESIZE_IMG_SUBDIR, configutil.ATD_IMG_SUBDIR)
+        entries = fingerprintutil.get_dir_entries(exploration_model_dir,
+                                                  exclude_dir_names=exclude_dir_names,
+                                                  exclude_file_names=(EXPLORATION_MODEL_FILE_NAME,))
+        entries += fingerprintutil.get_dir_entries(feature_dir,
+                                                   name_filter=lambda f_name: package_name in f_name,
+                                                   exclude_dir_names=exclude_dir_names,
+                                                   exclude_file_names=(configutil.IMAGE_HASH_STORE_FILE_NAME,))
+        entries += fingerprintutil.get_dir_entries(os.path.join(matrics_playback_dir,
+                                                                configutil.TOGAPE_MODEL_DIR_NAME,
+                                                                package_name),
+                                                   name_filter=lambda f_name: f_name.startswith(configutil.PLAYBACK_RESULTS_CSV_PREFIX))
+        parent_exploration_dir = os.path.dirname(os.path.dirname(os.path.dirname(exploration_model_dir)))
+        for i in range(1, configutil.MATRICS_PLAYBACK_ITERATION_NUMBER + 1):
+            entries += fingerprintutil.get_dir_entries(os.path.join(parent_exploration_dir,
+                                                                    f"playback{i}",
+                                                                    configutil.TOGAPE_MODEL_DIR_NAME,
+                                                                    package_name),
+                                                       exclude_dir_names=exclude_dir_names,
+                                                       exclude_file_names=(EXPLORATION_MODEL_FILE_NAME,))
+        entries += fingerprintutil.get_dir_entries(atd_path) if os.path.isdir(atd_path) \
+            else [fingerprintutil.get_file_entry(atd_path)]
+        return fingerprintutil.get_fingerprint(entries,
+                                               compute_use_case_executions_b,
+                                               configutil.MATRICS_TAG_APP_HOME_STATE)
+
     @staticmethod
     def convert_to_atds(atd_records_d, uid_widget_map):
         atd_records = []
@@ -144,22 +196,21 @@ class ExplorationModel(BaseExplorationModel):
 
     def read_atds(self, feature_dir):
         num_atd_files = 0
-        for f_name in os.listdir(feature_dir):
-            f = os.path.join(feature_dir, f_name)
-            if os.path.isfile(f) and f_name.startswith(f"ATD-R_"):
-                for t in self.traces:
-                    if f_name == f"ATD-R_{self.package_name}-{t.unique_id}.json":
-                        print(f"Found atd file: {f}")
-                        num_atd_files += 1
-                        with open(f) as json_file:
-                            data = json.load(json_file)
-                            assert data['appName'] == self.package_name
-                            assert data['traceId'] == t.unique_id
-                            state_ATDs = data['stateATDs']
-                            for s_id in state_ATDs:
-                                s = self.uid_state_map[s_id]
-                                s.process_atd_records(ExplorationModel.convert_to_atds(state_ATDs[s_id], self.uid_widget_map))
-                                s.draw_ATDs_on_img()
+        feature_dir_index = get_feature_dir_index(feature_dir)
+        for t in self.traces:
+            f = feature_dir_index.get_atd_file(self.package_name, t.unique_id)
+            if f is None:
+                continue
+            print(f"Found atd file: {f}")
+            num_atd_files += 1
+            data = load_json_file(f)
+            assert data['appName'] == self.package_name
+            assert data['traceId'] == t.unique_id
+            state_ATDs = data['stateATDs']
+            for s_id in state_ATDs:
+                s = self.uid_state_map[s_id]
+                s.process_atd_records(ExplorationModel.convert_to_atds(state_ATDs[s_id], self.uid_widget_map))
+                s.draw_ATDs_on_img()
         assert num_atd_files == len(self.traces), f"Unexpected number of found atd files = {num_atd_files} num traces: {len(self.traces)}"
 
     def tag_app_home_state(self):
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import os
+from typing import List, Optional
+
+ATD_FILE_PREFIX = "ATD-R_"
+ATD_FILE_EXTENSION = ".json"
+IMAGE_DIR_SEPARATOR = "-images_"
+
+
+class FeatureDirIndex(object):
+    """
+    Index of the ATD files and image directories of the feature dir of ToGAPE, which is shared by all apps:
+    package name -> trace id -> path. The feature dir is listed once and every app looks up its traces instead
+    of matching all file names against all of its traces.
+
+    File names:
+        ATD-R_<package name>-<trace id>.json
+        <package name>-images_<trace id>
+    Package names do not contain '-', trace ids do.
+    """
+
+    def __init__(self, feature_dir):
+        self.feature_dir = feature_dir
+        # Plain dicts, so the index can be passed to worker processes
+        self.package_atd_files_map = {}
+        self.package_image_dirs_map = {}
+        with os.scandir(feature_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    if entry.name.startswith(ATD_FILE_PREFIX) and entry.name.endswith(ATD_FILE_EXTENSION):
+                        package_name, sep, trace_id = \
+                            entry.name[len(ATD_FILE_PREFIX):-len(ATD_FILE_EXTENSION)].partition("-")
+                        if sep:
+                            self.package_atd_files_map.setdefault(package_name, {})[trace_id] = entry.path
+                elif entry.is_dir():
+                    package_name, sep, trace_id = entry.name.rpartition(IMAGE_DIR_SEPARATOR)
+                    if sep:
+                        self.package_image_dirs_map.setdefault(package_name, {}).setdefault(trace_id, []).append(entry.path)
+
+    def get_atd_file(self, package_name, trace_id) -> Optional[str]:
+        return self.package_atd_files_map.get(package_name, {}).get(trace_id)
+
+    def get_image_dirs(self, package_name, trace_id) -> List[str]:
+        return self.package_image_dirs_map.get(package_name, {}).get(trace_id, [])
+
+
+# Feature dir -> index, the index is built once per run and shared by all apps of the process
+_feature_dir_indices = {}
+
+
+def reset_feature_dir_indices() -> None:
+    """
+    Drops the indices of the previous run, e.g. of a previous analysis in the dashboard.
+    """
+    _feature_dir_indices.clear()
+
+
+def get_feature_dir_index(feature_dir) -> FeatureDirIndex:
+    index = _feature_dir_indices.get(feature_dir)
+    if index is None:
+        index = FeatureDirIndex(feature_dir)
+        _feature_dir_indices[feature_dir] = index
+    return index
+
+
+def set_feature_dir_index(index: FeatureDirIndex) -> None:
+    """
+    Shares the index built by the main process, e.g. with the ingestion workers.
+    """
+    _feature_dir_indices[index.feature_dir] = index
@@ -2,11 +2,32 @@
 from dataclasses import dataclass
 from typing import List
 
-import json
 import ast
+import collections
+import re
+
+import numpy as np
+import pandas as pd
+
+from util.jsonstreamutil import JsonStreamReader
+
+
+# Title of a HAR page as written by ToGAPE, a python dict literal
+_PAGE_TITLE_REGEX = re.compile(r"""\{\s*(['"])actionIdx\1\s*:\s*(['"]?)(-?\d+)\2\s*,\s*"""
+                               r"""(['"])traceId\4\s*:\s*(['"])([^'"\\]*)\5\s*\}""")
+
 
 
 class Har(object):
+    # Columns of the network entries table, see construct_network_entries_table
+    COLUMN_TRACE_ID = 'traceId'
+    COLUMN_PAGE_ID = 'pageId'
+    COLUMN_ACTION_IDX = 'actionIdx'
+    COLUMN_WAIT = 'wait'
+    COLUMN_REQUEST_BODY_SIZE = 'requestBodySize'
+    COLUMN_RESPONSE_BODY_SIZE = 'responseBodySize'
+    COLUMN_STATUS = 'status'
+
     def __init__(self, file_path, uid_trace_map):
         self.file_path = file_path
         self.version = None
@@ -21,15 +42,105 @@ class Har(object):
             raise RuntimeError(f"Processing error in file {file_path} : {e}")
 
     def construct_from_file(self, file_path, uid_trace_map):
+        """
+        The file is read incrementally, only a single entry is decoded at a time. The bodies are not kept, a
+        response body is read from the file on request, see HarContent.text.
+        """
+        with open(file_path, newline='') as f:
+            reader = JsonStreamReader(f)
+            for key in reader.iter_object():
+                if key != 'log':
+                    reader.skip_value()
+                    continue
+                # Entries preceding the pages are constructed after the pages were read
+                entries_j = []
+                for log_key in reader.iter_object():
+                    if log_key == 'version':
+                        self.version = reader.read_value()
+                    elif log_key == 'creator':
+                        self.creator = reader.read_value()
+                    elif log_key == 'pages':
+                        self.pages = Har.construct_pages_from_jsono((reader.read_value() for _ in reader.iter_array()),
+                                                                    uid_trace_map)
+                        self.page_id_page_o_map = {page.id: page for page in self.pages}
+                    elif log_key == 'entries':
+                        self.entries = []
+                        for idx in reader.iter_array():
+                            entry_j = reader.read_value()
+                            if self.pages is None:
+                                entries_j.append(Har.drop_bodies(entry_j))
+                            else:
+                                self.entries.append(Har.construct_entry_from_jsono(entry_j,
+                                                                                   self.page_id_page_o_map,
+                                                                                   file_path,
+                                                                                   idx))
+                    elif log_key == 'comment':
+                        self.comment = reader.read_value()
+                    else:
+                        reader.skip_value()
+                if self.pages is None:
+                    raise KeyError('pages')
+                if self.entries is None:
+                    raise KeyError('entries')
+                if entries_j:
+                    self.entries = [Har.construct_entry_from_jsono(entry_j, self.page_id_page_o_map, file_path, idx)
+                                    for idx, entry_j in enumerate(entries_j)]
+
+    @staticmethod
+    def drop_bodies(entry_j):
+        """
+        Removes the request and response bodies of the decoded entry.
+        """
+        entry_j['response']['content'].pop('text', None)
+        post_data_j = entry_j['request'].get('postData')
+        if post_data_j is not None:
+            post_data_j.pop('text', None)
+        return entry_j
+
+    @staticmethod
+    def read_entry_text(file_path, entry_idx) -> str:
+        """
+        :return: The response body of the entry or "" if it has none.
+        """
         with open(file_path, newline='') as f:
-            l = json.load(f)
-            log = l['log']
-            self.version = log['version']
-            self.creator = log['creator']
-            self.pages = Har.construct_pages_from_jsono(log['pages'], uid_trace_map)
-            self.page_id_page_o_map = {page.id: page for page in self.pages}
-            self.entries = Har.construct_entries_from_jsono(log['entries'], self.page_id_page_o_map)
-            self.comment = log['comment']
+            reader = JsonStreamReader(f)
+            for key in reader.iter_object():
+                if key != 'log':
+                    reader.skip_value()
+                    continue
+                for log_key in reader.iter_object():
+                    if log_key != 'entries':
+                        reader.skip_value()
+                        continue
+                    for idx in reader.iter_array():
+                        if idx == entry_idx:
+                            entry_j = reader.read_value()
+                            return entry_j['response']['content'].get('text', "")
+                        reader.skip_value()
+        raise KeyError(f"Entry {entry_idx} not found in {file_path}")
+
+    @staticmethod
+    def construct_network_entries_table(hars) -> pd.DataFrame:
+        """
+        Columnar table of the entries of the HARs with one row per entry in HAR order. Pages are identified by
+        trace id and page id, the HAR of a trace contains every page id once.
+        """
+        entries = [entry for har in hars for entry in har.entries]
+        return pd.DataFrame({
+            Har.COLUMN_TRACE_ID: [entry.pageref_o.traceId for entry in entries],
+            Har.COLUMN_PAGE_ID: [entry.pageref for entry in entries],
+            Har.COLUMN_ACTION_IDX: np.array([entry.pageref_o.actionIdx for entry in entries], dtype=np.int64),
+            Har.COLUMN_WAIT: np.array([entry.timings.wait for entry in entries], dtype=np.int64),
+            Har.COLUMN_REQUEST_BODY_SIZE: np.array([entry.request.bodySize for entry in entries], dtype=np.int64),
+            Har.COLUMN_RESPONSE_BODY_SIZE: np.array([entry.response.bodySize for entry in entries], dtype=np.int64),
+            Har.COLUMN_STATUS: np.array([entry.response.status for entry in entries], dtype=np.int64),
+        }, columns=[Har.COLUMN_TRACE_ID,
+                    Har.COLUMN_PAGE_ID,
+                    Har.COLUMN_ACTION_IDX,
+                    Har.COLUMN_WAIT,
+                    Har.COLUMN_REQUEST_BODY_SIZE,
+                    Har.COLUMN_RESPONSE_BODY_SIZE,
+                    Har.COLUMN_STATUS])
 
     @staticmethod
     def construct_page_timings_from_jsono(page_timings_j):
@@ -38,14 +149,9 @@ class Har(object):
     @staticmethod
     def construct_pages_from_jsono(pages_j, uid_trace_map):
         pages = []
+        trace_id_pages_map = collections.defaultdict(list)
         for page_j in pages_j:
             actionIdx, traceId = HarPage.parse_title(page_j['title'])
-            if traceId in uid_trace_map:
-                trace = uid_trace_map[traceId]
-            else:
-                assert traceId == '-1' and actionIdx == -1,\
-                    f"No trace found with actionIdx '{actionIdx}' and traceId '{traceId}' in HarPage."
-                trace = None
             page = HarPage(page_j['id'],
                            page_j['startedDateTime'],
                            page_j['title'],
@@ -53,30 +159,38 @@ class Har(object):
                            page_j['comment'],
                            actionIdx,
                            traceId,
-                           trace)
+                           None)
             pages.append(page)
-            if trace is not None:
-                trace.network_pages.add(page)
+            trace_id_pages_map[traceId].append(page)
+
+        # Link the pages once per trace
+        for traceId, trace_pages in trace_id_pages_map.items():
+            if traceId in uid_trace_map:
+                trace = uid_trace_map[traceId]
+                for page in trace_pages:
+                    page.trace = trace
+                trace.network_pages.update(trace_pages)
+            else:
+                for page in trace_pages:
+                    assert traceId == '-1' and page.actionIdx == -1,\
+                        f"No trace found with actionIdx '{page.actionIdx}' and traceId '{traceId}' in HarPage."
         return pages
 
     @staticmethod
-    def construct_entries_from_jsono(entries_j, page_id_page_o_map) -> List:
-        entries = []
-        for entry_j in entries_j:
-            pageref = page_id_page_o_map[entry_j['pageref']]
-            server_ip_address = entry_j['serverIPAddress'] if 'serverIPAddress' in entry_j else ""
-            entry = HarEntry(entry_j['pageref'],
-                             pageref,
-                             entry_j['startedDateTime'],
-                             Har.construct_request_from_jsono(entry_j['request']),
-                             Har.construct_response_from_jsono(entry_j['response']),
-                             entry_j['cache'],
-                             Har.construct_timings_from_jsono(entry_j['timings']),
-                             server_ip_address,
-                             entry_j['comment'])
-            entries.append(entry)
-            pageref.ref_entries.add(entry)
-        return entries
+    def construct_entry_from_jsono(entry_j, page_id_page_o_map, file_path, entry_idx):
+        pageref = page_id_page_o_map[entry_j['pageref']]
+        server_ip_address = entry_j['serverIPAddress'] if 'serverIPAddress' in entry_j else ""
+        entry = HarEntry(entry_j['pageref'],
+                         pageref,
+                         entry_j['startedDateTime'],
+                         Har.construct_request_from_jsono(entry_j['request']),
+                         Har.construct_response_from_jsono(entry_j['response'], file_path, entry_idx),
+                         entry_j['cache'],
+                         Har.construct_timings_from_jsono(entry_j['timings']),
+                         server_ip_address,
+                         entry_j['comment'])
+        pageref.ref_entries.add(entry)
+        return entry
 
     @staticmethod
     def construct_request_from_jsono(request_j):
@@ -91,7 +205,7 @@ class Har(object):
                           request_j['comment'])
 
     @staticmethod
-    def construct_response_from_jsono(response_j):
+    def construct_response_from_jsono(response_j, file_path, entry_idx):
         _error = response_j['_error'] if '_error' in response_j else None
         body_size = int(response_j['bodySize'])
         return HarResponse(response_j['status'],
@@ -99,7 +213,7 @@ class Har(object):
                            response_j['httpVersion'],
                            response_j['cookies'],
                            response_j['headers'],
-                           Har.construct_content_from_jsono(response_j['content']),
+                           Har.construct_content_from_jsono(response_j['content'], file_path, entry_idx),
                            response_j['redirectURL'],
                            response_j['headersSize'],
                            body_size,
@@ -120,13 +234,13 @@ class Har(object):
                           wait)
 
     @staticmethod
-    def construct_content_from_jsono(content_j):
+    def construct_content_from_jsono(content_j, file_path, entry_idx):
         try:
-            text = content_j['text'] if 'text' in content_j else ""
             return HarContent(content_j['size'],
                               content_j['mimeType'],
-                              text,
-                              content_j['comment'])
+                              content_j['comment'],
+                              file_path,
+                              entry_idx)
         except KeyError as e:
             raise KeyError(f"Error processing content_j {content_j} : {e}")
 
@@ -163,8 +277,13 @@ class HarPage(object):
     def parse_title(title):
         """
         Example:
-            actionIdx:3;traceId:12d86c17-78e4-4dac-a9eb-51c82eb6ea5d
+            {'actionIdx':3,'traceId':'12d86c17-78e4-4dac-a9eb-51c82eb6ea5d'}
+
+        Titles of the known format are parsed by a regular expression, others by the python parser.
         """
+        match = _PAGE_TITLE_REGEX.fullmatch(title.strip())
+        if match is not None:
+            return int(match.group(3)), match.group(6)
         d = ast.literal_eval(title)
         return int(d['actionIdx']), d['traceId']
 
@@ -214,8 +333,17 @@ class HarRequest:
 class HarContent:
     size: int
     mimeType: str
-    text: str
     comment: str
+    # Location of the response body in the HAR file
+    har_file_path: str
+    entry_idx: int
+
+    @property
+    def text(self) -> str:
+        """
+        The response body is only read from the HAR file on request.
+        """
+        return Har.read_entry_text(self.har_file_path, self.entry_idx)
 
     def graph_info(self):
         return f"Content(size: {self.size})"
@@ -14,10 +14,14 @@ from model.androidapp import App
 from outlierdetection import univariateoutlierdetection
 from plotconfiguration import PlotConfiguration, PlotStyle
 from usecaseclassification.usecasemanager import UseCaseManager
-from util import configutil, statisticsutil
+from metrics.datacache import get_data_cache
+from util import configutil, statisticsutil, fingerprintutil
 from util.configutil import MATRICS_CFG_APP_FILTER_LIST, MATRICS_CFG_MODEL_ACCESSOR_SELECTION
 from util.latexutil import texify
 
+# Stage reported to the progress callback of construct_metrics
+PROGRESS_STAGE_METRICS = "metrics"
+
 
 class Model(object):
 
@@ -58,6 +62,9 @@ class Model(object):
         self.atd_path = config_togape[configutil.TOGAPE_CFG_ATD_PATH]
         self.use_case_manager = UseCaseManager(self.atd_path)
 
+    def get_cache_fingerprint(self):
+        return fingerprintutil.get_value_fingerprint(self.apps)
+
     def get_apps_sorted(self):
         return sorted(self.apps, key=operator.attrgetter('package_name'))
 
@@ -75,18 +82,23 @@ class Model(object):
             plot_style = PlotStyle.BAR
         return PlotConfiguration(univariate_plot_style=plot_style, axis_type="linear")
 
-    def construct_metrics(self):
+    def construct_metrics(self, progress_callback=None):
         """
         We could parallelize this step, if it takes too much time.
+
+        :param progress_callback: Called with (PROGRESS_STAGE_METRICS, done, total) after each metric.
         """
         model_accessors_ls = MODEL_ACCESSORS_ALL if MATRICS_CFG_MODEL_ACCESSOR_SELECTION not in self.matrics_config else self.matrics_config[MATRICS_CFG_MODEL_ACCESSOR_SELECTION]
         model_accessors = {}
-        for m in tqdm(model_accessors_ls, desc="Metrics"):
+        for i, m in enumerate(tqdm(model_accessors_ls, desc="Metrics")):
             # print(f"Model accessor: {m}")
             m_: ModelAccessor = m(model=self, outlier_method=self.univariate_outlier_method)
             model_accessors[m_.get_id()] = m_
+            if progress_callback is not None:
+                progress_callback(PROGRESS_STAGE_METRICS, i + 1, len(model_accessors_ls))
 
         self.model_accessors = model_accessors
+        print(get_data_cache().get_stats())
 
         self.print_latex()
 
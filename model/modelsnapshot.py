@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+import collections
+import os
+import pickle
+import sys
+from enum import Enum
+from typing import Optional
+
+import networkx as nx
+
+from datatypes.orderedset import OrderedSet
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Increase when the model classes or the construction of the models change, this invalidates all snapshot files
+SNAPSHOT_FORMAT_VERSION = 7
+
+# Every tuple inside an encoded value is a tagged entry. Plain tuples of the model are encoded with _TUPLE,
+# containers are stored once in the container table and referenced by _CONTAINER.
+_REF = 0
+_EXTERNAL = 1
+_TUPLE = 2
+_CONTAINER = 3
+
+_LIST = 0
+_SET = 1
+_FROZENSET = 2
+_DICT = 3
+_ORDERED_DICT = 4
+_DEFAULT_DICT = 5
+_ORDERED_SET = 6
+_GRAPH = 7
+
+# Containers whose construction hashes their elements
+_HASHED_CONTAINERS = {_SET, _FROZENSET, _DICT, _ORDERED_DICT, _DEFAULT_DICT, _ORDERED_SET, _GRAPH}
+
+_LEAF_TYPES = {str, int, float, bool, bytes, type(None)}
+
+
+class ModelSnapshot(object):
+    """
+    Flat, ID-referenced representation of an object graph of the model (app, exploration model, states,
+    widgets, transitions, traces, HAR pages and entries, ATD records, ...).
+
+    The model is heavily cross-linked (state -> transition -> state, widget -> state, ...) and many of the
+    objects are stored in sets and dicts while hashing over their own fields. Pickling such a graph directly
+    either runs out of recursion depth or rebuilds the sets before the objects' fields are restored.
+    The snapshot stores every model object exactly once in a table, replaces all pointers by table indices
+    and only holds plain python values, so it can be pickled and sent between processes cheaply.
+    Restoring first creates all objects, then sets their fields and only afterwards builds the hashed
+    containers.
+    """
+
+    def __init__(self):
+        self.classes = []
+        self.objects = []
+        self.containers = []
+        self.root = None
+        self._class_idx = {}
+        self._object_idx = {}
+        self._container_idx = {}
+        self._external_keys = {}
+        self._queue = collections.deque()
+
+    def __getstate__(self):
+        return {
+            'classes': self.classes,
+            'objects': self.objects,
+            'containers': self.containers,
+            'root': self.root,
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    @staticmethod
+    def create(root, externals=None) -> 'ModelSnapshot':
+        """
+        :param root: The object to snapshot, e.g. an app.
+        :param externals: Dict of key -> object. These objects are not part of the snapshot and have to be
+        provided again on restore.
+        """
+        snapshot = ModelSnapshot()
+        if externals is not None:
+            snapshot._external_keys = {id(obj): key for key, obj in externals.items()}
+        snapshot.root = snapshot._encode(root)
+        while snapshot._queue:
+            obj, idx = snapshot._queue.popleft()
+            snapshot.objects[idx] = (snapshot.objects[idx][0], snapshot._encode_fields(obj))
+        snapshot._class_idx = {}
+        snapshot._object_idx = {}
+        snapshot._container_idx = {}
+        snapshot._external_keys = {}
+        return snapshot
+
+    def restore(self, externals=None):
+        return _SnapshotRestorer(self, {} if externals is None else externals).restore()
+
+    def dump_to_file(self, path, fingerprint) -> None:
+        """
+        Writes the snapshot atomically. The header with the fingerprint is written separately, so a stale
+        snapshot is detected without unpickling the whole file.
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((SNAPSHOT_FORMAT_VERSION, fingerprint), f, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(self, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load_from_file(path, fingerprint) -> Optional['ModelSnapshot']:
+        """
+        :return: The snapshot or None if the file does not exist, is stale or cannot be read.
+        """
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                if pickle.load(f) != (SNAPSHOT_FORMAT_VERSION, fingerprint):
+                    return None
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            print(f"Could not load snapshot {path}: {e}")
+            return None
+
+    def number_of_objects(self) -> int:
+        return len(self.objects)
+
+    @staticmethod
+    def is_model_class(cls) -> bool:
+        is_model = _MODEL_CLASS_CACHE.get(cls)
+        if is_model is None:
+            module = sys.modules.get(cls.__module__)
+            module_file = getattr(module, '__file__', None)
+            is_model = module_file is not None and \
+                os.path.abspath(module_file).startswith(REPO_ROOT + os.sep) and \
+                not issubclass(cls, Enum) and \
+                cls is not ModelSnapshot
+            _MODEL_CLASS_CACHE[cls] = is_model
+        return is_model
+
+    def _encode(self, value):
+        t = type(value)
+        if t in _LEAF_TYPES:
+            return value
+        if t is tuple:
+            return _TUPLE, [self._encode(v) for v in value]
+        if id(value) in self._external_keys:
+            return _EXTERNAL, self._external_keys[id(value)]
+        if t is list or t is set or t is frozenset or t is dict or t is collections.OrderedDict or \
+                t is collections.defaultdict or t is OrderedSet or isinstance(value, nx.Graph):
+            return _CONTAINER, self._container(value)
+        if ModelSnapshot.is_model_class(t):
+            return _REF, self._object(value)
+        return value
+
+    def _object(self, obj) -> int:
+        idx = self._object_idx.get(id(obj))
+        if idx is None:
+            cls = type(obj)
+            cls_idx = self._class_idx.get(cls)
+            if cls_idx is None:
+                cls_idx = len(self.classes)
+                self.classes.append(cls)
+                self._class_idx[cls] = cls_idx
+            idx = len(self.objects)
+            self._object_idx[id(obj)] = idx
+            self.objects.append((cls_idx, None))
+            self._queue.append((obj, idx))
+        return idx
+
+    def _encode_fields(self, obj):
+        fields = []
+        if hasattr(obj, '__dict__'):
+            for name, value in obj.__dict__.items():
+                fields.append((name, self._encode(value)))
+        for name in _get_slots(type(obj)):
+            if hasattr(obj, name):
+                fields.append((name, self._encode(getattr(obj, name))))
+        return fields
+
+    def _container(self, value) -> int:
+        idx = self._container_idx.get(id(value))
+        if idx is not None:
+            return idx
+        idx = len(self.containers)
+        self._container_idx[id(value)] = idx
+        self.containers.append(None)
+
+        t = type(value)
+        if t is list:
+            entry = (_LIST, [self._encode(v) for v in value])
+        elif t is set:
+            entry = (_SET, [self._encode(v) for v in value])
+        elif t is frozenset:
+            entry = (_FROZENSET, [self._encode(v) for v in value])
+        elif t is OrderedSet:
+            entry = (_ORDERED_SET, [self._encode(v) for v in value])
+        elif t is dict:
+            entry = (_DICT, [(self._encode(k), self._encode(v)) for k, v in value.items()])
+        elif t is collections.OrderedDict:
+            entry = (_ORDERED_DICT, [(self._encode(k), self._encode(v)) for k, v in value.items()])
+        elif t is collections.defaultdict:
+            entry = (_DEFAULT_DICT, (value.default_factory,
+                                     [(self._encode(k), self._encode(v)) for k, v in value.items()]))
+        else:
+            if value.is_multigraph():
+                edges = [(self._encode(u), self._encode(v), self._encode(k), self._encode(d))
+                         for u, v, k, d in value.edges(keys=True, data=True)]
+            else:
+                edges = [(self._encode(u), self._encode(v), self._encode(d)) for u, v, d in value.edges(data=True)]
+            entry = (_GRAPH, (type(value),
+                              self._encode(value.graph),
+                              [(self._encode(n), self._encode(d)) for n, d in value.nodes(data=True)],
+                              edges))
+        self.containers[idx] = entry
+        return idx
+
+
+class _SnapshotRestorer(object):
+    def __init__(self, snapshot: ModelSnapshot, externals):
+        self.snapshot = snapshot
+        self.externals = externals
+        self.objects = [cls.__new__(cls) for cls in (snapshot.classes[cls_idx] for cls_idx, _ in snapshot.objects)]
+        self.containers = [None] * len(snapshot.containers)
+        self.hashed = [None] * len(snapshot.containers)
+
+    def restore(self):
+        # The hash of a model object may depend on its fields. Therefore, all fields that do not need hashing
+        # are set first and the sets and dicts are built afterwards.
+        deferred = []
+        for obj, (_, fields) in zip(self.objects, self.snapshot.objects):
+            for name, value in fields:
+                if self._needs_hashing(value):
+                    deferred.append((obj, name, value))
+                else:
+                    object.__setattr__(obj, name, self._decode(value))
+        for obj, name, value in deferred:
+            object.__setattr__(obj, name, self._decode(value))
+        return self._decode(self.snapshot.root)
+
+    def _needs_hashing(self, value) -> bool:
+        if type(value) is not tuple:
+            return False
+        tag, payload = value
+        if tag == _TUPLE:
+            return any(self._needs_hashing(v) for v in payload)
+        if tag == _CONTAINER:
+            return self._container_needs_hashing(payload)
+        return False
+
+    def _container_needs_hashing(self, idx) -> bool:
+        hashed = self.hashed[idx]
+        if hashed is None:
+            # Guard against cyclic containers
+            self.hashed[idx] = False
+            kind, payload = self.snapshot.containers[idx]
+            hashed = kind in _HASHED_CONTAINERS or any(self._needs_hashing(v) for v in payload)
+            self.hashed[idx] = hashed
+        return hashed
+
+    def _decode(self, value):
+        if type(value) is not tuple:
+            return value
+        tag, payload = value
+        if tag == _REF:
+            return self.objects[payload]
+        if tag == _CONTAINER:
+            return self._decode_container(payload)
+        if tag == _TUPLE:
+            return tuple(self._decode(v) for v in payload)
+        if tag == _EXTERNAL:
+            assert payload in self.externals, f"Missing external object for the snapshot: {payload}"
+            return self.externals[payload]
+        raise ValueError(f"Unknown snapshot tag: {tag}")
+
+    def _decode_container(self, idx):
+        container = self.containers[idx]
+        if container is not None:
+            return container
+        kind, payload = self.snapshot.containers[idx]
+        if kind == _LIST:
+            container = []
+            self.containers[idx] = container
+            container.extend(self._decode(v) for v in payload)
+        elif kind == _SET:
+            container = set(self._decode(v) for v in payload)
+        elif kind == _FROZENSET:
+            container = frozenset(self._decode(v) for v in payload)
+        elif kind == _ORDERED_SET:
+            container = OrderedSet(self._decode(v) for v in payload)
+        elif kind == _DICT:
+            container = {self._decode(k): self._decode(v) for k, v in payload}
+        elif kind == _ORDERED_DICT:
+            container = collections.OrderedDict((self._decode(k), self._decode(v)) for k, v in payload)
+        elif kind == _DEFAULT_DICT:
+            default_factory, items = payload
+            container = collections.defaultdict(default_factory,
+                                                ((self._decode(k), self._decode(v)) for k, v in items))
+        elif kind == _GRAPH:
+            graph_cls, graph_attr, nodes, edges = payload
+            container = graph_cls()
+            container.graph.update(self._decode(graph_attr))
+            container.add_nodes_from((self._decode(n), self._decode(d)) for n, d in nodes)
+            if container.is_multigraph():
+                container.add_edges_from((self._decode(u), self._decode(v), self._decode(k), self._decode(d))
+                                         for u, v, k, d in edges)
+            else:
+                container.add_edges_from((self._decode(u), self._decode(v), self._decode(d)) for u, v, d in edges)
+        else:
+            raise ValueError(f"Unknown snapshot container: {kind}")
+        self.containers[idx] = container
+        return container
+
+
+_MODEL_CLASS_CACHE = {}
+
+
+def _get_slots(cls):
+    slots = []
+    for c in cls.__mro__:
+        c_slots = c.__dict__.get('__slots__', ())
+        if isinstance(c_slots, str):
+            c_slots = (c_slots,)
+        slots.extend(s for s in c_slots if s not in ('__dict__', '__weakref__'))
+    return slots
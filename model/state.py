@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import os
+from typing import List
 
 import dash_table
 import pandas as pd
@@ -8,8 +9,9 @@ import colorconstants
 from datatypes.orderedset import OrderedSet
 from model.atd import ATD, ATDRecord
 from model.widget import Widget
-from util.configutil import ATD_IMG_SUBDIR, RESIZE_IMG_SUBDIR
-from util.drawutil import draw_ATDs_on_img, dump_cv_img, resize_img
+from util.configutil import ATD_IMG_SUBDIR
+from util.drawutil import get_atd_boxes, is_img_file
+from util.imagederivativeutil import get_image_derivative_pipeline
 from util.modelutil import get_csv_writer
 from util.pathutil import append_subdir
 from util.typeutil import convert_bool_kotlin
@@ -31,7 +33,6 @@ class State(object):
         self.is_home_screen = is_home_screen
         self.widgets = set()  # Will be set later
         self.image_paths = OrderedSet()
-        self.image_small_paths = OrderedSet()
         self.image_atds_paths = OrderedSet()
         # From the corresponding transitions, just for debugging purposes
         self.action_ids = OrderedSet()
@@ -65,6 +66,28 @@ class State(object):
 
     @staticmethod
     def construct_from_state_file(state_file, uid_widget_map):
+        unique_id, is_home_screen = State.parse_state_file_name(state_file)
+        state = State(unique_id, is_home_screen)
+        widgets = Widget.construct_from_state_file(state_file, state, uid_widget_map)
+        state.widgets = widgets
+        return state
+
+    @staticmethod
+    def construct_from_state_files(state_files, uid_widget_map) -> List['State']:
+        """
+        Like construct_from_state_file, but the widgets of all state files are read at once.
+        """
+        states = [State(*State.parse_state_file_name(state_file)) for state_file in state_files]
+        widgets_list = Widget.construct_from_state_files(state_files, states, uid_widget_map)
+        for state, widgets in zip(states, widgets_list):
+            state.widgets = widgets
+        return states
+
+    @staticmethod
+    def parse_state_file_name(state_file):
+        """
+        :return: The unique id and whether it is the home screen.
+        """
         unique_id = os.path.basename(state_file)
         assert unique_id.endswith(".csv")
         unique_id = unique_id.replace(".csv", "")
@@ -72,10 +95,7 @@ class State(object):
         if unique_id.endswith(HOME_SCREEN_FILE_SUFFIX):
             is_home_screen = True
             unique_id = unique_id.replace(HOME_SCREEN_FILE_SUFFIX, "")
-        state = State(unique_id, is_home_screen)
-        widgets = Widget.construct_from_state_file(state_file, state, uid_widget_map)
-        state.widgets = widgets
-        return state
+        return unique_id, is_home_screen
 
     def dump_to_file(self, target_dir):
         """
@@ -148,29 +168,27 @@ class State(object):
         return sid[:length] + "..." + sid[-length:]
 
     def add_image_path(self, image_path):
-        # Create a downscaled image
-        img_path_small = append_subdir(image_path, RESIZE_IMG_SUBDIR)
+        """
+        Thumbnails are generated when they are requested, see ThumbnailCache.
+        """
         if image_path not in self.image_paths:
-            assert img_path_small not in self.image_small_paths, f"{img_path_small}"
-            if FORCE_REDRAWING or not os.path.isfile(img_path_small):
-                try:
-                    cv_img = resize_img(image_path, 0.5)
-                    dump_cv_img(cv_img, img_path_small)
-                    self.image_small_paths.add(img_path_small)
-                    self.image_paths.add(image_path)
-                except IOError as e:
-                    print(f"An error was handled: {e}")
-            else:
-                self.image_small_paths.add(img_path_small)
-                self.image_paths.add(image_path)
+            # Faulty images are skipped without decoding them
+            if not is_img_file(image_path):
+                print(f"An error was handled: Could not load image: {image_path}")
+                return
+            self.image_paths.add(image_path)
 
     def draw_ATDs_on_img(self):
-        # if self.image_path is not None:
+        """
+        The images are drawn in the background, see ImageDerivativePipeline.
+        """
+        boxes = None
         for image_path in self.image_paths:
             new_img_path = append_subdir(image_path, ATD_IMG_SUBDIR)
             if FORCE_REDRAWING or not os.path.isfile(new_img_path):
-                cv_img = draw_ATDs_on_img(image_path, self.atd_records)
-                dump_cv_img(cv_img, new_img_path)
+                if boxes is None:
+                    boxes = get_atd_boxes(self.atd_records)
+                get_image_derivative_pipeline().submit_overlay(image_path, new_img_path, boxes)
             self.image_atds_paths.add(new_img_path)
 
     def get_atd_records_table(self):
@@ -207,7 +225,6 @@ class State(object):
         self.atd_records.union(state_other.atd_records)
         self.outgoing_transitions.union(state_other.outgoing_transitions)
         self.image_paths.union(state_other.image_paths)
-        self.image_small_paths.union(state_other.image_small_paths)
         self.image_atds_paths.union(state_other.image_atds_paths)
         self.action_ids.union(state_other.action_ids)
         self.unique_features.union(state_other.unique_features)
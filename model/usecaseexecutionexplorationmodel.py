@@ -1,11 +1,91 @@
 # -*- coding: utf-8 -*-
+import multiprocessing as mp
+import os
+import time
+from typing import List
+
 from graph import graph
-from model.baseexplorationmodel import BaseExplorationModel
+from model.baseexplorationmodel import BaseExplorationModel, EXPLORATION_MODEL_FILE_NAME
+from model.modelsnapshot import ModelSnapshot
+from util import configutil
+from util import fingerprintutil
+
+
+def load_snapshot_in_worker(args) -> ModelSnapshot:
+    """
+    Loads a playback model in a worker process, see UseCaseExecutionExplorationModel.load_exploration_models.
+    The model is returned as snapshot, because its cyclic object graph cannot be pickled directly.
+    """
+    package_name, exploration_model_dir, trace_ids = args
+    return UseCaseExecutionExplorationModel.load_exploration_model(package_name,
+                                                                   exploration_model_dir,
+                                                                   trace_ids,
+                                                                   as_snapshot=True)
 
 
 class UseCaseExecutionExplorationModel(BaseExplorationModel):
-    def __init__(self, app, package_name, exploration_model_dir, feature_dir, evaluation_dir):
-        super().__init__(app, package_name, exploration_model_dir, feature_dir, evaluation_dir)
+    def __init__(self, app, package_name, exploration_model_dir, feature_dir, evaluation_dir, trace_ids=None):
+        super().__init__(app, package_name, exploration_model_dir, feature_dir, evaluation_dir, trace_ids)
         self.overall_graph: graph.Graph = self.create_graph()
 
         self.check_post_conditions()
+
+    @staticmethod
+    def get_source_fingerprint(exploration_model_dir, trace_ids) -> str:
+        """
+        Fingerprint over the ToGAPE output of the playback including its feature dir and the requested traces.
+        """
+        entries = fingerprintutil.get_dir_entries(exploration_model_dir,
+                                                  exclude_dir_names=(configutil.RESIZE_IMG_SUBDIR,
+                                                                     configutil.ATD_IMG_SUBDIR),
+                                                  exclude_file_names=(EXPLORATION_MODEL_FILE_NAME,
+                                                                      configutil.IMAGE_HASH_STORE_FILE_NAME))
+        return fingerprintutil.get_fingerprint(entries, sorted(trace_ids))
+
+    @staticmethod
+    def load_exploration_model(package_name, exploration_model_dir, trace_ids, as_snapshot=False):
+        """
+        The snapshot of the playback model is stored in its model dir and reused as long as the ToGAPE output
+        and the requested traces are unchanged.
+
+        :param as_snapshot: Returns the ModelSnapshot instead of the model, e.g. to pass it between processes.
+        """
+        dump_f = os.path.join(exploration_model_dir, EXPLORATION_MODEL_FILE_NAME)
+        start_time = time.time()
+        fingerprint = UseCaseExecutionExplorationModel.get_source_fingerprint(exploration_model_dir, trace_ids)
+        snapshot = ModelSnapshot.load_from_file(dump_f, fingerprint)
+        if snapshot is not None:
+            print(f"Loaded playback model snapshot: {dump_f} in {time.time() - start_time:.2f}sec")
+            return snapshot if as_snapshot else snapshot.restore()
+
+        model = UseCaseExecutionExplorationModel(app=None,
+                                                 package_name=package_name,
+                                                 exploration_model_dir=exploration_model_dir,
+                                                 feature_dir=os.path.join(exploration_model_dir,
+                                                                          configutil.TOGAPE_FEATURE_DIR_NAME),
+                                                 evaluation_dir=None,
+                                                 trace_ids=trace_ids)
+        snapshot = ModelSnapshot.create(model)
+        snapshot.dump_to_file(dump_f, fingerprint)
+        return snapshot if as_snapshot else model
+
+    @staticmethod
+    def load_exploration_models(package_name, exploration_model_dirs, trace_ids) -> List['UseCaseExecutionExplorationModel']:
+        """
+        Loads the playback models of the playback iterations. The iterations are independent of each other and
+        are loaded in worker processes, if possible. Daemonic processes, e.g. the ingestion workers of Matrics,
+        are not allowed to have children and load serially.
+
+        :param trace_ids: Only the traces of the use case executions are read.
+        """
+        workers = min(configutil.MATRICS_PLAYBACK_MODEL_WORKERS, len(exploration_model_dirs))
+        if workers <= 1 or mp.current_process().daemon:
+            return [UseCaseExecutionExplorationModel.load_exploration_model(package_name,
+                                                                            exploration_model_dir,
+                                                                            trace_ids)
+                    for exploration_model_dir in exploration_model_dirs]
+        args = [(package_name, exploration_model_dir, trace_ids) for exploration_model_dir in exploration_model_dirs]
+        # Spawned, the image derivatives are still written by threads of this process, see ImageDerivativePipeline
+        with mp.get_context('spawn').Pool(workers) as pool:
+            snapshots = pool.map(load_snapshot_in_worker, args)
+        return [snapshot.restore() for snapshot in snapshots]
@@ -2,10 +2,11 @@
 from typing import Set, List
 
 import numpy as np
+import pandas as pd
 
 import metadata
 from graph.path import Path
-from model.har import HarEntry
+from model.har import Har, HarEntry
 from model.state import State
 
 
@@ -19,13 +20,83 @@ class TraceView(object):
 
 
 class View(object):
+    # Additional columns of the network tables, the index of the transition in the view and of the trace view
+    COLUMN_STEP = 'step'
+    COLUMN_TRACE_VIEW = 'traceView'
+
     def __init__(self, use_case_execution):
         self.use_case_execution = use_case_execution
-        self.trace_views = [TraceView(trace, self.use_case_execution.start_index) for trace in self.use_case_execution.get_playback_traces()]
+        playback_traces_w_exploration_models = self.use_case_execution.get_playback_traces_w_exploration_models()
+        self.trace_views = [TraceView(trace, self.use_case_execution.start_index)
+                            for _, trace in playback_traces_w_exploration_models]
+        self.trace_view_exploration_models = [exploration_model
+                                              for exploration_model, _ in playback_traces_w_exploration_models]
         self.transitions_view_len = len(self.trace_views[0].transitions)
+        # Built on first use, see construct_network_tables
+        self.network_pages_table = None
+        self.network_entries_table = None
+
+    def construct_network_tables(self) -> None:
+        """
+        The pages table has a row for every step and trace view whose transition has a network page. The entries
+        table contains the rows of the network entries tables of the exploration models belonging to these pages
+        together with their step and trace view, ordered by step and trace view.
+        """
+        pages_steps = []
+        pages_trace_views = []
+        entries_tables = []
+        for t, (trace_view, exploration_model) in enumerate(zip(self.trace_views, self.trace_view_exploration_models)):
+            page_id_step_map = {}
+            for i in range(self.transitions_view_len):
+                network_page = trace_view.transitions[i].network_page
+                if network_page is not None:
+                    page_id_step_map[network_page.id] = i
+                    pages_steps.append(i)
+                    pages_trace_views.append(t)
+            table = exploration_model.get_network_entries_table()
+            table = table[table[Har.COLUMN_TRACE_ID] == trace_view.trace.unique_id]
+            steps = table[Har.COLUMN_PAGE_ID].map(page_id_step_map)
+            table = table[steps.notna()].copy()
+            table[View.COLUMN_STEP] = steps[steps.notna()].astype(np.int64)
+            table[View.COLUMN_TRACE_VIEW] = t
+            entries_tables.append(table)
+        self.network_pages_table = pd.DataFrame({View.COLUMN_STEP: np.array(pages_steps, dtype=np.int64),
+                                                 View.COLUMN_TRACE_VIEW: np.array(pages_trace_views, dtype=np.int64)},
+                                                columns=[View.COLUMN_STEP, View.COLUMN_TRACE_VIEW])
+        self.network_entries_table = pd.concat(entries_tables, ignore_index=True) \
+            .sort_values([View.COLUMN_STEP, View.COLUMN_TRACE_VIEW], kind='mergesort') \
+            .reset_index(drop=True)
+
+    def get_network_pages_table(self) -> pd.DataFrame:
+        if self.network_pages_table is None:
+            self.construct_network_tables()
+        return self.network_pages_table
+
+    def get_network_entries_table(self) -> pd.DataFrame:
+        if self.network_entries_table is None:
+            self.construct_network_tables()
+        return self.network_entries_table
+
+    def get_step_means(self, values: pd.Series) -> List[float]:
+        """
+        :return: The mean of the values of every step, 0 for steps without values.
+        """
+        entries = self.get_network_entries_table()
+        return values.groupby(entries.loc[values.index, View.COLUMN_STEP]).mean() \
+            .reindex(range(self.transitions_view_len), fill_value=0).tolist()
 
-    def data_op_func(self, data):
-        return np.mean(data)
+    def get_page_count_means_sum(self, counted: pd.Series) -> float:
+        """
+        :param counted: Boolean series over the entries table.
+        :return: The sum over the steps of the mean number of counted entries per page of the step.
+        """
+        pages = self.get_network_pages_table()
+        if pages.empty:
+            return 0
+        entries = self.get_network_entries_table()
+        counts = counted.groupby([entries[View.COLUMN_STEP], entries[View.COLUMN_TRACE_VIEW]]).sum()
+        page_counts = counts.reindex(pd.MultiIndex.from_frame(pages), fill_value=0)
+        return page_counts.groupby(level=0).mean().sum()
 
     # def modify_transitions(self):
     #     transitions = [trans.copy() for trans in self.trace_views[0].transitions]
@@ -64,23 +135,8 @@ class View(object):
                 for entry in trace.transitions[i].network_page.ref_entries]
 
     def get_network_timings_wait(self):
-        # trace_entries = [self.data_op_func(entry.timings.wait
-        #                                    for trace in self.trace_views
-        #                                    if trace.transitions[i].network_page is not None
-        #                                    for entry in trace.transitions[i].network_page.ref_entries)
-        #                  for i in range(self.transitions_view_len)]
-        trace_entries = []
-        for i in range(self.transitions_view_len):
-            waits = [entry.timings.wait
-                     for trace in self.trace_views
-                     if trace.transitions[i].network_page is not None
-                     for entry in trace.transitions[i].network_page.ref_entries]
-            # Only use the data_op_func if there are values inserted, otherwise the function would raise an
-            # exception. Therefore, add 0.
-            val = self.data_op_func(waits) if waits else 0
-            trace_entries.append(val)
-
-        return trace_entries
+        entries = self.get_network_entries_table()
+        return self.get_step_means(entries[Har.COLUMN_WAIT])
 
     def get_number_network_entries(self) -> int:
         """
@@ -91,22 +147,8 @@ class View(object):
 
         7 = 21 / 3
         """
-        # trace_entries = [self.data_op_func(len(trace.transitions[i].network_page.ref_entries)
-        #                                    for trace in self.trace_views
-        #                                    if trace.transitions[i].network_page is not None)
-        #                  ]
-        trace_entries = []
-        for i in range(self.transitions_view_len):
-            values_tmp = []
-            for trace in self.trace_views:
-                if trace.transitions[i].network_page is not None:
-                    values_tmp.append(len(trace.transitions[i].network_page.ref_entries))
-            # Only use the data_op_func if there are values inserted, otherwise the function would raise an
-            # exception. Therefore, add 0.
-            val = self.data_op_func(values_tmp) if values_tmp else 0
-            trace_entries.append(val)
-
-        return sum(trace_entries)
+        entries = self.get_network_entries_table()
+        return self.get_page_count_means_sum(pd.Series(True, index=entries.index))
 
     def get_number_network_errors(self) -> int:
         """
@@ -115,52 +157,16 @@ class View(object):
         Trace 2:    [2      2       2]
         View:       [7      7       7]
         """
-        trace_entries = []
-        for i in range(self.transitions_view_len):
-            values_tmp = []
-            for trace in self.trace_views:
-                if trace.transitions[i].network_page is not None:
-                    number_errors = sum(1 for entry in trace.transitions[i].network_page.ref_entries
-                                        if 400 <= entry.response.status < 600)
-                    values_tmp.append(number_errors)
-            # Only use the data_op_func if there are values inserted, otherwise the function would raise an
-            # exception. Therefore, add 0.
-            val = self.data_op_func(values_tmp) if values_tmp else 0
-            trace_entries.append(val)
-
-        return sum(trace_entries)
+        status = self.get_network_entries_table()[Har.COLUMN_STATUS]
+        return self.get_page_count_means_sum((400 <= status) & (status < 600))
 
     def get_network_payload_size_request(self):
-        trace_entries = []
-        for i in range(self.transitions_view_len):
-            payload_sizes = [entry.request.bodySize
-                             for trace in self.trace_views
-                             if trace.transitions[i].network_page is not None
-                             for entry in trace.transitions[i].network_page.ref_entries
-                             if entry.request.bodySize >= 0]
-
-            # Only use the data_op_func if there are values inserted, otherwise the function would raise an
-            # exception. Therefore, add 0.
-            val = self.data_op_func(payload_sizes) if payload_sizes else 0
-            trace_entries.append(val)
-
-        return trace_entries
+        body_sizes = self.get_network_entries_table()[Har.COLUMN_REQUEST_BODY_SIZE]
+        return self.get_step_means(body_sizes[body_sizes >= 0])
 
     def get_network_payload_size_response(self):
-        trace_entries = []
-        for i in range(self.transitions_view_len):
-            payload_sizes = [entry.response.bodySize
-                             for trace in self.trace_views
-                             if trace.transitions[i].network_page is not None
-                             for entry in trace.transitions[i].network_page.ref_entries
-                             if entry.response.bodySize >= 0]
-
-            # Only use the data_op_func if there are values inserted, otherwise the function would raise an
-            # exception. Therefore, add 0.
-            val = self.data_op_func(payload_sizes) if payload_sizes else 0
-            trace_entries.append(val)
-
-        return trace_entries
+        body_sizes = self.get_network_entries_table()[Har.COLUMN_RESPONSE_BODY_SIZE]
+        return self.get_step_means(body_sizes[body_sizes >= 0])
 
     def get_features(self) -> List[str]:
         uce_path: Path = self.use_case_execution.get_verified_computed_path()
@@ -1,5 +1,11 @@
 # -*- coding: utf-8 -*-
 import csv
+import io
+import sys
+from functools import lru_cache
+from typing import List
+
+import pandas as pd
 
 from util.modelutil import get_csv_dict_reader
 from util.typeutil import convert_bool_python
@@ -8,8 +14,12 @@ from util.typeutil import convert_bool_python
 class Rectangle(object):
     """
     Original class: org.droidmate.deviceInterface.exploration.Rectangle
+
+    Rectangles are not modified after their construction, equal rectangles of the state files share one object.
     """
 
+    __slots__ = ('leftX', 'topY', 'width', 'height')
+
     def __init__(self, left_x, top_y, width, height):
         self.leftX = left_x
         self.topY = top_y
@@ -17,6 +27,7 @@ class Rectangle(object):
         self.height = height
 
     @staticmethod
+    @lru_cache(maxsize=65536)
     def construct_from_str(_str):
         """
         Example:
@@ -41,6 +52,38 @@ class Rectangle(object):
 
 
 class Widget(object):
+    # Hundreds of thousands of widgets are created for larger apps
+    __slots__ = ('unique_id',
+                 'ui_class',
+                 'displayed_text',
+                 'hint_text',
+                 'alternative_text',
+                 'input_type',
+                 'checkable',
+                 'covers_unique_area',
+                 'visible_boundaries',
+                 'defined_boundaries',
+                 'internal_child_ids',
+                 'is_clickable',
+                 'can_be_visible',
+                 'is_enabled',
+                 'focus',
+                 'internal_id',
+                 'image_id',
+                 'text_input_field',
+                 'is_keyboard_element',
+                 'password_field',
+                 'is_long_clickable',
+                 'package_name',
+                 'internal_parent_id',
+                 'resource_id',
+                 'is_scrollable',
+                 'selected',
+                 'visible_areas',
+                 'xpath',
+                 'has_clickable_descendant',
+                 'state')
+
     def __init__(self,
                  unique_id,
                  ui_class,
@@ -165,6 +208,39 @@ class Widget(object):
         FIELDNAME_HAS_CLICKABLE_DESCENDANT,
     ]
 
+    BOOLEAN_FIELDNAMES = {
+        FIELDNAME_CHECKABLE,
+        FIELDNAME_IS_CLICKABLE,
+        FIELDNAME_CAN_BE_VISIBLE,
+        FIELDNAME_IS_ENABLED,
+        FIELDNAME_FOCUS,
+        FIELDNAME_TEXT_INPUT_FIELD,
+        FIELDNAME_IS_KEYBOARD_ELEMENT,
+        FIELDNAME_PASSWORD_FIELD,
+        FIELDNAME_IS_LONG_CLICKABLE,
+        FIELDNAME_IS_SCROLLABLE,
+        FIELDNAME_SELECTED,
+        FIELDNAME_HAS_CLICKABLE_DESCENDANT,
+    }
+    # PType.DeactivatableFlag
+    DEACTIVATABLE_FIELDNAMES = {
+        FIELDNAME_CHECKABLE,
+        FIELDNAME_FOCUS,
+        FIELDNAME_SELECTED,
+    }
+    RECTANGLE_FIELDNAMES = {
+        FIELDNAME_VISIBLE_BOUNDARIES,
+        FIELDNAME_DEFINED_BOUNDARIES,
+    }
+    # Values repeating across the widgets
+    INTERNED_FIELDNAMES = {
+        FIELDNAME_UI_CLASS,
+        FIELDNAME_INPUT_TYPE,
+        FIELDNAME_COVERS_UNIQUE_AREA,
+        FIELDNAME_PACKAGE_NAME,
+        FIELDNAME_RESOURCE_ID,
+    }
+
     def __eq__(self, o: object) -> bool:
         if isinstance(o, Widget):
             return self.unique_id == o.unique_id
@@ -187,14 +263,15 @@ class Widget(object):
                 for row in csvreader:
                     uid = row[Widget.FIELDNAME_UNIQUE_ID]
 
+                    # Values repeating across the widgets are interned
                     widget = Widget(uid,
-                                    row[Widget.FIELDNAME_UI_CLASS],
+                                    sys.intern(row[Widget.FIELDNAME_UI_CLASS]),
                                     row[Widget.FIELDNAME_DISPLAYED_TEXT],
                                     row[Widget.FIELDNAME_HINT_TEXT],
                                     row[Widget.FIELDNAME_ALTERNATIVE_TEXT],
-                                    row[Widget.FIELDNAME_INPUT_TYPE],
+                                    sys.intern(row[Widget.FIELDNAME_INPUT_TYPE]),
                                     convert_bool_python(row[Widget.FIELDNAME_CHECKABLE], True),
-                                    row[Widget.FIELDNAME_COVERS_UNIQUE_AREA],
+                                    sys.intern(row[Widget.FIELDNAME_COVERS_UNIQUE_AREA]),
                                     Rectangle.construct_from_str(row[Widget.FIELDNAME_VISIBLE_BOUNDARIES]),
                                     Rectangle.construct_from_str(row[Widget.FIELDNAME_DEFINED_BOUNDARIES]),
                                     row[Widget.FIELDNAME_INTERNAL_CHILD_IDS],
@@ -208,9 +285,9 @@ class Widget(object):
                                     convert_bool_python(row[Widget.FIELDNAME_IS_KEYBOARD_ELEMENT]),
                                     convert_bool_python(row[Widget.FIELDNAME_PASSWORD_FIELD]),
                                     convert_bool_python(row[Widget.FIELDNAME_IS_LONG_CLICKABLE]),
-                                    row[Widget.FIELDNAME_PACKAGE_NAME],
+                                    sys.intern(row[Widget.FIELDNAME_PACKAGE_NAME]),
                                     row[Widget.FIELDNAME_INTERNAL_PARENTID],
-                                    row[Widget.FIELDNAME_RESOURCE_ID],
+                                    sys.intern(row[Widget.FIELDNAME_RESOURCE_ID]),
                                     convert_bool_python(row[Widget.FIELDNAME_IS_SCROLLABLE]),
                                     convert_bool_python(row[Widget.FIELDNAME_SELECTED], True),
                                     # TODO RectangleList
@@ -227,6 +304,82 @@ class Widget(object):
 
         return widgets
 
+    @staticmethod
+    def construct_from_state_files(state_files, states, uid_widget_map) -> List[set]:
+        """
+        Constructs the widgets of all state files at once. The files are concatenated and parsed by a single
+        pandas CSV reader call and the columns are converted column-wise. Falls back to construct_from_state_file
+        if the files do not share the same header or cannot be parsed in bulk.
+
+        :return: The set of widgets of every state.
+        """
+        header = None
+        lines = []
+        rows_per_file = []
+        for state_file in state_files:
+            with open(state_file, newline='') as f:
+                file_lines = [line for line in f.read().split('\n') if line and line != '\r']
+            if file_lines:
+                file_header = file_lines[0].rstrip('\r')
+                if header is None:
+                    header = file_header
+                elif file_header != header:
+                    print(f"Different header in {state_file}, construct the widgets file by file")
+                    return [Widget.construct_from_state_file(state_file, state, uid_widget_map)
+                            for state_file, state in zip(state_files, states)]
+            lines.extend(file_lines[1:])
+            rows_per_file.append(max(len(file_lines) - 1, 0))
+
+        columns = {}
+        if lines:
+            try:
+                df = pd.read_csv(io.StringIO('\n'.join(lines)),
+                                 sep=';',
+                                 quoting=csv.QUOTE_NONE,
+                                 header=None,
+                                 names=header.split(';'),
+                                 index_col=False,
+                                 dtype=str,
+                                 na_filter=False,
+                                 skip_blank_lines=False)
+                assert len(df) == len(lines), f"Parsed {len(df)} rows of {len(lines)} lines"
+                columns = {name: Widget.convert_column(name, df[name]) for name in Widget.FIELDNAMES}
+            except (pd.errors.ParserError, KeyError, AssertionError) as e:
+                print(f"Could not read the state files in bulk, construct the widgets file by file: {e}")
+                return [Widget.construct_from_state_file(state_file, state, uid_widget_map)
+                        for state_file, state in zip(state_files, states)]
+
+        widgets_list = []
+        rows = zip(*(columns[name] for name in Widget.FIELDNAMES)) if columns else iter(())
+        for state, number_of_rows in zip(states, rows_per_file):
+            widgets = set()
+            for _ in range(number_of_rows):
+                widget = Widget(*next(rows))
+                widget.state = state
+                uid_widget_map[widget.unique_id] = widget
+                assert widget not in widgets, f"Widget: {widget} Found widget: {widgets}"
+                widgets.add(widget)
+            widgets_list.append(widgets)
+        return widgets_list
+
+    @staticmethod
+    def convert_column(name, values: pd.Series) -> list:
+        """
+        Converts a column of a state file like construct_from_state_file does for a single row.
+        """
+        if name in Widget.BOOLEAN_FIELDNAMES:
+            is_true = (values == "true").values
+            if name not in Widget.DEACTIVATABLE_FIELDNAMES:
+                invalid = ~(is_true | (values == "false").values)
+                if invalid.any():
+                    raise ValueError(f"Conversion failed: _str={values[invalid].iloc[0]} deactivatable=False")
+            return is_true.tolist()
+        if name in Widget.RECTANGLE_FIELDNAMES:
+            return values.map({value: Rectangle.construct_from_str(value) for value in values.unique()}).tolist()
+        if name in Widget.INTERNED_FIELDNAMES:
+            return values.map({value: sys.intern(value) for value in values.unique()}).tolist()
+        return values.tolist()
+
     def is_visible(self):
         """
         Copied from org.droidmate.explorationModel.interaction.Widget
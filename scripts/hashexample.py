@@ -3,6 +3,9 @@
 
 from PIL import Image, ImageDraw
 import numpy
+
+from datatypes import packedhash
+from datatypes.packedhash import PackedHash
 # import scipy.fftpack
 # import pywt
 import os.path
@@ -16,21 +19,29 @@ def _binary_array_to_hex(arr):
     """
 	internal function to make a hex string out of a binary array.
 	"""
-    bit_string = ''.join(str(b) for b in 1 * arr.flatten())
-    width = int(numpy.ceil(len(bit_string) / 4))
-    return '{:0>{width}x}'.format(int(bit_string, 2), width=width)
+    return str(PackedHash.from_bool_array(arr))
 
 
 class ImageHash(object):
     """
 	Hash encapsulation. Can be used for dictionary keys and comparisons.
+	The bits are packed into an integer, the distance is the popcount of the xor.
 	"""
 
     def __init__(self, binary_array):
-        self.hash = binary_array
+        binary_array = numpy.asarray(binary_array, dtype=bool)
+        self.shape = binary_array.shape
+        self.packed = PackedHash.from_bool_array(binary_array)
+
+    @property
+    def hash(self):
+        return self.packed.to_bool_array().reshape(self.shape)
+
+    def __int__(self):
+        return self.packed.value
 
     def __str__(self):
-        return _binary_array_to_hex(self.hash.flatten())
+        return str(self.packed)
 
     def __repr__(self):
         return repr(self.hash)
@@ -38,23 +49,29 @@ class ImageHash(object):
     def __sub__(self, other):
         if other is None:
             raise TypeError('Other hash must not be None.')
-        if self.hash.size != other.hash.size:
-            raise TypeError('ImageHashes must be of the same shape.', self.hash.shape, other.hash.shape)
-        return numpy.count_nonzero(self.hash.flatten() != other.hash.flatten())
+        if self.packed.bits != other.packed.bits:
+            raise TypeError('ImageHashes must be of the same shape.', self.shape, other.shape)
+        return self.packed - other.packed
 
     def __eq__(self, other):
         if other is None:
             return False
-        return numpy.array_equal(self.hash.flatten(), other.hash.flatten())
+        return self.packed == other.packed
 
     def __ne__(self, other):
         if other is None:
             return False
-        return not numpy.array_equal(self.hash.flatten(), other.hash.flatten())
+        return self.packed != other.packed
 
     def __hash__(self):
-        # this returns a 8 bit integer, intentionally shortening the information
-        return sum([2 ** (i % 8) for i, v in enumerate(self.hash.flatten()) if v])
+        return hash(self.packed)
+
+
+def distance_matrix(hashes_1, hashes_2):
+    """
+	Hamming distances of N image hashes to M image hashes as N x M array.
+	"""
+    return packedhash.distance_matrix(hashes_1, hashes_2)
 
 
 def hex_to_hash(hexstr):
@@ -67,10 +84,8 @@ def hex_to_hash(hexstr):
 	2. This algorithm does not work for hash_size < 2.
 	"""
     hash_size = int(numpy.sqrt(len(hexstr) * 4))
-    binary_array = '{:0>{width}b}'.format(int(hexstr, 16), width=hash_size * hash_size)
-    bit_rows = [binary_array[i:i + hash_size] for i in range(0, len(binary_array), hash_size)]
-    hash_array = numpy.array([[bool(int(d)) for d in row] for row in bit_rows])
-    return ImageHash(hash_array)
+    hash_array = PackedHash.from_hex(hexstr, hash_size * hash_size).to_bool_array()
+    return ImageHash(hash_array.reshape((hash_size, hash_size)))
 
 
 def old_hex_to_hash(hexstr, hash_size=8):
@@ -1,19 +1,34 @@
 # -*- coding: utf-8 -*-
 import collections
-import itertools
-from typing import List
+import heapq
+import multiprocessing as mp
+from typing import List, Tuple
 
 from tqdm import tqdm
 
 import usecasemapping
 from graph.multinodepathsolver import MultiNodePathSolver
 from criterion.basecriterion import BaseCriterion
+from model.atd import ATD
+from model.transition import Transition
 from usecaseclassification.processor.usecaseprocessor import UseCaseProcessor
 from usecaseclassification.usecaseexecution import UseCaseExecution
 from usecaseclassification.usecasereader import UseCaseReader
+from util import configutil
+from util.imagederivativeutil import wait_for_image_derivatives
 
 
-MAX_COMBINATIONS = 500
+# Processor of the forked use case workers, see UseCaseProcessorInteractionSelection.compute_use_case_executions
+_worker_processor = None
+_worker_use_cases = None
+
+
+def find_use_case_combinations_in_worker(use_case_idx) -> List[List[Tuple[int, int]]]:
+    """
+    Searches the combinations of a use case in a forked worker process. The worker shares the exploration
+    model of the parent copy-on-write, the combinations are returned as indices, see find_use_case_combinations.
+    """
+    return _worker_processor.find_use_case_combinations(_worker_use_cases[use_case_idx])
 
 
 def soft_string_equal(s1: str, s2: str):
@@ -26,6 +41,39 @@ class ATDBasedTransitionSelectCriterion(BaseCriterion):
 
     def __init__(self, exploration_model):
         self.exploration_model = exploration_model
+        # (action type, normalized target descriptor) -> transitions of the use case base graph, built lazily
+        self.atd_transitions_index = None
+
+    def get_transitions(self, atd: ATD) -> List[Transition]:
+        """
+        :return: The transitions of the use case base graph satisfying decide(trans, atd) in graph order.
+        """
+        return self.get_atd_transitions_index().get((atd.action_type, atd.target_descriptor), [])
+
+    def get_atd_transitions_index(self):
+        if self.atd_transitions_index is None:
+            self.atd_transitions_index = self.construct_atd_transitions_index(
+                self.exploration_model.use_case_base_graph.transitions)
+        return self.atd_transitions_index
+
+    @staticmethod
+    def construct_atd_transitions_index(transitions):
+        """
+        Index of the transitions by the ATDs of the source state's records matching the interaction.
+        ATDs are equal if their action type and normalized target descriptor are equal.
+        """
+        index = collections.defaultdict(list)
+        for trans in transitions:
+            keys = set()
+            for atd_r in trans.source_state_o.atd_records:
+                if atd_r.widget_o == trans.interacted_widget_o \
+                        and atd_r.similarity >= ATDBasedTransitionSelectCriterion.SIMILARITY_THRESHOLD \
+                        and atd_r.atd.action_type.value == trans.action:
+                    key = (atd_r.atd.action_type, atd_r.atd.target_descriptor)
+                    if key not in keys:
+                        keys.add(key)
+                        index[key].append(trans)
+        return dict(index)
 
     def decide(self, trans, atd):
         # filtered_features = [atd_record.atd.target_descriptor
@@ -58,50 +106,182 @@ class UseCaseProcessorInteractionSelection(UseCaseProcessor):
         e.g. TwitterLite trace404599ab-fc26-4388-9f47-6a0563000003.csv
         there is only a close interaction.
         """
+        use_cases = list(self.get_use_cases())
+        use_case_combinations = self.find_all_use_case_combinations(use_cases)
+
+        # The paths are constructed in the main process in the order of the use cases
         possible_use_case_executions = []
-        home_state = self.exploration_model.home_state.unique_id
+        for use_case, combinations in zip(use_cases, use_case_combinations):
+            use_case_exec = self.construct_use_case_execution(use_case, combinations)
+            if use_case_exec is not None:
+                possible_use_case_executions.append(use_case_exec)
 
-        use_cases = []
+        return possible_use_case_executions
+
+    def get_use_cases(self):
         if self.filter_use_cases:
             assert self.exploration_model.package_name in usecasemapping.APP_USE_CASE_MAP,\
                 f"{self.exploration_model.package_name} was not in APP_USE_CASE_MAP"
             allowed_use_cases = usecasemapping.APP_USE_CASE_MAP[self.exploration_model.package_name]
-            use_cases = filter(
+            return filter(
                 lambda uc: any(soft_string_equal(uc.name, uc_name_allowed) for uc_name_allowed in allowed_use_cases),
                 self.use_cases)
         else:
-            use_cases = self.use_cases
-
-        for use_case in tqdm(use_cases, desc="Use cases"):
-
-            # Identify states that include the desired feature for the use case
-            atd_transitions_list_map = collections.defaultdict(list)
-
-            for atd in use_case.atds_flatted:
-                # Transitions that include the desired atd
-                transitions_w_atd = [(trans, atd)
-                                     for trans in self.exploration_model.use_case_base_graph.transitions
-                                     if self.atd_based_transition_select_criterion.decide(trans, atd)]
-                if transitions_w_atd:
-                    atd_transitions_list_map[atd] = transitions_w_atd
-
-            # For every combination of transitions regarding the atd
-            paths = []
-            if atd_transitions_list_map.values():
-                # print(f"len(atd_transitions_list_map.values()) {len(atd_transitions_list_map.values())}")
-                transition_combinations = UseCaseProcessor.get_combinations(atd_transitions_list_map)
-                # print(f"Number of combinations: {len(list(transition_combinations))} Combinations to try: {len(transition_combinations[:MAX_COMBINATIONS])}")
-                for transitions_w_atds_ls in itertools.islice(transition_combinations, 0, MAX_COMBINATIONS):
-                    path = self.path_finder.find_path(transitions_w_atds_ls, home_state)
-                    if path is not None:
-                        path = self.append_terminate(path=path,
-                                                     uid_state_map=self.exploration_model.uid_state_map,
-                                                     resulting_end_state=home_state)
-                        # Create trace from path
-                        path.construct_trace(exploration_model=self.exploration_model)
-                        paths.append(path)
-            if paths:
-                use_case_exec = UseCaseExecution(use_case=use_case, computed=True, computed_paths=paths)
-                possible_use_case_executions.append(use_case_exec)
+            return self.use_cases
 
-        return possible_use_case_executions
+    def find_all_use_case_combinations(self, use_cases) -> List[List[List[Tuple[int, int]]]]:
+        """
+        The use cases are independent of each other and only read the use case base graph. They are distributed
+        across forked worker processes, if possible. Daemonic processes, e.g. the ingestion workers of Matrics,
+        are not allowed to have children and search serially.
+        """
+        workers = min(configutil.MATRICS_USE_CASE_WORKERS, len(use_cases))
+        if workers <= 1 or mp.current_process().daemon or 'fork' not in mp.get_all_start_methods():
+            return [self.find_use_case_combinations(use_case) for use_case in tqdm(use_cases, desc="Use cases")]
+
+        global _worker_processor, _worker_use_cases
+        # Build the shared index once, so the workers inherit it
+        self.atd_based_transition_select_criterion.get_atd_transitions_index()
+        _worker_processor = self
+        _worker_use_cases = use_cases
+        # The ATD overlays of the exploration model are still written in the background
+        wait_for_image_derivatives()
+        try:
+            with mp.get_context('fork').Pool(workers) as pool:
+                return list(tqdm(pool.imap(find_use_case_combinations_in_worker, range(len(use_cases))),
+                                 total=len(use_cases),
+                                 desc="Use cases"))
+        finally:
+            _worker_processor = None
+            _worker_use_cases = None
+
+    def get_atd_transitions_list_map(self, use_case):
+        """
+        Identify states that include the desired feature for the use case.
+        """
+        atd_transitions_list_map = collections.defaultdict(list)
+        for atd in use_case.atds_flatted:
+            # Transitions that include the desired atd
+            transitions_w_atd = [(trans, atd)
+                                 for trans in self.atd_based_transition_select_criterion.get_transitions(atd)]
+            if transitions_w_atd:
+                atd_transitions_list_map[atd] = transitions_w_atd
+        return atd_transitions_list_map
+
+    def find_use_case_combinations(self, use_case) -> List[List[Tuple[int, int]]]:
+        """
+        :return: The best combinations of the use case, see find_best_combinations. Every entry of a combination
+        is given by the index of its atd in get_atd_transitions_list_map and the index of the transition of the atd.
+        """
+        atd_transitions_list_map = self.get_atd_transitions_list_map(use_case)
+        if not atd_transitions_list_map:
+            return []
+        entry_indices = {}
+        for a, entries in enumerate(atd_transitions_list_map.values()):
+            for t, entry in enumerate(entries):
+                entry_indices[id(entry)] = (a, t)
+        home_state = self.exploration_model.home_state.unique_id
+        return [[entry_indices[id(entry)] for entry in combination]
+                for combination in self.find_best_combinations(atd_transitions_list_map, home_state)]
+
+    def construct_use_case_execution(self, use_case, combinations: List[List[Tuple[int, int]]]):
+        """
+        Only the best combinations of transitions regarding the atd are turned into paths.
+        """
+        home_state = self.exploration_model.home_state.unique_id
+        entries_list = list(self.get_atd_transitions_list_map(use_case).values())
+        paths = []
+        for combination in combinations:
+            transitions_w_atds_ls = [entries_list[a][t] for a, t in combination]
+            path = self.path_finder.find_path(transitions_w_atds_ls, home_state)
+            if path is not None:
+                path = self.append_terminate(path=path,
+                                             uid_state_map=self.exploration_model.uid_state_map,
+                                             resulting_end_state=home_state)
+                # Create trace from path
+                path.construct_trace(exploration_model=self.exploration_model)
+                paths.append(path)
+        if paths:
+            return UseCaseExecution(use_case=use_case, computed=True, computed_paths=paths)
+        return None
+
+    def find_best_combinations(self, atd_transitions_list_map, start_node) -> List[List[Tuple[Transition, ATD]]]:
+        """
+        Best first search over the combinations of transitions (one per atd), keeping the
+        configutil.MATRICS_NUMBER_OF_PATH_SELECTION combinations with the best paths. Combinations are ranked
+        like their paths, see MultiNodePathSolver.find_ordering, and equally good ones by product order.
+
+        Every candidate transition gets a static lower bound of its incoming gap, i.e. the shortest accepted
+        distance from a candidate of another atd plus one. The path of a combination is at least 2 plus the
+        sum of the bounds of all but the first transition. The prefixes of the combinations are expanded in
+        the order of this lower bound, so promising combinations are evaluated first and the search stops
+        as soon as no prefix can beat the currently worst kept combination. At most
+        configutil.MATRICS_USE_CASE_MAX_EVALUATED_COMBINATIONS orderings are computed.
+        """
+        entries_list = [entries
+                        for entries in atd_transitions_list_map.values()
+                        if entries]
+        n = len(entries_list)
+        max_kept = configutil.MATRICS_NUMBER_OF_PATH_SELECTION
+
+        candidates_list = []
+        for a, entries in enumerate(entries_list):
+            candidates = []
+            for entry in entries:
+                trans = entry[0]
+                incoming = [self.path_finder.get_accepted_distance(other[0].resulting_state, trans.source_state)
+                            for b, others in enumerate(entries_list) if b != a
+                            for other in others]
+                incoming = [dist for dist in incoming if dist is not None]
+                can_be_first = self.path_finder.get_accepted_distance(start_node, trans.source_state,
+                                                                      from_home_state=True) is not None
+                # A transition without incoming gap can only be the first one, its bound is 0 then
+                if incoming or can_be_first:
+                    candidates.append((entry, min(incoming) + 1 if incoming else 0))
+            if not candidates:
+                return []
+            candidates_list.append(candidates)
+
+        # Bounds of the atds that are not assigned yet
+        suffix_min = [0] * (n + 1)
+        suffix_max = [0] * (n + 1)
+        for a in range(n - 1, -1, -1):
+            suffix_min[a] = suffix_min[a + 1] + min(bound for _, bound in candidates_list[a])
+            suffix_max[a] = max(suffix_max[a + 1], max(bound for _, bound in candidates_list[a]))
+
+        # Max heap of the kept combinations by (length, start distance, product order)
+        kept = []
+        evaluated = 0
+        max_evaluated = configutil.MATRICS_USE_CASE_MAX_EVALUATED_COMBINATIONS
+        # Min heap of the prefixes by (lower bound, depth, product order), given by the candidate indices. Deeper
+        # prefixes win ties, so equally bounded combinations are completed depth first.
+        frontier = [(2 + suffix_min[0] - suffix_max[0], 0, (), 0, 0)]
+        while frontier and evaluated < max_evaluated:
+            lower_bound, _, indices, bound_sum, bound_max = heapq.heappop(frontier)
+            # The remaining prefixes are bounded by at least this bound
+            if len(kept) == max_kept and lower_bound > -kept[0][0][0]:
+                break
+            a = len(indices)
+            if a == n:
+                evaluated += 1
+                combination = [candidates_list[b][i][0] for b, i in enumerate(indices)]
+                transitions = [entry[0] for entry in combination]
+                ordering = self.path_finder.find_ordering(transitions, start_node)
+                if ordering is not None:
+                    length, start_dist = self.path_finder.get_ordering_rank(transitions, ordering, start_node)
+                    key = (-length, -start_dist, tuple(-i for i in indices))
+                    if len(kept) < max_kept:
+                        heapq.heappush(kept, (key, combination))
+                    elif key > kept[0][0]:
+                        heapq.heapreplace(kept, (key, combination))
+                continue
+            for i, (_, bound) in enumerate(candidates_list[a]):
+                child_max = max(bound_max, bound)
+                child_bound = 2 + bound_sum + bound + suffix_min[a + 1] - max(child_max, suffix_max[a + 1])
+                if len(kept) == max_kept and child_bound > -kept[0][0][0]:
+                    continue
+                heapq.heappush(frontier, (child_bound, -(a + 1), indices + (i,), bound_sum + bound, child_max))
+
+        if frontier and evaluated >= max_evaluated:
+            print(f"Stopped the combination search after {evaluated} combinations")
+        return [c for _, c in sorted(kept, reverse=True)]
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from graph.path import Path
 from model.baseexplorationmodel import BaseExplorationModel
@@ -24,11 +24,13 @@ class UseCaseExecution(object):
         self.computed_paths = computed_paths
 
         # Trace id that is used for the playback, set when the playback dir is processed
-        self.playback_trace_id: Optional[str] = None
+        self._playback_trace_id: Optional[str] = None
         self.playback_state: Optional[str] = None
         self.playback_index: Optional[int] = None
         self.start_index: Optional[int] = None
         self.playback_exploration_models: List[BaseExplorationModel] = []
+        # Index of the playback traces of the playback models, see add_playback_exploration_model
+        self.playback_traces_w_exploration_models: List[Tuple[BaseExplorationModel, Trace]] = []
         self.view: Optional[View] = None
 
     def __eq__(self, o: object) -> bool:
@@ -48,6 +50,26 @@ class UseCaseExecution(object):
         """
         return id(self)
 
+    @property
+    def playback_trace_id(self) -> Optional[str]:
+        return self._playback_trace_id
+
+    @playback_trace_id.setter
+    def playback_trace_id(self, playback_trace_id: Optional[str]) -> None:
+        self._playback_trace_id = playback_trace_id
+        self.playback_traces_w_exploration_models = []
+        for exploration_model in self.playback_exploration_models:
+            self.index_playback_trace(exploration_model)
+
+    def add_playback_exploration_model(self, exploration_model: BaseExplorationModel) -> None:
+        self.playback_exploration_models.append(exploration_model)
+        self.index_playback_trace(exploration_model)
+
+    def index_playback_trace(self, exploration_model: BaseExplorationModel) -> None:
+        trace = exploration_model.uid_trace_map.get(self._playback_trace_id)
+        if trace is not None:
+            self.playback_traces_w_exploration_models.append((exploration_model, trace))
+
     def init_view(self) -> None:
         self.view = View(self)
 
@@ -55,7 +77,7 @@ class UseCaseExecution(object):
         return self.computed
 
     def is_verified(self) -> bool:
-        return len(self.get_playback_traces()) > 0
+        return len(self.playback_traces_w_exploration_models) > 0
 
     def get_best_computed_path(self) -> Path:
         return self.computed_paths[0]
@@ -72,10 +94,13 @@ class UseCaseExecution(object):
         return self.computed_paths[:configutil.MATRICS_NUMBER_OF_PATH_SELECTION]
 
     def get_playback_traces(self) -> List[Trace]:
-        return [trace
-                for exploration_model in self.playback_exploration_models
-                for trace in exploration_model.traces
-                if trace.unique_id == self.playback_trace_id]
+        return [trace for _, trace in self.get_playback_traces_w_exploration_models()]
+
+    def get_playback_traces_w_exploration_models(self) -> List[Tuple[BaseExplorationModel, Trace]]:
+        """
+        Playback models have to be added with add_playback_exploration_model to be indexed.
+        """
+        return list(self.playback_traces_w_exploration_models)
 
     def get_representative_trace_view(self) -> View:
         assert self.view is not None
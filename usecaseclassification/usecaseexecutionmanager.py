@@ -168,20 +168,21 @@ class UseCaseExecutionManager(object):
 
     def read_playback_models(self, parent_exploration_dir, package_name):
         corresponding_use_case_executions = [uce for uce in self.use_case_executions if uce.playback_trace_id is not None]
-        for i in range(1, configutil.MATRICS_PLAYBACK_ITERATION_NUMBER + 1):
-            model_dir = os.path.join(parent_exploration_dir,
-                                     f"playback{i}",
-                                     configutil.TOGAPE_MODEL_DIR_NAME,
-                                     package_name)
-            feauture_dir = os.path.join(model_dir, configutil.TOGAPE_FEATURE_DIR_NAME)
-            use_case_execution_exploration_model = UseCaseExecutionExplorationModel(app=None,
-                                                                                    package_name=package_name,
-                                                                                    exploration_model_dir=model_dir,
-                                                                                    feature_dir=feauture_dir,
-                                                                                    evaluation_dir=None)
-
+        if not corresponding_use_case_executions:
+            return
+        model_dirs = [os.path.join(parent_exploration_dir,
+                                   f"playback{i}",
+                                   configutil.TOGAPE_MODEL_DIR_NAME,
+                                   package_name)
+                      for i in range(1, configutil.MATRICS_PLAYBACK_ITERATION_NUMBER + 1)]
+        # Only the traces of the use case executions are needed
+        trace_ids = set(uce.playback_trace_id for uce in corresponding_use_case_executions)
+        use_case_execution_exploration_models = UseCaseExecutionExplorationModel.load_exploration_models(package_name,
+                                                                                                         model_dirs,
+                                                                                                         trace_ids)
+        for use_case_execution_exploration_model in use_case_execution_exploration_models:
             for uce in corresponding_use_case_executions:
-                uce.playback_exploration_models.append(use_case_execution_exploration_model)
+                uce.add_playback_exploration_model(use_case_execution_exploration_model)
 
     def check_post_conditions(self):
         for uce in self.get_verified_use_case_executions():
@@ -9,7 +9,16 @@ IMG_PATH_DEFAULT = "/img/Default.png"
 # We need this prefix for image files to route and serve these files, see app.py.
 IMG_PATH_PREFIX = "/imgdir"
 ATD_IMG_SUBDIR = "ATD"
+# Downscaled images written by former versions, thumbnails are generated on request now, see ThumbnailCache
 RESIZE_IMG_SUBDIR = "RESIZE"
+# Widths of the thumbnails served for the size parameter of an image request, larger sizes get the original
+IMG_THUMBNAIL_WIDTHS = (180, 360, 720)
+IMG_THUMBNAIL_NODE_WIDTH = 360
+IMG_THUMBNAIL_DETAIL_WIDTH = 720
+# Images are only revalidated by their ETag after this time
+IMG_CACHE_MAX_AGE = 24 * 60 * 60
+# Persistent hashes of the images of an image directory, see ImageHashStore
+IMAGE_HASH_STORE_FILE_NAME = "imagehashes.bin"
 
 
 APKTOOL_PATH = os.path.join("resources/apktool.jar")
@@ -45,12 +54,28 @@ MATRICS_CFG_APP_FILTER_LIST = "app.filter"
 MATRICS_CFG_COMPUTE_USE_CASE_EXECUTIONS = "usecase.compute_executions"
 MATRICS_CFG_COMPUTE_USE_CASE_EXECUTIONS_DEFAULT = True
 MATRICS_CFG_MODEL_ACCESSOR_SELECTION = "model_accessor.execution_selection"
+# Number of processes that construct the apps. 1 analyzes the apps serially in the main process.
+MATRICS_CFG_INGESTION_WORKERS = "ingestion.workers"
+MATRICS_CFG_INGESTION_WORKERS_DEFAULT = os.cpu_count() or 1
+# Reuse the apps of the previous analysis whose apk and ToGAPE output did not change
+MATRICS_CFG_REUSE_UNCHANGED_APPS = "ingestion.reuse_unchanged_apps"
+MATRICS_CFG_REUSE_UNCHANGED_APPS_DEFAULT = True
 
 MATRICS_PLAYBACK_MODEL_DIR_NAME = "matricsplayback"
 TOGAPE_FEATURE_DIR_NAME = "feature-logs"
 MATRICS_PLAYBACK_ITERATION_NUMBER = 5
+# Number of processes that load the models of the playback iterations. 1 loads serially.
+MATRICS_PLAYBACK_MODEL_WORKERS = min(os.cpu_count() or 1, MATRICS_PLAYBACK_ITERATION_NUMBER)
 PLAYBACK_RESULTS_CSV_PREFIX = "playbackresults-"
 MATRICS_NUMBER_OF_PATH_SELECTION = 10
+# Number of forked processes that search the transition combinations of the use cases. 1 searches serially.
+MATRICS_USE_CASE_WORKERS = os.cpu_count() or 1
+# Maximum number of transition combinations of a use case whose ordering is computed, see find_best_combinations
+MATRICS_USE_CASE_MAX_EVALUATED_COMBINATIONS = 1000
+# Number of processes that hash the images not found in the image hash stores. 1 hashes serially.
+MATRICS_IMAGE_HASH_WORKERS = os.cpu_count() or 1
+# Number of threads that write the downscaled screenshots and the screenshots with ATD overlays
+MATRICS_IMAGE_DERIVATIVE_WORKERS = os.cpu_count() or 1
 MATRICS_UCE_DISPLAY_DATAPOINT_THRESHOLD = 10
 
 # Matrics plots
@@ -73,6 +98,30 @@ MATRICS_TAG_APP_HOME_STATE = False
 MATRICS_CACHE_DIR_NAME = "matricscacheNew"
 MATRICS_CACHE_READ = False
 MATRICS_CACHE_DUMP = False
+# Content addressed cache of the metrics data, see DataCache
+MATRICS_DATA_CACHE_ENABLED = True
+MATRICS_DATA_CACHE_DIR_NAME = os.path.join(MATRICS_CACHE_DIR_NAME, "data")
+MATRICS_DATA_CACHE_MAX_SIZE = 2 * 1024 * 1024 * 1024
+# Increase when the computation of metrics data changes, this invalidates all cache entries
+MATRICS_DATA_CACHE_VERSION = 3
+# Sources of the metrics data relative to the repository, a change of their code invalidates the cache entries
+MATRICS_DATA_CACHE_SOURCE_PATHS = ["aggregationlevel.py", "modelaccessor.py", "datatypes", "graph", "metrics",
+                                   "model", "outlierdetection", "usecaseclassification", "util"]
+# Thumbnails of the screenshots, see ThumbnailCache
+MATRICS_THUMBNAIL_CACHE_DIR_NAME = os.path.join(MATRICS_CACHE_DIR_NAME, "thumbnails")
+MATRICS_THUMBNAIL_CACHE_MAX_SIZE = 512 * 1024 * 1024
+# Background analyses of the dashboard, see AnalysisJobManager
+MATRICS_ANALYSIS_JOB_DIR_NAME = os.path.join(MATRICS_CACHE_DIR_NAME, "jobs")
+# Number of analyses that run at the same time, further jobs are queued
+MATRICS_ANALYSIS_JOB_WORKERS = 1
+# Interval in milliseconds in which the dashboard polls the progress of a job
+MATRICS_ANALYSIS_JOB_POLL_INTERVAL = 1000
+# Number of configurations whose latest finished job is kept, the dirs of older jobs are removed
+MATRICS_ANALYSIS_JOB_MAX_FINISHED_JOBS = 20
+# Seconds until the dir of a failed or superseded job is removed, so its users can still read the error or result
+MATRICS_ANALYSIS_JOB_RETENTION = 60 * 60
+# Bound of the summed snapshot sizes of the analysis results held in memory, see AnalysisResultStore
+MATRICS_RESULT_STORE_MAX_SIZE = 1024 * 1024 * 1024
 
 # Matrics value dump
 MATRICS_DUMP_VALUE_DIR_NAME = "matricsvalues"
@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
+import os
+import threading
+
 import cv2
 
+# File signatures
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
 # Colors
 COLOR_BLUE = (255, 0, 0)
 COLOR_RED = (0, 0, 255)
@@ -16,37 +23,94 @@ TEXT_PADDING_X = 15
 TEXT_PADDING_Y = 40
 
 
-def draw_ATDs_on_img(img_path, atd_records):
-    cv_img = cv2.imread(img_path, cv2.IMREAD_UNCHANGED)
+def get_atd_boxes(atd_records):
+    """
+    :return: Tuple of (id, x1, y1, x2, y2) of the widgets of the ATD records, see draw_boxes_on_img.
+    """
+    boxes = []
     for atd_record in atd_records:
         if atd_record.widget_o is not None:
             v_bounds = atd_record.widget_o.visible_boundaries
             x1 = v_bounds.leftX
             y1 = v_bounds.topY
-            x2 = x1 + v_bounds.width
-            y2 = y1 + v_bounds.height
-            # Draw the rectangle box for marking the widget
-            cv2.rectangle(cv_img, (x1, y1), (x2, y2), COLOR_BLUE, THICKNESS)
-            # Draw the id
-            cv2.putText(cv_img,
-                        str(atd_record.id),
-                        (x1 + TEXT_PADDING_X, y1 + TEXT_PADDING_Y),
-                        FONT,
-                        FONT_SCALE,
-                        COLOR_RED,
-                        LINE_TYPE)
+            boxes.append((atd_record.id, x1, y1, x1 + v_bounds.width, y1 + v_bounds.height))
+    return tuple(boxes)
+
+
+def draw_ATDs_on_img(img_path, atd_records):
+    return draw_boxes_on_img(img_path, get_atd_boxes(atd_records))
+
+
+def draw_boxes_on_img(img_path, boxes):
+    cv_img = read_img(img_path)
+    for box_id, x1, y1, x2, y2 in boxes:
+        # Draw the rectangle box for marking the widget
+        cv2.rectangle(cv_img, (x1, y1), (x2, y2), COLOR_BLUE, THICKNESS)
+        # Draw the id
+        cv2.putText(cv_img,
+                    str(box_id),
+                    (x1 + TEXT_PADDING_X, y1 + TEXT_PADDING_Y),
+                    FONT,
+                    FONT_SCALE,
+                    COLOR_RED,
+                    LINE_TYPE)
     return cv_img
 
 
-def resize_img(img_path, scale_factor):
-    oriimg = cv2.imread(img_path, cv2.IMREAD_UNCHANGED)
+def read_img(img_path):
+    cv_img = cv2.imread(img_path, cv2.IMREAD_UNCHANGED)
     # This can happen if there are faulty images
-    if oriimg is None:
+    if cv_img is None:
         raise IOError(f"Could not load image: {img_path}")
-    newX, newY = oriimg.shape[1] * scale_factor, oriimg.shape[0] * scale_factor
-    return cv2.resize(oriimg, (int(newX), int(newY)), interpolation=cv2.INTER_AREA)
+    return cv_img
+
+
+def resize_img(img_path, scale_factor):
+    return resize_cv_img(read_img(img_path), scale_factor)
+
+
+def resize_img_to_width(img_path, width):
+    """
+    Downscales the image to the width keeping the aspect ratio. Smaller images are not upscaled.
+    """
+    oriimg = read_img(img_path)
+    if width >= oriimg.shape[1]:
+        return oriimg
+    return resize_cv_img(oriimg, width / oriimg.shape[1])
+
+
+def resize_cv_img(cv_img, scale_factor):
+    newX, newY = cv_img.shape[1] * scale_factor, cv_img.shape[0] * scale_factor
+    return cv2.resize(cv_img, (int(newX), int(newY)), interpolation=cv2.INTER_AREA)
 
 
 def dump_cv_img(img, new_img_path):
-    write = cv2.imwrite(new_img_path, img)
-    assert write, f"Dumping cv image was not successful: {new_img_path}"
+    """
+    Writes the image atomically, so a concurrently served image is never partially written.
+    """
+    encoded, buffer = cv2.imencode(os.path.splitext(new_img_path)[1], img)
+    assert encoded, f"Dumping cv image was not successful: {new_img_path}"
+    write_file_atomically(new_img_path, buffer.tobytes())
+
+
+def write_file_atomically(path, data: bytes):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def is_img_file(img_path) -> bool:
+    """
+    Cheap check of the file signature of JPEG and PNG images without decoding them.
+    """
+    try:
+        with open(img_path, 'rb') as f:
+            header = f.read(len(PNG_SIGNATURE))
+    except OSError:
+        return False
+    return header.startswith(JPEG_SIGNATURE) or header.startswith(PNG_SIGNATURE)
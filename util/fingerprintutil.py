@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import inspect
+import os
+from enum import Enum
+
+
+def get_file_entry(path):
+    """
+    :return: Cheap fingerprint entry of a file: path, size and modification time.
+    """
+    st = os.stat(path)
+    return path, st.st_size, st.st_mtime_ns
+
+
+def get_dir_entries(path, name_filter=None, exclude_dir_names=(), exclude_file_names=()):
+    """
+    Fingerprint entries of all files below path. Non-existing directories yield no entries.
+
+    :param name_filter: Only top level files and directories whose name satisfies the filter are considered.
+    :param exclude_dir_names: Names of directories that are skipped, e.g. derived data written by Matrics.
+    :param exclude_file_names: Names of files that are skipped.
+    """
+    entries = []
+    if not os.path.isdir(path):
+        return entries
+    for f_name in sorted(os.listdir(path)):
+        if name_filter is not None and not name_filter(f_name):
+            continue
+        f = os.path.join(path, f_name)
+        if os.path.isdir(f):
+            if f_name in exclude_dir_names:
+                continue
+            for dir_path, dir_names, file_names in os.walk(f):
+                dir_names[:] = sorted(d for d in dir_names if d not in exclude_dir_names)
+                for file_name in sorted(file_names):
+                    if file_name not in exclude_file_names:
+                        entries.append(get_file_entry(os.path.join(dir_path, file_name)))
+        elif os.path.isfile(f) and f_name not in exclude_file_names:
+            entries.append(get_file_entry(f))
+    return entries
+
+
+def get_source_entries(path):
+    """
+    Fingerprint entries of the python sources below path or of path itself. In contrast to get_file_entry the
+    content is hashed, so a checkout of unchanged sources keeps the fingerprint.
+    """
+    if os.path.isfile(path):
+        files = [path]
+    else:
+        files = []
+        for dir_path, dir_names, file_names in os.walk(path):
+            dir_names[:] = sorted(d for d in dir_names if d != "__pycache__")
+            files.extend(os.path.join(dir_path, file_name) for file_name in sorted(file_names)
+                         if file_name.endswith(".py"))
+    entries = []
+    for f in files:
+        with open(f, 'rb') as fp:
+            entries.append((os.path.relpath(f, os.path.dirname(path)), hashlib.sha1(fp.read()).hexdigest()))
+    return entries
+
+
+def get_fingerprint(entries, *params) -> str:
+    """
+    :return: Hex digest over the fingerprint entries and additional parameters, e.g. a format version.
+    """
+    h = hashlib.sha1()
+    for param in params:
+        h.update(repr(param).encode("utf-8"))
+        h.update(b"\0")
+    for entry in entries:
+        h.update(repr(entry).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def get_value_fingerprint(value):
+    """
+    Fingerprint of a value used as cache key component. Objects can provide their fingerprint by implementing
+    get_cache_fingerprint().
+
+    :return: The fingerprint or None if the value cannot be fingerprinted.
+    """
+    if value is None or isinstance(value, (bool, int, float, str, bytes, Enum)):
+        return repr(value)
+    if isinstance(value, type) or inspect.isbuiltin(value):
+        return f"{value.__module__}.{value.__qualname__}"
+    if inspect.isfunction(value):
+        # The code is part of the fingerprint, lambdas share their qualified name
+        code = value.__code__
+        closure = [get_value_fingerprint(cell.cell_contents) for cell in value.__closure__ or ()]
+        if None in closure:
+            return None
+        return f"{value.__module__}.{value.__qualname__}:{get_fingerprint(_get_code_entries(code), *closure)}"
+    if isinstance(value, (list, tuple)):
+        fingerprints = [get_value_fingerprint(v) for v in value]
+        return None if None in fingerprints else f"[{','.join(fingerprints)}]"
+    if isinstance(value, dict):
+        fingerprints = [(get_value_fingerprint(k), get_value_fingerprint(v)) for k, v in value.items()]
+        if any(k is None or v is None for k, v in fingerprints):
+            return None
+        return "{" + ",".join(f"{k}:{v}" for k, v in sorted(fingerprints)) + "}"
+    get_cache_fingerprint = getattr(value, 'get_cache_fingerprint', None)
+    if get_cache_fingerprint is not None:
+        return get_cache_fingerprint()
+    return None
+
+
+def _get_code_entries(code):
+    entries = [code.co_code, code.co_names]
+    for const in code.co_consts:
+        # Nested code objects are represented by their address otherwise
+        entries.extend(_get_code_entries(const) if inspect.iscode(const) else [repr(const)])
+    return entries
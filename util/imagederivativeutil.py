@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Tuple
+
+from util import configutil
+from util.drawutil import draw_boxes_on_img, dump_cv_img, resize_img_to_width, write_file_atomically
+
+JOB_THUMBNAIL = "thumbnail"
+JOB_OVERLAY = "overlay"
+
+
+def get_file_digest(path) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class ImageDerivativePipeline(object):
+    """
+    Generates derived images, i.e. thumbnails and screenshots with ATD overlays, in background threads. OpenCV
+    releases the GIL while decoding, resizing and encoding, so the model construction continues as soon as the
+    paths of the derivatives are known. The UI serves a placeholder until a derivative is written.
+
+    Jobs are deduplicated by their target path and by the content hash of their source image and their
+    parameters: equal screenshots of different traces are only rendered once and copied otherwise.
+    Derivatives are written atomically.
+    """
+
+    def __init__(self, workers=configutil.MATRICS_IMAGE_DERIVATIVE_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ImageDerivative")
+        self.lock = threading.Lock()
+        # Target path -> future of the job
+        self.target_futures: Dict[str, Future] = {}
+        # (job type, parameters, content hash of the source) -> future of the path of the first rendered derivative
+        self.rendered_futures: Dict[Tuple, Future] = {}
+
+    def submit_thumbnail(self, image_path, target_path, width) -> Future:
+        return self._submit(JOB_THUMBNAIL, image_path, target_path, width)
+
+    def submit_overlay(self, image_path, target_path, boxes) -> Future:
+        """
+        :param boxes: See drawutil.get_atd_boxes.
+        """
+        return self._submit(JOB_OVERLAY, image_path, target_path, boxes)
+
+    def _submit(self, job_type, image_path, target_path, params) -> Future:
+        with self.lock:
+            future = self.target_futures.get(target_path)
+            # A derivative can be deleted after it was written, e.g. evicted from the thumbnail cache
+            if future is None or (future.done() and not os.path.isfile(target_path)):
+                future = self.executor.submit(self._run, job_type, image_path, target_path, params)
+                self.target_futures[target_path] = future
+            return future
+
+    def _run(self, job_type, image_path, target_path, params) -> None:
+        try:
+            key = (job_type, params, get_file_digest(image_path))
+            with self.lock:
+                rendered = self.rendered_futures.get(key)
+                is_renderer = rendered is None or (rendered.done() and (rendered.exception() is not None
+                                                                        or not os.path.isfile(rendered.result())))
+                if is_renderer:
+                    rendered = Future()
+                    self.rendered_futures[key] = rendered
+            if is_renderer:
+                try:
+                    if job_type == JOB_THUMBNAIL:
+                        dump_cv_img(resize_img_to_width(image_path, params), target_path)
+                    else:
+                        dump_cv_img(draw_boxes_on_img(image_path, params), target_path)
+                except BaseException as e:
+                    rendered.set_exception(e)
+                    raise
+                rendered.set_result(target_path)
+            else:
+                # The first job of the key is already running, so waiting for it cannot block the pool
+                rendered_path = rendered.result()
+                if rendered_path != target_path:
+                    with open(rendered_path, 'rb') as f:
+                        write_file_atomically(target_path, f.read())
+        except (IOError, AssertionError) as e:
+            print(f"Could not create {job_type} image {target_path}: {e}")
+
+    def wait(self) -> None:
+        """
+        Blocks until all submitted derivatives are written.
+        """
+        with self.lock:
+            futures = list(self.target_futures.values())
+        wait(futures)
+
+
+_image_derivative_pipeline = None
+
+
+def get_image_derivative_pipeline() -> ImageDerivativePipeline:
+    """
+    The pipeline of the process. Pending jobs are completed before the process exits, the executor threads are
+    joined at interpreter shutdown.
+    """
+    global _image_derivative_pipeline
+    if _image_derivative_pipeline is None:
+        _image_derivative_pipeline = ImageDerivativePipeline()
+    return _image_derivative_pipeline
+
+
+def wait_for_image_derivatives() -> None:
+    """
+    Blocks until the pending derivatives of the process are written. Call it before forking worker processes:
+    a job thread may hold a lock, e.g. of stdout, while the process is forked, which deadlocks the child
+    as soon as it acquires the lock. Spawned worker processes do not need to wait.
+    """
+    if _image_derivative_pipeline is not None:
+        _image_derivative_pipeline.wait()
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+import json
+import re
+from typing import Iterator
+
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Part of a string without its closing quote
+_STRING_CHUNK = re.compile(r'(?:[^"\\]|\\.)*')
+# End of a number or literal
+_SCALAR_END = re.compile(r"[ \t\n\r,\]}]")
+
+
+class JsonStreamReader(object):
+    """
+    Incremental reader of a JSON document. Only the currently read value is kept in memory, e.g. a single entry
+    of a large array. The reader only walks the structure down to the values of interest in python, the values
+    themselves are decoded as a whole by the C decoder of the json module.
+
+    Example:
+        reader = JsonStreamReader(f)
+        for key in reader.iter_object():
+            if key == 'entries':
+                for _ in reader.iter_array():
+                    entry = reader.read_value()
+            else:
+                reader.skip_value()
+    """
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size=None) -> bool:
+        """
+        Reads more of the file into the buffer and drops the consumed part.
+
+        :return: False if the end of the file was reached.
+        """
+        if self.eof:
+            return False
+        chunk = self.f.read(max(size or 0, self.chunk_size))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        :return: The next non whitespace character or "" at the end of the document.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, c) -> None:
+        found = self.peek()
+        if found != c:
+            raise json.JSONDecodeError(f"Expected '{c}' but found '{found}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def read_value(self):
+        """
+        Reads and decodes the next value.
+        """
+        c = self.peek()
+        if c not in '{["':
+            # A number or literal at the end of the buffer may continue in the next chunk
+            while not _SCALAR_END.search(self.buffer, self.pos) and self._fill():
+                pass
+        while True:
+            try:
+                value, self.pos = self.decoder.raw_decode(self.buffer, self.pos)
+                return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow geometrically, so large values are decoded in amortized linear time
+            self._fill(len(self.buffer) - self.pos)
+
+    def skip_value(self) -> None:
+        """
+        Skips the next value. Strings, e.g. large response bodies, are never decoded. Objects and arrays are
+        decoded by the C decoder and dropped, which is faster than walking them in python.
+        """
+        c = self.peek()
+        if c == '"':
+            self.pos += 1
+            while True:
+                self.pos = _STRING_CHUNK.match(self.buffer, self.pos).end()
+                if self.pos < len(self.buffer) and self.buffer[self.pos] == '"':
+                    self.pos += 1
+                    return
+                # The end of the buffer or an escape sequence split between two chunks
+                if not self._fill():
+                    raise json.JSONDecodeError("Unterminated string", self.buffer, self.pos)
+        else:
+            self.read_value()
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        Iterates over the keys of the next object. The value of every key has to be consumed by the caller with
+        read_value, skip_value, iter_object or iter_array before the iteration continues.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise json.JSONDecodeError("Expected a key", self.buffer, self.pos)
+            key = self.read_value()
+            self.expect(':')
+            yield key
+            c = self.peek()
+            self.pos += 1
+            if c == '}':
+                return
+            if c != ',':
+                raise json.JSONDecodeError(f"Expected ',' or '}}' but found '{c}'", self.buffer, self.pos - 1)
+
+    def iter_array(self) -> Iterator[int]:
+        """
+        Iterates over the indices of the next array. Every element has to be consumed by the caller, see
+        iter_object.
+        """
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        idx = 0
+        while True:
+            yield idx
+            idx += 1
+            c = self.peek()
+            self.pos += 1
+            if c == ']':
+                return
+            if c != ',':
+                raise json.JSONDecodeError(f"Expected ',' or ']' but found '{c}'", self.buffer, self.pos - 1)
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+# orjson decodes considerably faster than the json module of the standard library, but it is optional
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data):
+    """
+    :param data: JSON document as bytes or str.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_json_file(path):
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def dump_json_file(path, value):
+    """
+    Writes the file atomically, so concurrent readers never see a partially written file.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(value, f)
+    os.replace(tmp_path, path)
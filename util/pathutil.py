@@ -6,9 +6,13 @@ from util import configutil
 from util.configutil import IMG_PATH_PREFIX, IMG_PATH_DEFAULT
 
 
-def get_state_img(state_img):
+def get_state_img(state_img, width=None):
+    """
+    :param width: Requests a thumbnail of the width, see ThumbnailCache.
+    """
     path = IMG_PATH_DEFAULT if state_img is None else state_img
-    return os.path.join(IMG_PATH_PREFIX + path)
+    url = os.path.join(IMG_PATH_PREFIX + path)
+    return url if width is None or state_img is None else f"{url}?size={width}"
 
 
 def filename_without_extension(path):
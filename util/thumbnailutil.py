@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import threading
+from typing import Optional
+
+from util import configutil
+from util.imagederivativeutil import get_image_derivative_pipeline
+from util.pathutil import create_dir_if_non_existing
+
+
+THUMBNAIL_FILE_EXTENSION = ".jpg"
+
+
+def get_thumbnail_width(requested_width) -> Optional[int]:
+    """
+    Requested widths are rounded up to the next configured width to bound the number of thumbnails per image.
+
+    :return: The thumbnail width or None if the original image should be served.
+    """
+    for width in configutil.IMG_THUMBNAIL_WIDTHS:
+        if requested_width <= width:
+            return width
+    return None
+
+
+def get_image_etag(image_path, width=None) -> str:
+    """
+    ETag of an image or its thumbnail, which changes with the size and modification time of the image.
+    """
+    st = os.stat(image_path)
+    etag = f"{st.st_size:x}-{st.st_mtime_ns:x}"
+    return etag if width is None else f"{etag}-{width}"
+
+
+class ThumbnailCache(object):
+    """
+    Thumbnails of the screenshots, generated on the first request. The thumbnails are stored under a key of the
+    image path, its size and modification time and the width, so changed images get new thumbnails.
+    The size of the cache directory is bounded, the least recently used thumbnails are evicted first like
+    in DataCache.
+    """
+
+    def __init__(self, cache_dir, max_size):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        # Estimated size of the cache directory, initialized on the first store
+        self.size = None
+
+    def get_file(self, image_path, width) -> str:
+        st = os.stat(image_path)
+        key = hashlib.sha1(f"{os.path.abspath(image_path)}\0{st.st_size}\0{st.st_mtime_ns}\0{width}".encode("utf-8"))
+        return os.path.join(self.cache_dir, f"{key.hexdigest()}{THUMBNAIL_FILE_EXTENSION}")
+
+    def get_thumbnail(self, image_path, width) -> Optional[str]:
+        """
+        Blocks until the thumbnail is generated. Concurrent requests of the same thumbnail share the job, see
+        ImageDerivativePipeline.
+
+        :return: The file of the thumbnail or None if it could not be generated.
+        """
+        file = self.get_file(image_path, width)
+        try:
+            # Mark the thumbnail as recently used
+            os.utime(file)
+            return file
+        except OSError:
+            pass
+        create_dir_if_non_existing(self.cache_dir)
+        get_image_derivative_pipeline().submit_thumbnail(image_path, file, width).result()
+        if not os.path.isfile(file):
+            return None
+        self.evict(os.path.getsize(file))
+        return file
+
+    def evict(self, added_size) -> None:
+        with self.lock:
+            if self.size is not None:
+                self.size += added_size
+                if self.size <= self.max_size:
+                    return
+            entries = []
+            for f_name in os.listdir(self.cache_dir):
+                if f_name.endswith(THUMBNAIL_FILE_EXTENSION):
+                    f = os.path.join(self.cache_dir, f_name)
+                    try:
+                        st = os.stat(f)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime_ns, st.st_size, f))
+            self.size = sum(entry[1] for entry in entries)
+            for _, f_size, f in sorted(entries):
+                if self.size <= self.max_size:
+                    break
+                try:
+                    os.remove(f)
+                except OSError:
+                    continue
+                self.size -= f_size
+
+
+_thumbnail_cache = None
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    global _thumbnail_cache
+    if _thumbnail_cache is None:
+        _thumbnail_cache = ThumbnailCache(configutil.MATRICS_THUMBNAIL_CACHE_DIR_NAME,
+                                          configutil.MATRICS_THUMBNAIL_CACHE_MAX_SIZE)
+    return _thumbnail_cache
@@ -2,7 +2,7 @@
 import dash_html_components as html
 
 import colorconstants
-from util.configutil import IMG_PATH_DEFAULT
+from util.configutil import IMG_PATH_DEFAULT, IMG_THUMBNAIL_NODE_WIDTH, IMG_THUMBNAIL_DETAIL_WIDTH
 from util.pathutil import get_state_img
 from visualization.basemodelviz import BaseModelViz
 from visualization.transitionsset import TransitionsSet
@@ -70,13 +70,13 @@ class BaseVisdccViz(BaseModelViz):
         id = state.unique_id if internal_state_id is None else internal_state_id
         # atd_records_str = [atd_rec.tooltip_info() for atd_rec in state.atd_records]
         atd_records_str = "\n".join([atd_rec.tooltip_info() for atd_rec in state.atd_records])
-        img_small_path = None if not state.image_small_paths else next(iter(state.image_small_paths))
+        img_path = None if not state.image_paths else next(iter(state.image_paths))
         s = {
             'id': f"{id}",
             'label': f"{state.shortened_state_id(length=shortened_state_len)}",
             'image': {
-                'selected': get_state_img(img_small_path),
-                'unselected': get_state_img(img_small_path),
+                'selected': get_state_img(img_path, width=IMG_THUMBNAIL_NODE_WIDTH),
+                'unselected': get_state_img(img_path, width=IMG_THUMBNAIL_NODE_WIDTH),
             },
             'title': f""
             f"<p class='{BaseVisdccViz.CSS_TOOLTIP_CLASS}'><b>Node</b>: {state.unique_id}</p>"
@@ -149,7 +149,7 @@ class BaseVisdccViz(BaseModelViz):
         # TODO for presentation purposes use image_atd_paths
         ui_elem = [html.P(f"Node: {state.unique_id}")] + \
         [
-            html.Img(id=f"node_img_{state.unique_id}", src=get_state_img(image_path), style={'width': '600px'})
+            html.Img(id=f"node_img_{state.unique_id}", src=get_state_img(image_path, width=IMG_THUMBNAIL_DETAIL_WIDTH), style={'width': '600px'})
             for image_path in state.image_paths
         ]   +\
         [html.P(f"Merged states:")] +\